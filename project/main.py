@@ -1,52 +1,97 @@
 import sys
-from PyQt5.QtWidgets import QApplication, QMessageBox
+# Antes que cualquier otra importación, para poder medirlas (--profile-startup)
+from src.startup_profile import start_startup_profile, profile_span
+profiler = start_startup_profile(sys.argv)
+
+from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import Qt, QCoreApplication
-from src.database import Database
 from src.auth import AuthManager
+from src.startup import DeferredDatabase, import_deferred_modules
+from src.ui.task_runner import get_task_runner, PRIORITY_HIGH, PRIORITY_LOW
 from src.ui.login_window import LoginWindow
-from src.ui.main_window import MainWindow
 from src.logging_config import setup_logging
 from src.error_handler import install_global_exception_hook, show_error
 
+# Solo lo imprescindible para pintar el login: Database (y con ella el cliente de
+# Supabase) y las vistas de MainWindow se importan en segundo plano
+
 def main():
     setup_logging()
     install_global_exception_hook()
     # El atributo de High DPI debe configurarse antes de crear QApplication
     QCoreApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
-    app = QApplication(sys.argv)
+    with profile_span("QApplication"):
+        app = QApplication(sys.argv)
     # Evita que la aplicación termine cuando se cierra la última ventana.
     # Así, al cerrar sesión desde MainWindow, podemos volver a mostrar LoginWindow.
     app.setQuitOnLastWindowClosed(False)
 
-    try:
-        db = Database()
-    except RuntimeError as e:
+    database = DeferredDatabase()
+    auth_manager = AuthManager(database)
+
+    def on_database_ready(db):
+        from src.metrics import export_from_env
+        from src.http_pool import close_http_client
+        # Envía en segundo plano el progreso guardado sin conexión
+        db.start_write_flusher()
+        app.aboutToQuit.connect(db.stop_write_flusher)
+        # Trae periódicamente solo los cambios del catálogo (lecciones editadas, etc.)
+        db.start_catalog_sync()
+        app.aboutToQuit.connect(db.stop_catalog_sync)
+        # Métricas de llamadas a Database en JSON (QUIMICAPRO_METRICS_FILE)
+        app.aboutToQuit.connect(export_from_env)
+        app.aboutToQuit.connect(close_http_client)
+
+    def on_database_failed(error):
         # Error de configuración .env u otros
-        show_error("Error de configuración", str(e))
-        return 1
-    auth_manager = AuthManager(db)
+        show_error("Error de configuración", str(error))
+        app.exit(1)
+
+    # El cliente de Supabase se crea mientras el usuario escribe
+    runner = get_task_runner()
+    runner.submit(database.load, on_result=on_database_ready, on_error=on_database_failed,
+                  priority=PRIORITY_HIGH)
+    runner.submit(import_deferred_modules, priority=PRIORITY_LOW)
+
+    with profile_span("LoginWindow"):
+        login_window = LoginWindow(auth_manager)
+    if profiler is not None:
+        profiler.watch_first_paint(login_window, "LoginWindow.first_paint", on_painted=profiler.write)
+        app.aboutToQuit.connect(profiler.write)
 
-    login_window = LoginWindow(auth_manager)
+    # Una sola ventana principal para todas las sesiones: al cambiar de alumno
+    # se reutiliza con sus vistas en lugar de reconstruirla
+    main_window = None
 
     def on_login_success():
-        main_window = MainWindow(db, auth_manager)
+        nonlocal main_window
+        from src.session import prefetch_session
+        # El login ya esperó a Database: aquí está lista
+        db = database.get()
+        # Descarga progreso, logros y catálogo mientras se prepara la ventana principal
+        prefetch_session(db, auth_manager.get_current_user_id())
+        # Conexión caliente para las primeras lecturas de las vistas
+        get_task_runner().submit(db.warm_up)
+        if main_window is None:
+            from src.ui.main_window import MainWindow
+            with profile_span("MainWindow"):
+                main_window = MainWindow(db, auth_manager)
+            if profiler is not None:
+                profiler.watch_first_paint(main_window, "MainWindow.first_paint", on_painted=profiler.write)
+            main_window.logout_requested.connect(on_logout)
+        else:
+            main_window.start_session()
         main_window.show()
 
-        def on_main_window_closed(*args, **kwargs):
-            nonlocal login_window
-            login_window = LoginWindow(auth_manager)
-            login_window.login_successful.connect(on_login_success)
-            login_window.show()
-            # Asegurar que la ventana de login tome foco y sea visible
-            try:
-                login_window.raise_()
-                login_window.activateWindow()
-            except Exception:
-                pass
-
-        # Escuchar tanto una señal específica de logout como la destrucción de la ventana
-        main_window.logout_requested.connect(on_main_window_closed)
-        main_window.destroyed.connect(on_main_window_closed)
+    def on_logout():
+        login_window.reset()
+        login_window.show()
+        # Asegurar que la ventana de login tome foco y sea visible
+        try:
+            login_window.raise_()
+            login_window.activateWindow()
+        except Exception:
+            pass
 
     login_window.login_successful.connect(on_login_success)
     login_window.show()
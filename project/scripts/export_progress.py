@@ -0,0 +1,47 @@
+import csv
+import os
+import sys
+
+# Asegurar que el paquete 'src' sea importable desde 'project/src'
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_DIR)
+
+from dotenv import load_dotenv
+
+from src.backends import create_backend
+from src.pagination import iter_keyset
+
+COLUMNS = ["user_id", "lesson_id", "completed", "score", "completed_at"]
+
+
+def main():
+    """Exporta el progreso de todos los alumnos a CSV (stdout o el archivo indicado).
+
+    Recorre user_progress con paginación por clave: la memoria no crece con el
+    número de alumnos y no se pierde nada por el límite de filas de PostgREST.
+    Lee del backend directamente, sin Database: exportar no debe crear la caché
+    del catálogo ni la cola de escrituras de la app, ni arrancar sus hilos.
+    """
+    out_path = sys.argv[1] if len(sys.argv) > 1 else None
+    load_dotenv(os.path.join(PROJECT_DIR, ".env"))
+    try:
+        backend = create_backend()
+        out = open(out_path, "w", newline="", encoding="utf-8") if out_path else sys.stdout
+        try:
+            writer = csv.DictWriter(out, fieldnames=COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            count = 0
+            for row in iter_keyset(backend, "user_progress", ",".join(COLUMNS)):
+                writer.writerow(row)
+                count += 1
+        finally:
+            if out_path:
+                out.close()
+        print(f"{count} filas exportadas.", file=sys.stderr)
+    except Exception as e:
+        print(f"Error exportando progreso: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -79,7 +79,7 @@ def main():
         ]
 
         # Upsert para evitar errores si ya existen
-        db.supabase.table("quizzes").upsert(quizzes).execute()
+        db.backend.upsert("quizzes", quizzes, on_conflict="id")
         print("Quizzes insertados/actualizados correctamente.")
     except Exception as e:
         print(f"Error insertando quizzes: {e}")
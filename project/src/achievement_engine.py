@@ -0,0 +1,201 @@
+import threading
+from bisect import insort
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+LESSON_COMPLETE = "lesson_complete"
+PERFECT_SCORE = "perfect_score"
+STREAK = "streak"
+MODULE_COMPLETE = "module_complete"
+
+
+def _completion_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).date()
+        except ValueError:
+            return None
+    return None
+
+
+class AchievementEngine:
+    """Evalúa las reglas de logros de un usuario con estado incremental.
+
+    Los logros se indexan por `requirement_type` (ordenados por umbral) y los de
+    módulo por id de módulo. El estado del usuario (lecciones completadas, días
+    con actividad, rachas y contadores por módulo) se construye una vez y luego
+    cada lección registrada solo actualiza sus contadores y evalúa las reglas
+    que esos contadores pueden disparar.
+
+    La primera evaluación tras construir el estado revisa todas las reglas, por
+    si el catálogo o el progreso cambiaron desde la última sesión.
+    """
+
+    def __init__(self, achievements: List[Dict[str, Any]], progress: List[Dict[str, Any]],
+                 lesson_modules: Dict[str, int], earned_ids: Iterable[str]):
+        self._lock = threading.Lock()
+        self.achievements = achievements
+        self._by_type: Dict[str, List[Tuple[int, int, Dict[str, Any]]]] = {}
+        self._by_module: Dict[int, List[Dict[str, Any]]] = {}
+        for i, achievement in enumerate(achievements):
+            req_type = achievement.get("requirement_type")
+            value = achievement.get("requirement_value", 0)
+            if req_type == MODULE_COMPLETE:
+                self._by_module.setdefault(value, []).append(achievement)
+            else:
+                # El índice desempata umbrales iguales sin comparar diccionarios
+                insort(self._by_type.setdefault(req_type, []), (value, i, achievement))
+
+        self.lesson_modules = lesson_modules
+        self.module_totals: Dict[int, int] = {}
+        for module_id in lesson_modules.values():
+            self.module_totals[module_id] = self.module_totals.get(module_id, 0) + 1
+        self.module_completed: Dict[int, int] = {}
+
+        self.earned: Set[str] = set(earned_ids)
+        self.completed_lessons: Set[str] = set()
+        self.best_score = 0
+        self._days: Set[date] = set()
+        # Día de cada lección y lecciones por día: al repetir una lección el servidor
+        # reemplaza su completed_at, así que su día anterior deja de contar
+        self._lesson_days: Dict[str, date] = {}
+        self._day_counts: Dict[date, int] = {}
+        self.max_streak = 0
+        self.current_streak = 0
+        self._last_day: Optional[date] = None
+        self._needs_full_check = True
+
+        for row in progress:
+            if row.get("completed"):
+                self._apply(row.get("lesson_id"), row.get("score") or 0,
+                            _completion_date(row.get("completed_at")))
+
+    def _apply(self, lesson_id: str, score: int, day: Optional[date]) -> Tuple[bool, bool]:
+        """Actualiza contadores; devuelve (lección nueva, racha máxima mejorada)."""
+        self.best_score = max(self.best_score, score)
+        new_lesson = lesson_id not in self.completed_lessons
+        if new_lesson:
+            self.completed_lessons.add(lesson_id)
+            module_id = self.lesson_modules.get(lesson_id)
+            if module_id is not None:
+                self.module_completed[module_id] = self.module_completed.get(module_id, 0) + 1
+        return new_lesson, self._move_day(lesson_id, day)
+
+    def _move_day(self, lesson_id: str, day: Optional[date]) -> bool:
+        """Anota `day` como el día de la lección; devuelve si mejoró la racha máxima."""
+        previous = self._lesson_days.get(lesson_id)
+        if day is None or day == previous:
+            return False
+        best = self.max_streak
+        self._lesson_days[lesson_id] = day
+        self._day_counts[day] = self._day_counts.get(day, 0) + 1
+        if previous is not None:
+            self._day_counts[previous] -= 1
+            if not self._day_counts[previous]:
+                # El día se queda sin lecciones: puede partir una racha, se recalculan
+                del self._day_counts[previous]
+                self._days.discard(previous)
+                self._recompute_streaks()
+        self._add_day(day)
+        return self.max_streak > best
+
+    def _recompute_streaks(self):
+        self.max_streak = self.current_streak = 0
+        self._last_day = None
+        run = 0
+        for day in sorted(self._days):
+            run = run + 1 if self._last_day == day - timedelta(days=1) else 1
+            self._last_day = day
+            self.max_streak = max(self.max_streak, run)
+        self.current_streak = run
+
+    def _add_day(self, day: Optional[date]) -> bool:
+        if day is None or day in self._days:
+            return False
+        self._days.add(day)
+        # Un día nuevo solo puede unir las rachas que tiene justo antes y después
+        before = 0
+        while day - timedelta(days=before + 1) in self._days:
+            before += 1
+        after = 0
+        while day + timedelta(days=after + 1) in self._days:
+            after += 1
+        run = before + 1 + after
+        run_end = day + timedelta(days=after)
+        if self._last_day is None or run_end >= self._last_day:
+            self._last_day = run_end
+            self.current_streak = run
+        improved = run > self.max_streak
+        self.max_streak = max(self.max_streak, run)
+        return improved
+
+    def _reached(self, req_type: str, counter: int) -> List[Dict[str, Any]]:
+        unlocked = []
+        for value, _, achievement in self._by_type.get(req_type, ()):
+            if value > counter:
+                break
+            if achievement["id"] not in self.earned:
+                unlocked.append(achievement)
+        return unlocked
+
+    def _module_done(self, module_id: int) -> List[Dict[str, Any]]:
+        total = self.module_totals.get(module_id, 0)
+        if total == 0 or self.module_completed.get(module_id, 0) < total:
+            return []
+        return [a for a in self._by_module.get(module_id, ()) if a["id"] not in self.earned]
+
+    def _evaluate_all(self, score: int) -> List[Dict[str, Any]]:
+        unlocked = (self._reached(LESSON_COMPLETE, len(self.completed_lessons))
+                    + self._reached(PERFECT_SCORE, score)
+                    + self._reached(STREAK, self.max_streak))
+        for module_id in self._by_module:
+            unlocked.extend(self._module_done(module_id))
+        return unlocked
+
+    def record_lesson(self, lesson_id: str, score: int, completed_at: Any = None) -> List[Dict[str, Any]]:
+        """Registra una lección completada y devuelve los logros que desbloquea.
+
+        Los logros devueltos se marcan como obtenidos; el llamador se encarga de
+        guardarlos.
+        """
+        with self._lock:
+            day = _completion_date(completed_at or datetime.now(timezone.utc))
+            new_lesson, streak_improved = self._apply(lesson_id, score, day)
+            if self._needs_full_check:
+                self._needs_full_check = False
+                unlocked = self._evaluate_all(score)
+            else:
+                unlocked = self._reached(PERFECT_SCORE, score)
+                if new_lesson:
+                    unlocked += self._reached(LESSON_COMPLETE, len(self.completed_lessons))
+                    module_id = self.lesson_modules.get(lesson_id)
+                    if module_id is not None:
+                        unlocked += self._module_done(module_id)
+                if streak_improved:
+                    unlocked += self._reached(STREAK, self.max_streak)
+            self.earned.update(a["id"] for a in unlocked)
+            return unlocked
+
+    def mark_earned(self, achievement_ids: Iterable[str]):
+        with self._lock:
+            self.earned.update(achievement_ids)
+
+    def progress_for(self, achievement: Dict[str, Any]) -> Tuple[int, int]:
+        """Avance (actual, objetivo) hacia un logro, para mostrarlo en la interfaz."""
+        req_type = achievement.get("requirement_type")
+        target = achievement.get("requirement_value", 0)
+        with self._lock:
+            if req_type == LESSON_COMPLETE:
+                current = len(self.completed_lessons)
+            elif req_type == PERFECT_SCORE:
+                current = self.best_score
+            elif req_type == STREAK:
+                current = self.max_streak
+            elif req_type == MODULE_COMPLETE:
+                current = self.module_completed.get(target, 0)
+                target = self.module_totals.get(target, 0)
+            else:
+                return 0, 0
+        return min(current, target), target
@@ -0,0 +1,148 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Dict, List, Optional
+
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
+from src.database import Database, PROGRESS_COLUMNS, USER_ACHIEVEMENT_COLUMNS
+from src.http_pool import create_async_http_client
+from src.metrics import instrumented
+
+
+class AsyncLoopThread:
+    """Bucle asyncio propio en un hilo demonio.
+
+    Qt ya ocupa el hilo principal con su bucle de eventos, así que las corrutinas
+    se ejecutan aquí y sus resultados vuelven a la interfaz por las señales del
+    TaskRunner (o por el Future devuelto por `submit`).
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name="AsyncDatabaseLoop", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        # La tarea hereda el contexto del llamador (acción de la UI para las métricas)
+        context = contextvars.copy_context()
+
+        async def in_caller_context():
+            for var, value in context.items():
+                var.set(value)
+            return await coro
+
+        return asyncio.run_coroutine_threadsafe(in_caller_context(), self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Bloquea el hilo llamador (nunca el de la interfaz) hasta obtener el resultado."""
+        return self.submit(coro).result(timeout)
+
+
+class AsyncDatabase:
+    """Variante asíncrona de Database para lecturas independientes concurrentes.
+
+    Solo progreso y logros del usuario (`fetch_user_*`, usados por la precarga
+    de la sesión) van por el cliente asíncrono de Supabase: son lecturas de red
+    sin más lógica. El resto, incluidas tres de las cuatro lecturas del panel,
+    son los métodos síncronos de Database en el executor por defecto, a la vez
+    con `asyncio.gather`. Es deliberado: esos métodos sirven el catálogo desde
+    la réplica o la caché en disco, memoizan, aplican la sesión precargada y la
+    cola local y caen a consultas alternativas si falta una RPC. Repetirlo todo
+    sobre AsyncClient duplicaría esa lógica (y no funcionaría con SQLite); la
+    concurrencia la dan los hilos y el pool HTTP compartido.
+    """
+
+    def __init__(self, database: Database, loop_thread: Optional[AsyncLoopThread] = None):
+        self.db = database
+        self._loop = loop_thread or AsyncLoopThread()
+        self._client: Optional[AsyncClient] = None
+        self._client_lock: Optional[asyncio.Lock] = None
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        return self._loop.run(coro, timeout)
+
+    def submit(self, coro: Awaitable[Any]) -> Future:
+        return self._loop.submit(coro)
+
+    async def _get_client(self) -> AsyncClient:
+        if self._client_lock is None:
+            self._client_lock = asyncio.Lock()
+        async with self._client_lock:
+            if self._client is None:
+                options = AsyncClientOptions(httpx_client=create_async_http_client())
+                self._client = await acreate_client(self.db.url, self.db.key, options=options)
+        return self._client
+
+    async def _in_executor(self, fn, *args):
+        call = functools.partial(contextvars.copy_context().run, fn, *args)
+        return await asyncio.get_running_loop().run_in_executor(None, call)
+
+    async def get_all_modules(self) -> List[Dict[str, Any]]:
+        return await self._in_executor(self.db.get_all_modules)
+
+    async def get_all_achievements(self) -> List[Dict[str, Any]]:
+        return await self._in_executor(self.db.get_all_achievements)
+
+    @instrumented
+    async def fetch_user_progress(self, user_id: str) -> List[Dict[str, Any]]:
+        """Como get_user_progress, pero propaga los errores de red."""
+        client = await self._get_client()
+        response = await client.table("user_progress").select(PROGRESS_COLUMNS).eq("user_id", user_id).execute()
+        return self.db.with_pending_progress(user_id, response.data if response.data else [])
+
+    @instrumented
+    async def fetch_user_achievements(self, user_id: str) -> List[Dict[str, Any]]:
+        client = await self._get_client()
+        response = await client.table("user_achievements").select(USER_ACHIEVEMENT_COLUMNS).eq("user_id", user_id).execute()
+        return self.db.with_pending_achievements(user_id, response.data if response.data else [])
+
+    async def get_lesson_modules(self) -> Dict[str, int]:
+        return await self._in_executor(self.db.get_lesson_modules)
+
+    async def get_all_module_completion(self, user_id: str) -> Dict[int, Dict[str, Any]]:
+        # Misma ruta que la síncrona (RPC, memoización y respaldo), en un hilo del executor
+        return await self._in_executor(self.db.get_all_module_completion, user_id)
+
+    @instrumented
+    async def load_dashboard(self, user_id: str) -> Dict[str, Any]:
+        """Lanza a la vez las lecturas del panel: el tiempo total es el de la más lenta.
+
+        Las tres son métodos de Database en hilos del executor, no llamadas de
+        AsyncClient (ver la clase): así usan la caché, la réplica y los respaldos.
+        """
+        # Con la sesión precargada no hace falta ir a la red
+        snapshot = await self._in_executor(self.db.session_snapshot, user_id)
+        if snapshot is not None:
+            return snapshot.dashboard()
+        reads = {
+            "stats": self._in_executor(self.db.get_dashboard_stats, user_id),
+            "modules": self.get_all_modules(),
+            "completions": self.get_all_module_completion(user_id),
+        }
+        results = await asyncio.gather(*reads.values())
+        return dict(zip(reads.keys(), results))
+
+
+_create_lock = threading.Lock()
+
+
+def get_async_database(database: Database) -> Optional[AsyncDatabase]:
+    """AsyncDatabase asociada a una Database (se crea una sola vez).
+
+    Devuelve None si la Database no expone credenciales (p. ej. dobles de prueba).
+    """
+    with _create_lock:
+        existing = getattr(database, "_async_db", None)
+        if existing is not None:
+            return existing
+        if not getattr(database, "url", None) or not getattr(database, "key", None):
+            return None
+        async_db = AsyncDatabase(database)
+        database._async_db = async_db
+        return async_db
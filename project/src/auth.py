@@ -1,11 +1,22 @@
-from typing import Optional, Dict, Any
-from src.database import Database
+from typing import Optional, Dict, Any, Union, TYPE_CHECKING
+from src.startup import DeferredDatabase
+
+if TYPE_CHECKING:
+    from src.database import Database
 
 class AuthManager:
-    def __init__(self, database: Database):
-        self.db = database
+    def __init__(self, database: Union["Database", DeferredDatabase]):
+        # Sin importar src.database aquí: LoginWindow se muestra antes de que exista
+        self._database = database
         self.current_user: Optional[Dict[str, Any]] = None
 
+    @property
+    def db(self) -> "Database":
+        if isinstance(self._database, DeferredDatabase):
+            # Las llamadas llegan desde el TaskRunner: esperar aquí no congela la interfaz
+            self._database = self._database.get()
+        return self._database
+
     def login(self, username: str) -> tuple[bool, str]:
         if not username or len(username.strip()) < 3:
             return False, "El nombre de usuario debe tener al menos 3 caracteres"
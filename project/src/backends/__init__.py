@@ -0,0 +1,37 @@
+import os
+
+from src.backends.base import After, BackendError, DatabaseBackend, Filters, Rows
+from src.backends.sqlite_backend import SQLiteBackend
+from src.backends.supabase_backend import SupabaseBackend
+
+__all__ = [
+    "After",
+    "BackendError",
+    "DatabaseBackend",
+    "Filters",
+    "Rows",
+    "SQLiteBackend",
+    "SupabaseBackend",
+    "create_backend",
+]
+
+
+def create_backend() -> DatabaseBackend:
+    """Backend según QUIMICAPRO_BACKEND: "supabase" (por defecto) o "sqlite".
+
+    Con "sqlite" los datos viven en QUIMICAPRO_SQLITE_PATH (por defecto
+    quimicapro.sqlite3 en la carpeta de datos de la aplicación).
+    """
+    kind = os.environ.get("QUIMICAPRO_BACKEND", "supabase").strip().lower()
+    if kind == "sqlite":
+        return SQLiteBackend.open_default()
+    if kind != "supabase":
+        raise RuntimeError(f"QUIMICAPRO_BACKEND desconocido: {kind!r} (usa 'supabase' o 'sqlite').")
+    # Permitir variables estándar y compatibilidad con NEXT_PUBLIC_* (usadas en proyectos web)
+    url = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+    if not url or not key:
+        raise RuntimeError(
+            "Configuración de Supabase incompleta: asegúrate de definir SUPABASE_URL y SUPABASE_KEY en el archivo .env."
+        )
+    return SupabaseBackend(url, key)
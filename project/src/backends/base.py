@@ -0,0 +1,72 @@
+from typing import Any, Dict, List, Optional, Protocol, Tuple, Union, runtime_checkable
+
+# Filtros de igualdad por columna; un valor lista/tupla/conjunto equivale a IN (...)
+Filters = Dict[str, Any]
+Rows = Union[Dict[str, Any], List[Dict[str, Any]]]
+# Condición de paginación por clave: (columna, valor) o ((col1, col2, ...), (v1, v2, ...))
+After = Tuple[Union[str, Tuple[str, ...]], Any]
+
+
+class BackendError(Exception):
+    """Error de un backend con el código del servidor (p. ej. "PGRST202": función inexistente)."""
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        self.code = code
+
+
+@runtime_checkable
+class DatabaseBackend(Protocol):
+    """Operaciones de datos que necesita Database, independientes del almacenamiento.
+
+    Todas devuelven filas como diccionarios y lanzan excepción ante cualquier
+    error; Database decide cómo degradar (valores vacíos, cola local, etc.).
+    """
+
+    name: str
+    # True si los datos están en el propio equipo (sin latencia de red)
+    is_local: bool
+
+    def select(self, table: str, columns: str = "*", filters: Optional[Filters] = None,
+               order: Optional[str] = None, desc: bool = False, limit: Optional[int] = None,
+               single: bool = False, after: Optional[After] = None) -> Any:
+        """Filas de `table`; con `single` devuelve una fila o None.
+
+        `after=(columna, valor)` añade la condición `columna > valor`. Con varias
+        columnas, `after=(("updated_at", "id"), (t, i))` compara la tupla entera
+        (`updated_at > t`, o igual y `id > i`). `order` admite varias columnas
+        separadas por comas.
+        """
+        ...
+
+    def count(self, table: str) -> Optional[int]:
+        ...
+
+    def insert(self, table: str, rows: Rows) -> List[Dict[str, Any]]:
+        ...
+
+    def update(self, table: str, values: Dict[str, Any], filters: Filters) -> List[Dict[str, Any]]:
+        ...
+
+    def delete(self, table: str, filters: Filters) -> List[Dict[str, Any]]:
+        ...
+
+    def upsert(self, table: str, rows: Rows, on_conflict: str,
+               ignore_duplicates: bool = False) -> List[Dict[str, Any]]:
+        """Inserta o actualiza según `on_conflict` ("col1,col2").
+
+        Con `ignore_duplicates` las filas existentes no se tocan y solo se
+        devuelven las insertadas.
+        """
+        ...
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        ...
+
+    def warm_up(self) -> None:
+        """Abre por adelantado la conexión (TCP, TLS, HTTP/2) para que la primera lectura no la pague."""
+        ...
+
+    def select_module_bundle(self, module_id: int) -> Optional[Dict[str, Any]]:
+        """Módulo con `lessons` (por order_index) y en cada una sus `quizzes`, en una sola consulta."""
+        ...
@@ -0,0 +1,473 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from src.backends.base import After, BackendError, Filters, Rows
+from src.paths import user_data_dir
+
+_NOW = "(strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now'))"
+
+# Mismo esquema que supabase/migrations: uuid y timestamptz como TEXT,
+# boolean como INTEGER y jsonb como TEXT con JSON
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS app_users (
+  id TEXT PRIMARY KEY,
+  username TEXT UNIQUE NOT NULL,
+  display_name TEXT NOT NULL,
+  created_at TEXT DEFAULT {_NOW},
+  last_login TEXT DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS modules (
+  id INTEGER PRIMARY KEY,
+  level INTEGER NOT NULL,
+  title TEXT NOT NULL,
+  description TEXT NOT NULL,
+  icon TEXT NOT NULL,
+  color TEXT NOT NULL,
+  order_index INTEGER NOT NULL,
+  updated_at TEXT DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS lessons (
+  id TEXT PRIMARY KEY,
+  module_id INTEGER NOT NULL REFERENCES modules(id),
+  title TEXT NOT NULL,
+  content TEXT NOT NULL,
+  order_index INTEGER NOT NULL,
+  estimated_minutes INTEGER DEFAULT 10,
+  updated_at TEXT DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS quizzes (
+  id TEXT PRIMARY KEY,
+  lesson_id TEXT NOT NULL REFERENCES lessons(id) ON DELETE CASCADE,
+  question TEXT NOT NULL,
+  question_type TEXT NOT NULL,
+  options TEXT,
+  correct_answer TEXT NOT NULL,
+  explanation TEXT NOT NULL,
+  points INTEGER DEFAULT 10,
+  order_index INTEGER NOT NULL,
+  updated_at TEXT DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS user_progress (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL REFERENCES app_users(id) ON DELETE CASCADE,
+  lesson_id TEXT NOT NULL REFERENCES lessons(id) ON DELETE CASCADE,
+  completed INTEGER DEFAULT 0,
+  score INTEGER DEFAULT 0,
+  completed_at TEXT DEFAULT {_NOW},
+  UNIQUE(user_id, lesson_id)
+);
+
+CREATE TABLE IF NOT EXISTS achievements (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  description TEXT NOT NULL,
+  icon TEXT NOT NULL,
+  requirement_type TEXT NOT NULL,
+  requirement_value INTEGER NOT NULL,
+  updated_at TEXT DEFAULT {_NOW}
+);
+
+CREATE TABLE IF NOT EXISTS user_achievements (
+  id TEXT PRIMARY KEY,
+  user_id TEXT NOT NULL REFERENCES app_users(id) ON DELETE CASCADE,
+  achievement_id TEXT NOT NULL REFERENCES achievements(id) ON DELETE CASCADE,
+  earned_at TEXT DEFAULT {_NOW},
+  UNIQUE(user_id, achievement_id)
+);
+
+CREATE TABLE IF NOT EXISTS catalog_deletions (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  table_name TEXT NOT NULL,
+  row_id TEXT NOT NULL,
+  deleted_at TEXT NOT NULL DEFAULT {_NOW}
+);
+
+-- Solo local: marcas de agua de la sincronización del catálogo (src/catalog_sync.py)
+CREATE TABLE IF NOT EXISTS sync_state (
+  table_name TEXT PRIMARY KEY,
+  updated_at TEXT,
+  deleted_at TEXT,
+  synced_at TEXT
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_lessons_module_order ON lessons(module_id, order_index);
+CREATE INDEX IF NOT EXISTS idx_quizzes_lesson_order ON quizzes(lesson_id, order_index);
+CREATE INDEX IF NOT EXISTS idx_user_progress_user_completed ON user_progress(user_id, completed);
+CREATE INDEX IF NOT EXISTS idx_user_progress_lesson ON user_progress(lesson_id);
+CREATE INDEX IF NOT EXISTS idx_achievements_requirement ON achievements(requirement_type, requirement_value);
+CREATE INDEX IF NOT EXISTS idx_modules_order ON modules(order_index);
+CREATE INDEX IF NOT EXISTS idx_catalog_deletions_table_deleted ON catalog_deletions(table_name, deleted_at);
+CREATE INDEX IF NOT EXISTS idx_modules_updated_at ON modules(updated_at);
+CREATE INDEX IF NOT EXISTS idx_lessons_updated_at ON lessons(updated_at);
+CREATE INDEX IF NOT EXISTS idx_quizzes_updated_at ON quizzes(updated_at);
+CREATE INDEX IF NOT EXISTS idx_achievements_updated_at ON achievements(updated_at);
+"""
+
+# Tablas de catálogo con updated_at y lápidas al borrar (migración 20251107090000)
+CATALOG_TABLES = ("modules", "lessons", "quizzes", "achievements")
+
+
+def _catalog_triggers(table: str) -> str:
+    # Solo se marca la fila si la actualización no trae su propio updated_at
+    return f"""
+CREATE TRIGGER IF NOT EXISTS set_updated_at_{table} AFTER UPDATE ON {table}
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+  UPDATE {table} SET updated_at = {_NOW} WHERE id = NEW.id;
+END;
+CREATE TRIGGER IF NOT EXISTS record_catalog_deletion_{table} AFTER DELETE ON {table}
+FOR EACH ROW
+BEGIN
+  INSERT INTO catalog_deletions (table_name, row_id) VALUES ('{table}', CAST(OLD.id AS TEXT));
+END;
+"""
+
+# Tablas cuyo id es uuid (se genera aquí si la fila no lo trae)
+_UUID_TABLES = {"app_users", "lessons", "quizzes", "user_progress", "achievements", "user_achievements"}
+_BOOL_COLUMNS = {("user_progress", "completed")}
+_JSON_COLUMNS = {("quizzes", "options")}
+
+
+class SQLiteBackend:
+    """Backend local en un archivo SQLite (modo sin conexión, pruebas y benchmarks).
+
+    Usa el mismo esquema que Supabase, WAL e índices para las consultas de la
+    app. Las funciones RPC del servidor (get_module_completion_bulk,
+    submit_quiz) están reimplementadas con la misma semántica.
+    """
+
+    name = "sqlite"
+    is_local = True
+
+    def __init__(self, path: str = ":memory:", track_changes: bool = True):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._conn.executescript(INDEXES)
+        if track_changes:
+            # Sin ellos en una réplica, que debe conservar los updated_at del origen
+            self._conn.executescript("".join(_catalog_triggers(t) for t in CATALOG_TABLES))
+        self._columns: Dict[str, List[str]] = {
+            table: [row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+            for table in _UUID_TABLES | {"modules", "catalog_deletions", "sync_state"}
+        }
+        self._rpcs: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "get_module_completion_bulk": self._rpc_module_completion_bulk,
+            "submit_quiz": self._rpc_submit_quiz,
+            "get_dashboard_stats": self._rpc_dashboard_stats,
+        }
+
+    @classmethod
+    def open_default(cls) -> "SQLiteBackend":
+        path = os.environ.get("QUIMICAPRO_SQLITE_PATH") or os.path.join(user_data_dir(), "quimicapro.sqlite3")
+        return cls(path)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _migrate(self):
+        # Archivos creados antes de updated_at: SQLite no admite añadir una
+        # columna con valor por defecto no constante, se rellena aparte
+        for table in CATALOG_TABLES:
+            names = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if "updated_at" not in names:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN updated_at TEXT")
+                self._conn.execute(f"UPDATE {table} SET updated_at = {_NOW}")
+        self._conn.commit()
+
+    def columns(self, table: str) -> List[str]:
+        return list(self._check_table(table))
+
+    # -- utilidades -------------------------------------------------------
+
+    def _check_table(self, table: str) -> List[str]:
+        columns = self._columns.get(table)
+        if columns is None:
+            raise BackendError(f"Unknown table: {table}")
+        return columns
+
+    def _check_columns(self, table: str, names) -> List[str]:
+        columns = self._check_table(table)
+        names = list(names)
+        unknown = [n for n in names if n not in columns]
+        if unknown:
+            raise BackendError(f"Unknown column(s) in {table}: {', '.join(unknown)}")
+        return names
+
+    def _encode(self, table: str, row: Dict[str, Any], new_row: bool = True) -> Dict[str, Any]:
+        encoded = dict(row)
+        if new_row and table in _UUID_TABLES and not encoded.get("id"):
+            encoded["id"] = str(uuid.uuid4())
+        for column, value in row.items():
+            if (table, column) in _JSON_COLUMNS and value is not None and not isinstance(value, str):
+                encoded[column] = json.dumps(value, ensure_ascii=False)
+            elif (table, column) in _BOOL_COLUMNS and value is not None:
+                encoded[column] = int(bool(value))
+        return encoded
+
+    def _decode(self, table: str, row: sqlite3.Row) -> Dict[str, Any]:
+        decoded = dict(row)
+        for column, value in decoded.items():
+            if value is None:
+                continue
+            if (table, column) in _JSON_COLUMNS:
+                decoded[column] = json.loads(value)
+            elif (table, column) in _BOOL_COLUMNS:
+                decoded[column] = bool(value)
+        return decoded
+
+    def _where(self, table: str, filters: Optional[Filters], after: Optional[After] = None):
+        clauses, params = [], []
+        if after is not None:
+            columns, values = after
+            if isinstance(columns, str):
+                columns, values = (columns,), (values,)
+            # Comparación de tuplas de SQLite: (a, b) > (?, ?)
+            names = self._check_columns(table, columns)
+            clauses.append(f"({', '.join(names)}) > ({', '.join('?' * len(names))})")
+            params.extend(values)
+        for column, value in (filters or {}).items():
+            self._check_columns(table, [column])
+            if isinstance(value, (list, tuple, set)):
+                values = [int(bool(v)) if (table, column) in _BOOL_COLUMNS else v for v in value]
+                if not values:
+                    clauses.append("0")
+                    continue
+                clauses.append(f"{column} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(int(bool(value)) if (table, column) in _BOOL_COLUMNS else value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _as_list(rows: Rows) -> List[Dict[str, Any]]:
+        return [rows] if isinstance(rows, dict) else list(rows)
+
+    # -- DatabaseBackend --------------------------------------------------
+
+    def select(self, table: str, columns: str = "*", filters: Optional[Filters] = None,
+               order: Optional[str] = None, desc: bool = False, limit: Optional[int] = None,
+               single: bool = False, after: Optional[After] = None) -> Any:
+        if columns.strip() == "*":
+            self._check_table(table)
+            projection = "*"
+        else:
+            projection = ", ".join(self._check_columns(table, [c.strip() for c in columns.split(",")]))
+        where, params = self._where(table, filters, after)
+        sql = f"SELECT {projection} FROM {table}{where}"
+        if order:
+            direction = "DESC" if desc else "ASC"
+            names = self._check_columns(table, [c.strip() for c in order.split(",")])
+            sql += " ORDER BY " + ", ".join(f"{name} {direction}" for name in names)
+        if single:
+            limit = 2
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = [self._decode(table, r) for r in self._conn.execute(sql, params).fetchall()]
+        if single:
+            if len(rows) > 1:
+                raise BackendError(f"More than one row returned from {table}")
+            return rows[0] if rows else None
+        return rows
+
+    def count(self, table: str) -> Optional[int]:
+        self._check_table(table)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _write(self, table: str, rows: List[Dict[str, Any]], suffix: Callable[[List[str]], str]) -> List[Dict[str, Any]]:
+        result = []
+        with self._lock:
+            try:
+                for row in rows:
+                    encoded = self._encode(table, row)
+                    names = self._check_columns(table, encoded.keys())
+                    sql = (f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+                           f"{suffix(names)} RETURNING *")
+                    result.extend(self._decode(table, r)
+                                  for r in self._conn.execute(sql, [encoded[n] for n in names]).fetchall())
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                raise BackendError(str(e), code="23505" if isinstance(e, sqlite3.IntegrityError) else None) from e
+        return result
+
+    def insert(self, table: str, rows: Rows) -> List[Dict[str, Any]]:
+        return self._write(table, self._as_list(rows), lambda names: "")
+
+    def update(self, table: str, values: Dict[str, Any], filters: Filters) -> List[Dict[str, Any]]:
+        encoded = self._encode(table, values, new_row=False)
+        names = self._check_columns(table, encoded.keys())
+        where, params = self._where(table, filters)
+        sql = f"UPDATE {table} SET {', '.join(f'{n} = ?' for n in names)}{where} RETURNING *"
+        with self._lock:
+            rows = [self._decode(table, r)
+                    for r in self._conn.execute(sql, [encoded[n] for n in names] + params).fetchall()]
+            self._conn.commit()
+        return rows
+
+    def delete(self, table: str, filters: Filters) -> List[Dict[str, Any]]:
+        where, params = self._where(table, filters)
+        with self._lock:
+            rows = [self._decode(table, r)
+                    for r in self._conn.execute(f"DELETE FROM {table}{where} RETURNING *", params).fetchall()]
+            self._conn.commit()
+        return rows
+
+    def upsert(self, table: str, rows: Rows, on_conflict: str,
+               ignore_duplicates: bool = False) -> List[Dict[str, Any]]:
+        conflict = self._check_columns(table, [c.strip() for c in on_conflict.split(",")])
+
+        def suffix(names: List[str]) -> str:
+            updates = [n for n in names if n not in conflict and n != "id"]
+            if ignore_duplicates or not updates:
+                return f" ON CONFLICT ({', '.join(conflict)}) DO NOTHING"
+            assignments = ", ".join(f"{n} = excluded.{n}" for n in updates)
+            return f" ON CONFLICT ({', '.join(conflict)}) DO UPDATE SET {assignments}"
+
+        return self._write(table, self._as_list(rows), suffix)
+
+    def warm_up(self) -> None:
+        pass
+
+    def select_module_bundle(self, module_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            module = self.select("modules", filters={"id": module_id}, single=True)
+            if module is None:
+                return None
+            lessons = self.select("lessons", filters={"module_id": module_id}, order="order_index")
+            quizzes = self.select("quizzes", filters={"lesson_id": [l["id"] for l in lessons]}, order="order_index")
+        by_lesson: Dict[str, List[Dict[str, Any]]] = {}
+        for quiz in quizzes:
+            by_lesson.setdefault(quiz["lesson_id"], []).append(quiz)
+        module["lessons"] = [dict(lesson, quizzes=by_lesson.get(lesson["id"], [])) for lesson in lessons]
+        return module
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        handler = self._rpcs.get(name)
+        if handler is None:
+            raise BackendError(f"Could not find the function public.{name}", code="PGRST202")
+        with self._lock:
+            return handler(params)
+
+    # -- funciones equivalentes a las migraciones ---------------------------
+
+    def _rpc_module_completion_bulk(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        rows = self._conn.execute(
+            """
+            SELECT m.id AS module_id,
+                   COUNT(up.id) AS completed,
+                   COUNT(l.id) AS total
+            FROM modules m
+            LEFT JOIN lessons l ON l.module_id = m.id
+            LEFT JOIN user_progress up
+                   ON up.lesson_id = l.id AND up.user_id = ? AND up.completed
+            GROUP BY m.id
+            ORDER BY m.id
+            """,
+            (params["p_user_id"],),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def _rpc_dashboard_stats(self, params: Dict[str, Any]) -> Dict[str, int]:
+        # En local no hace falta la fila de user_stats: las mismas cifras con dos consultas
+        user_id = params["p_user_id"]
+        started, completed, score_sum = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(completed), 0), COALESCE(SUM(score), 0) FROM user_progress WHERE user_id = ?",
+            (user_id,),
+        ).fetchone()
+        achievements = self._conn.execute(
+            "SELECT COUNT(*) FROM user_achievements WHERE user_id = ?", (user_id,)
+        ).fetchone()[0]
+        modules = self._rpc_module_completion_bulk(params)
+        return {
+            "lessons_started": started,
+            "lessons_completed": completed,
+            "average_score": score_sum // started if started else 0,
+            "achievements": achievements,
+            "modules_total": len(modules),
+            "modules_completed": sum(1 for m in modules if m["total"] and m["completed"] == m["total"]),
+            "lessons_total": sum(m["total"] for m in modules),
+            "module_lessons_completed": sum(m["completed"] for m in modules),
+        }
+
+    def _rpc_submit_quiz(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        user_id, lesson_id, score = params["p_user_id"], params["p_lesson_id"], params["p_score"]
+        try:
+            self._conn.execute(
+                f"""
+                INSERT INTO user_progress (id, user_id, lesson_id, completed, score, completed_at)
+                VALUES (?, ?, ?, 1, ?, {_NOW})
+                ON CONFLICT (user_id, lesson_id)
+                DO UPDATE SET completed = 1, score = excluded.score, completed_at = excluded.completed_at
+                """,
+                (str(uuid.uuid4()), user_id, lesson_id, score),
+            )
+            completed = self._conn.execute(
+                "SELECT COUNT(*) FROM user_progress WHERE user_id = ? AND completed", (user_id,)
+            ).fetchone()[0]
+            # Racha máxima: días consecutivos agrupados por (día - posición)
+            max_streak = self._conn.execute(
+                """
+                SELECT COALESCE(MAX(streak), 0) FROM (
+                  SELECT COUNT(*) AS streak FROM (
+                    SELECT julianday(d) - ROW_NUMBER() OVER (ORDER BY d) AS grp
+                    FROM (SELECT DISTINCT date(completed_at) AS d FROM user_progress
+                          WHERE user_id = ? AND completed AND completed_at IS NOT NULL)
+                  ) GROUP BY grp
+                )
+                """,
+                (user_id,),
+            ).fetchone()[0]
+            inserted = self._conn.execute(
+                """
+                WITH completed_modules AS (
+                  SELECT l.module_id
+                  FROM lessons l
+                  LEFT JOIN user_progress up
+                         ON up.lesson_id = l.id AND up.user_id = :user_id AND up.completed
+                  GROUP BY l.module_id
+                  HAVING COUNT(up.id) = COUNT(l.id)
+                )
+                INSERT INTO user_achievements (id, user_id, achievement_id)
+                SELECT lower(hex(randomblob(16))), :user_id, a.id
+                FROM achievements a
+                WHERE (a.requirement_type = 'lesson_complete' AND :completed >= a.requirement_value)
+                   OR (a.requirement_type = 'perfect_score' AND :score >= a.requirement_value)
+                   OR (a.requirement_type = 'streak' AND :streak >= a.requirement_value)
+                   OR (a.requirement_type = 'module_complete'
+                       AND a.requirement_value IN (SELECT module_id FROM completed_modules))
+                ON CONFLICT (user_id, achievement_id) DO NOTHING
+                RETURNING achievement_id
+                """,
+                {"user_id": user_id, "completed": completed, "score": score, "streak": max_streak},
+            ).fetchall()
+            self._conn.commit()
+        except sqlite3.Error as e:
+            self._conn.rollback()
+            raise BackendError(str(e)) from e
+        awarded = [r["achievement_id"] for r in inserted]
+        if not awarded:
+            return []
+        return self.select("achievements", filters={"id": awarded})
@@ -0,0 +1,108 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+from supabase import create_client, Client, ClientOptions
+
+from src.backends.base import After, Filters, Rows
+from src.http_pool import get_http_client
+
+
+def _quote(value: Any) -> str:
+    # Dentro de or=(...) las comas, puntos y dos puntos (p. ej. de una fecha) rompen el filtro
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _keyset_filter(columns: Sequence[str], values: Sequence[Any]) -> str:
+    """Filtro `or` de PostgREST equivalente a `(columns) > (values)`."""
+    branches = []
+    for i, column in enumerate(columns):
+        conditions = [f"{c}.eq.{_quote(v)}" for c, v in zip(columns[:i], values[:i])]
+        conditions.append(f"{column}.gt.{_quote(values[i])}")
+        branches.append(conditions[0] if len(conditions) == 1 else f"and({','.join(conditions)})")
+    return ",".join(branches)
+
+
+class SupabaseBackend:
+    """Backend remoto: PostgREST de Supabase mediante el cliente oficial."""
+
+    name = "supabase"
+    is_local = False
+
+    def __init__(self, url: str, key: str, client: Optional[Client] = None):
+        self.url = url
+        self.key = key
+        # Cliente httpx compartido: keep-alive largo, HTTP/2 y métricas de conexión
+        self.client: Client = client or create_client(url, key, options=ClientOptions(httpx_client=get_http_client()))
+
+    @staticmethod
+    def _apply_filters(query, filters: Optional[Filters]):
+        for column, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                query = query.in_(column, list(value))
+            else:
+                query = query.eq(column, value)
+        return query
+
+    def select(self, table: str, columns: str = "*", filters: Optional[Filters] = None,
+               order: Optional[str] = None, desc: bool = False, limit: Optional[int] = None,
+               single: bool = False, after: Optional[After] = None) -> Any:
+        query = self._apply_filters(self.client.table(table).select(columns), filters)
+        if after is not None:
+            if isinstance(after[0], str):
+                query = query.gt(after[0], after[1])
+            else:
+                query = query.or_(_keyset_filter(after[0], after[1]))
+        if order:
+            for column in order.split(","):
+                query = query.order(column.strip(), desc=desc)
+        if limit is not None:
+            query = query.limit(limit)
+        if single:
+            # maybe_single() devuelve None (no una respuesta vacía) si no hay fila
+            response = query.maybe_single().execute()
+            return response.data if response else None
+        response = query.execute()
+        return response.data if response.data else []
+
+    def count(self, table: str) -> Optional[int]:
+        # Consulta HEAD: solo el total, sin descargar filas
+        response = self.client.table(table).select("id", count="exact", head=True).execute()
+        return response.count
+
+    def insert(self, table: str, rows: Rows) -> List[Dict[str, Any]]:
+        response = self.client.table(table).insert(rows).execute()
+        return response.data or []
+
+    def update(self, table: str, values: Dict[str, Any], filters: Filters) -> List[Dict[str, Any]]:
+        response = self._apply_filters(self.client.table(table).update(values), filters).execute()
+        return response.data or []
+
+    def delete(self, table: str, filters: Filters) -> List[Dict[str, Any]]:
+        response = self._apply_filters(self.client.table(table).delete(), filters).execute()
+        return response.data or []
+
+    def upsert(self, table: str, rows: Rows, on_conflict: str,
+               ignore_duplicates: bool = False) -> List[Dict[str, Any]]:
+        response = self.client.table(table).upsert(
+            rows, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates
+        ).execute()
+        return response.data or []
+
+    def rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        return self.client.rpc(name, params).execute().data
+
+    def warm_up(self) -> None:
+        # Petición HEAD mínima: deja una conexión caliente en el pool
+        self.client.table("modules").select("id", head=True).limit(1).execute()
+
+    def select_module_bundle(self, module_id: int) -> Optional[Dict[str, Any]]:
+        # Incrustación de recursos de PostgREST: módulo, lecciones y quizzes en una respuesta
+        response = (
+            self.client.table("modules")
+            .select("*, lessons(*, quizzes(*))")
+            .eq("id", module_id)
+            .order("order_index", foreign_table="lessons")
+            .order("order_index", foreign_table="lessons.quizzes")
+            .maybe_single()
+            .execute()
+        )
+        return response.data if response else None
@@ -0,0 +1,214 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.paths import user_data_dir
+
+DEFAULT_TTL_SECONDS = 15 * 60
+# Aunque la versión del servidor no cambie, una entrada nunca se sirve sin
+# descargarse de nuevo pasado este tiempo (la versión es solo una huella).
+DEFAULT_MAX_AGE_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+# Evita repetir la consulta de versión de una misma tabla para cada clave.
+VERSION_CHECK_SECONDS = 30
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    table_name: str
+    rows: Any
+    version: Optional[str]
+    fetched_at: float
+    downloaded_at: float
+
+
+class CatalogCache:
+    """Caché persistente (SQLite) de las tablas de catálogo: módulos, lecciones, quizzes y logros.
+
+    Cada entrada guarda el resultado de una consulta bajo una clave. Mientras la
+    entrada está dentro del TTL se sirve sin tocar la red; al vencer se compara
+    la versión del servidor y solo se vuelve a descargar si cambió. Si la red
+    falla se sirven las filas guardadas aunque estén vencidas.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._versions: Dict[str, Tuple[float, Optional[str]]] = {}
+        # Últimos accesos aún sin escribir: get() no toca el disco; se guardan
+        # cuando hacen falta (expulsión LRU) o al cerrar
+        self._accessed: Dict[str, float] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS catalog_entries (
+                key TEXT PRIMARY KEY,
+                table_name TEXT NOT NULL,
+                scope TEXT,
+                payload TEXT NOT NULL,
+                version TEXT,
+                fetched_at REAL NOT NULL,
+                downloaded_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_catalog_entries_table ON catalog_entries(table_name)")
+        self._conn.commit()
+
+    @classmethod
+    def open_default(cls) -> Optional["CatalogCache"]:
+        """Abre la caché en la carpeta de datos del usuario; devuelve None si está desactivada o falla."""
+        if os.environ.get("QUIMICAPRO_CATALOG_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+            return None
+        try:
+            ttl = float(os.environ.get("QUIMICAPRO_CATALOG_TTL", DEFAULT_TTL_SECONDS))
+            path = os.path.join(user_data_dir(), "catalog_cache.sqlite3")
+            return cls(path, ttl_seconds=ttl)
+        except Exception as e:
+            print(f"Catalog cache disabled: {e}")
+            return None
+
+    def close(self):
+        with self._lock:
+            self._write_accesses()
+            self._conn.commit()
+            self._conn.close()
+
+    def _write_accesses(self):
+        if self._accessed:
+            self._conn.executemany("UPDATE catalog_entries SET last_access = ? WHERE key = ?",
+                                   [(at, key) for key, at in self._accessed.items()])
+            self._accessed.clear()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT table_name, payload, version, fetched_at, downloaded_at FROM catalog_entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = self._clock()
+        table_name, payload, version, fetched_at, downloaded_at = row
+        return CacheEntry(key, table_name, json.loads(payload), version, fetched_at, downloaded_at)
+
+    def put(self, key: str, table_name: str, rows: Any, version: Optional[str] = None,
+            scope: Optional[str] = None):
+        payload = json.dumps(rows, ensure_ascii=False)
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO catalog_entries
+                    (key, table_name, scope, payload, version, fetched_at, downloaded_at, last_access, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, table_name, scope, payload, version, now, now, now, len(payload.encode("utf-8"))),
+            )
+            self._accessed.pop(key, None)
+            self._conn.commit()
+            self._enforce_size_limit()
+
+    def touch(self, key: str, version: Optional[str] = None):
+        """Marca una entrada como recién validada sin volver a descargarla."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE catalog_entries SET fetched_at = ?, version = COALESCE(?, version) WHERE key = ?",
+                (self._clock(), version, key),
+            )
+            self._conn.commit()
+
+    def invalidate(self, table_name: Optional[str] = None, key: Optional[str] = None):
+        """Elimina entradas por clave, por tabla o todas si no se indica nada."""
+        with self._lock:
+            if key is not None:
+                self._conn.execute("DELETE FROM catalog_entries WHERE key = ?", (key,))
+            elif table_name is not None:
+                self._conn.execute("DELETE FROM catalog_entries WHERE table_name = ?", (table_name,))
+                self._versions.pop(table_name, None)
+            else:
+                self._conn.execute("DELETE FROM catalog_entries")
+                self._versions.clear()
+            self._conn.commit()
+
+    def total_size(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM catalog_entries").fetchone()
+        return int(row[0])
+
+    def _enforce_size_limit(self):
+        # Expulsa las entradas usadas hace más tiempo hasta quedar bajo el límite
+        total = self.total_size()
+        if total <= self.max_bytes:
+            return
+        self._write_accesses()
+        rows = self._conn.execute("SELECT key, size FROM catalog_entries ORDER BY last_access ASC").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM catalog_entries WHERE key = ?", (key,))
+            total -= size
+        self._conn.commit()
+
+    def _current_version(self, table_name: str,
+                         version_fn: Callable[[str], Optional[str]]) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            checked = self._versions.get(table_name)
+        if checked and now - checked[0] < VERSION_CHECK_SECONDS:
+            return checked[1]
+        version = version_fn(table_name)
+        with self._lock:
+            self._versions[table_name] = (now, version)
+        return version
+
+    def get_or_fetch(self, key: str, table_name: str, fetch: Callable[[], List[Dict[str, Any]]],
+                     version_fn: Optional[Callable[[str], Optional[str]]] = None,
+                     scope: Optional[str] = None) -> List[Dict[str, Any]]:
+        entry = self.get(key)
+        now = self._clock()
+        if entry is not None and now - entry.fetched_at < self.ttl_seconds:
+            return entry.rows
+
+        version = None
+        if entry is not None and version_fn is not None and now - entry.downloaded_at < self.max_age_seconds:
+            try:
+                version = self._current_version(table_name, version_fn)
+            except Exception:
+                # Sin red: mejor filas vencidas que una vista vacía
+                return entry.rows
+            if version is not None and version == entry.version:
+                self.touch(key)
+                return entry.rows
+
+        if version is None and version_fn is not None:
+            # Huella antes de descargar: si la tabla cambia entre medias, la próxima
+            # comprobación verá otra versión y volverá a descargar (nunca al revés)
+            try:
+                version = self._current_version(table_name, version_fn)
+            except Exception:
+                version = None
+        try:
+            rows = fetch()
+        except Exception:
+            if entry is not None:
+                return entry.rows
+            raise
+        self.put(key, table_name, rows, version=version, scope=scope)
+        return rows
@@ -0,0 +1,201 @@
+import os
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from src.backends import DatabaseBackend, SQLiteBackend
+from src.backends.sqlite_backend import CATALOG_TABLES
+from src.pagination import DEFAULT_PAGE_SIZE, iter_keyset
+from src.paths import user_data_dir
+
+DEFAULT_SYNC_INTERVAL = 5 * 60.0
+# Fracción aleatoria del intervalo (±) para que los clientes no consulten a la vez
+DEFAULT_JITTER = 0.2
+# Primera pasada poco después de arrancar, sin competir con el inicio de sesión
+DEFAULT_FIRST_DELAY = 20.0
+# Solape de la consulta "cambiado desde": cubre transacciones que confirman con
+# un now() anterior a la marca ya vista. Reaplicar filas es idempotente.
+WATERMARK_OVERLAP_SECONDS = 60
+# Errores que indican que la migración de updated_at no está aplicada
+MISSING_MIGRATION_ERRORS = {"42703", "42P01", "PGRST204", "PGRST205"}
+
+
+def _shift(timestamp: str, seconds: float) -> str:
+    try:
+        moment = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    except ValueError:
+        return timestamp
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - timedelta(seconds=seconds)).isoformat()
+
+
+class CatalogSync:
+    """Réplica local del catálogo que se actualiza por deltas.
+
+    La primera pasada descarga cada tabla completa; las siguientes piden solo
+    las filas con `updated_at` posterior a la marca de agua guardada y las
+    lápidas de `catalog_deletions` para borrar lo eliminado en el servidor.
+    Las filas se piden por páginas de (updated_at, id) hasta una vacía, y una
+    tabla solo cuenta como completa cuando llegó su última página. Las marcas
+    se guardan junto a la réplica, así que sobreviven a reinicios.
+    """
+
+    def __init__(self, remote: DatabaseBackend, mirror: SQLiteBackend, page_size: int = DEFAULT_PAGE_SIZE):
+        self.remote = remote
+        self.mirror = mirror
+        self.page_size = page_size
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._seeded = {row["table_name"] for row in mirror.select("sync_state", "table_name")}
+
+    @classmethod
+    def open_default(cls, remote: DatabaseBackend) -> Optional["CatalogSync"]:
+        """Réplica en la carpeta de datos del usuario; None si está desactivada o falla."""
+        if os.environ.get("QUIMICAPRO_CATALOG_SYNC", "1").strip().lower() in ("0", "false", "no", "off"):
+            return None
+        try:
+            return cls(remote, SQLiteBackend(os.path.join(user_data_dir(), "catalog_mirror.sqlite3"),
+                                            track_changes=False))
+        except Exception as e:
+            print(f"Catalog sync disabled: {e}")
+            return None
+
+    def close(self):
+        self.mirror.close()
+
+    def is_seeded(self, table: str) -> bool:
+        """True si la réplica tiene la tabla completa y puede servir lecturas."""
+        return self.enabled and table in self._seeded
+
+    def seeded_tables(self) -> Set[str]:
+        """Tablas que sirve la réplica (ver `is_seeded`)."""
+        return set(self._seeded) if self.enabled else set()
+
+    def sync(self) -> Dict[str, int]:
+        """Una pasada por las tablas del catálogo. Devuelve filas cambiadas o borradas por tabla."""
+        if not self.enabled:
+            return {}
+        changed: Dict[str, int] = {}
+        with self._lock:
+            # Altas en orden de dependencias y borrados en orden inverso (claves foráneas)
+            for table in CATALOG_TABLES:
+                try:
+                    count = self._pull_changes(table)
+                except Exception as e:
+                    if getattr(e, "code", None) in MISSING_MIGRATION_ERRORS:
+                        print(f"Catalog delta sync unavailable (missing migration): {e}")
+                        self.enabled = False
+                        return changed
+                    raise
+                if count:
+                    changed[table] = count
+            for table in reversed(CATALOG_TABLES):
+                count = self._pull_deletions(table)
+                if count:
+                    changed[table] = changed.get(table, 0) + count
+        return changed
+
+    def _state(self, table: str) -> Dict[str, Any]:
+        return self.mirror.select("sync_state", filters={"table_name": table}, single=True) or {}
+
+    def _save_state(self, table: str, **values: Any):
+        values["synced_at"] = datetime.now(timezone.utc).isoformat()
+        self.mirror.upsert("sync_state", {"table_name": table, **values}, on_conflict="table_name")
+
+    def _pull_changes(self, table: str) -> int:
+        state = self._state(table)
+        previous = state.get("updated_at")
+        start = ("updated_at", _shift(previous, WATERMARK_OVERLAP_SECONDS)) if previous else None
+        columns = set(self.mirror.columns(table))
+        watermark, received, changed = previous, 0, 0
+        page: List[Dict[str, Any]] = []
+
+        def store():
+            self.mirror.upsert(table, [{k: v for k, v in row.items() if k in columns} for row in page],
+                               on_conflict="id")
+            page.clear()
+
+        # updated_at se repite (p. ej. una migración que toca muchas filas): el id desempata
+        for row in iter_keyset(self.remote, table, key=("updated_at", "id"), page_size=self.page_size,
+                               start=start):
+            page.append(row)
+            received += 1
+            updated_at = row.get("updated_at") or ""
+            watermark = max(watermark or "", updated_at) or None
+            # Reaplicar el solape no cuenta como cambio
+            if not previous or updated_at > previous:
+                changed += 1
+            if len(page) >= self.page_size:
+                store()
+        if page:
+            store()
+        if table not in self._seeded:
+            # Recorrido completo: las lápidas anteriores a la fila más reciente
+            # descargada ya no aplican (hora del servidor; el solape cubre las
+            # transacciones largas)
+            self._save_state(table, updated_at=watermark, deleted_at=watermark)
+            self._seeded.add(table)
+        elif received:
+            self._save_state(table, updated_at=watermark, deleted_at=state.get("deleted_at"))
+        return changed
+
+    def _pull_deletions(self, table: str) -> int:
+        state = self._state(table)
+        watermark = state.get("deleted_at")
+        after = ("deleted_at", _shift(watermark, WATERMARK_OVERLAP_SECONDS)) if watermark else None
+        tombstones = self.remote.select("catalog_deletions", "row_id,deleted_at", {"table_name": table},
+                                        order="deleted_at", after=after)
+        if not tombstones:
+            return 0
+        deleted_at: Dict[Any, str] = {}
+        for tombstone in tombstones:
+            row_id = int(tombstone["row_id"]) if table == "modules" else tombstone["row_id"]
+            deleted_at[row_id] = max(deleted_at.get(row_id, ""), tombstone["deleted_at"])
+        # Un id borrado y vuelto a crear (p. ej. un módulo) conserva la fila nueva
+        current = self.mirror.select(table, "id,updated_at", {"id": list(deleted_at)})
+        ids: List[Any] = [row["id"] for row in current
+                          if (row.get("updated_at") or "") <= deleted_at[row["id"]]]
+        deleted = self.mirror.delete(table, {"id": ids}) if ids else []
+        newest = max(t["deleted_at"] for t in tombstones)
+        self._save_state(table, updated_at=state.get("updated_at"), deleted_at=max(watermark or "", newest))
+        return len(deleted)
+
+
+class CatalogSyncer(threading.Thread):
+    """Hilo que sincroniza el catálogo cada `interval` segundos (± jitter) mientras la app está abierta."""
+
+    def __init__(self, sync: Callable[[], Any], interval: float = DEFAULT_SYNC_INTERVAL,
+                 jitter: float = DEFAULT_JITTER, first_delay: float = DEFAULT_FIRST_DELAY):
+        super().__init__(name="CatalogSyncer", daemon=True)
+        self._sync = sync
+        self.interval = interval
+        self.jitter = jitter
+        self.first_delay = first_delay
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def _next_delay(self, base: float) -> float:
+        return max(1.0, base * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wake.set()
+        self.join(timeout)
+
+    def run(self):
+        delay = self._next_delay(self.first_delay)
+        while not self._stopping.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                self._sync()
+            except Exception as e:
+                print(f"Error in catalog sync: {e}")
+            delay = self._next_delay(self.interval)
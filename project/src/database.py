@@ -1,170 +1,837 @@
 import os
-from typing import Optional, List, Dict, Any
-from supabase import create_client, Client
+import threading
+from concurrent.futures import Future
+from contextlib import nullcontext
+from typing import Optional, List, Dict, Any, Callable, Iterator, TYPE_CHECKING
 from dotenv import load_dotenv
 from datetime import datetime, timezone
+from src.backends import DatabaseBackend, create_backend
+from src.catalog_cache import CatalogCache
+from src.catalog_sync import MISSING_MIGRATION_ERRORS, CatalogSync, CatalogSyncer
+from src.write_queue import WriteQueue, WriteQueueFlusher
+from src.achievement_engine import AchievementEngine
+from src.memo import Memoizer, LRUCache
+from src.pagination import DEFAULT_PAGE_SIZE, iter_keyset
+from src.metrics import instrumented, report_error
+
+if TYPE_CHECKING:
+    from src.session import SessionSnapshot
 
 ENV_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".env"))
 load_dotenv(ENV_PATH)
 
+# Tiempo máximo que una lectura espera a la precarga de la sesión antes de ir a la red
+SESSION_WAIT_SECONDS = 15.0
+# TTL de la memoización de lecturas por usuario y de filas sueltas del catálogo
+USER_DATA_TTL_SECONDS = 10.0
+CATALOG_ROW_TTL_SECONDS = 60.0
+# Tipos memoizados que dependen del alumno: se descartan al cerrar sesión
+USER_MEMO_KINDS = ("progress", "achievements", "completion", "stats")
+
+# Proyecciones: solo las columnas que pintan las listas. El HTML de las
+# lecciones (`content`) se pide aparte al abrir cada una (get_lesson_content).
+LESSON_CARD_COLUMNS = "id,module_id,title,order_index,estimated_minutes"
+PROGRESS_COLUMNS = "lesson_id,completed,score,completed_at"
+USER_ACHIEVEMENT_COLUMNS = "achievement_id,earned_at"
+LESSON_CONTENT_CACHE_ENTRIES = 32
+
 class Database:
-    def __init__(self):
-        # Permitir variables estándar y compatibilidad con NEXT_PUBLIC_* (usadas en proyectos web)
-        url: str = os.environ.get("SUPABASE_URL") or os.environ.get("NEXT_PUBLIC_SUPABASE_URL")
-        key: str = os.environ.get("SUPABASE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-        if not url or not key:
-            raise RuntimeError(
-                "Configuración de Supabase incompleta: asegúrate de definir SUPABASE_URL y SUPABASE_KEY en el archivo .env."
-            )
-        self.supabase: Client = create_client(url, key)
+    def __init__(self, backend: Optional[DatabaseBackend] = None):
+        # Almacenamiento de los datos: Supabase o SQLite local (ver src/backends)
+        self.backend: DatabaseBackend = backend or create_backend()
+        # Credenciales y cliente de Supabase; None con un backend local
+        self.url: Optional[str] = getattr(self.backend, "url", None)
+        self.key: Optional[str] = getattr(self.backend, "key", None)
+        self.supabase = getattr(self.backend, "client", None)
         self.current_user_id: Optional[str] = None
+        # Variante asíncrona creada a demanda (ver src/async_database.py)
+        self._async_db = None
+        # Caché local del catálogo y cola de escrituras: innecesarias si los datos ya son locales
+        local = self.backend.is_local
+        # Caché local del catálogo (módulos, lecciones, quizzes, logros); None si está desactivada.
+        # Solo guarda las tablas que la réplica de abajo aún no sirve: nunca hay dos copias
+        self.catalog_cache: Optional[CatalogCache] = None if local else CatalogCache.open_default()
+        # Réplica del catálogo actualizada por deltas (updated_at); sirve las lecturas una vez completa
+        self.catalog_sync: Optional[CatalogSync] = None if local else CatalogSync.open_default(self.backend)
+        if self.catalog_sync is not None:
+            self._drop_cached_mirror_tables(self.catalog_sync.seeded_tables())
+        self._catalog_syncer: Optional[CatalogSyncer] = None
+        self._bulk_completion_rpc = True
+        self._submit_quiz_rpc = True
+        self._dashboard_stats_rpc = True
+        # Cola local de escrituras de progreso/logros que se vacía en segundo plano
+        self.write_queue: Optional[WriteQueue] = None if local else WriteQueue.open_default()
+        self._write_flusher: Optional[WriteQueueFlusher] = None
+        # Motores de logros por usuario (estado incremental, ver src/achievement_engine.py)
+        self._achievement_engines: Dict[str, AchievementEngine] = {}
+        self._engines_lock = threading.Lock()
+        # Sesión precargada al iniciar sesión (ver src/session.py)
+        self._session_user: Optional[str] = None
+        self._session_future: Optional[Future] = None
+        # Escrituras hechas mientras la precarga seguía en curso; se aplican al leerla
+        self._session_writes: List[Callable[["SessionSnapshot"], None]] = []
+        self._session_lock = threading.Lock()
+        # Lecturas recientes compartidas entre vistas; las escrituras invalidan por etiqueta
+        self._memo = Memoizer(ttl=USER_DATA_TTL_SECONDS)
+        # HTML de las lecciones abiertas recientemente
+        self._lesson_content = LRUCache(max_entries=LESSON_CONTENT_CACHE_ENTRIES)
+
+    def _catalog_source(self, *tables: str) -> DatabaseBackend:
+        # La réplica local, si ya tiene completas las tablas; si no, el backend
+        if self.catalog_sync is not None and all(self.catalog_sync.is_seeded(t) for t in tables):
+            return self.catalog_sync.mirror
+        return self.backend
+
+    def _drop_cached_mirror_tables(self, tables):
+        # Una sola copia en disco por tabla: lo que ya sirve la réplica sale de la caché
+        if self.catalog_cache is not None:
+            for table in tables:
+                self.catalog_cache.invalidate(table)
+
+    def _persists(self, table: str) -> bool:
+        """True si las lecturas de `table` se guardan en la caché en disco (la réplica aún no la sirve)."""
+        return self.catalog_cache is not None and self._catalog_source(table) is self.backend
+
+    def _catalog(self, key: str, table: str, fetch, scope: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Lectura de catálogo; `fetch(source)` consulta el backend que se le pase."""
+        source = self._catalog_source(table)
+        if source is not self.backend or self.catalog_cache is None:
+            return fetch(source)
+        return self.catalog_cache.get_or_fetch(key, table, lambda: fetch(source),
+                                               version_fn=self._catalog_version, scope=scope)
+
+    @instrumented
+    def _catalog_version(self, table: str) -> Optional[str]:
+        # Huella de la tabla: el updated_at más reciente (el trigger lo mueve en cada
+        # edición) y el número de filas, que cubre los borrados. Sin la columna no hay
+        # versión y la entrada se vuelve a descargar cada vez que vence el TTL
+        try:
+            latest = self.backend.select(table, "updated_at", order="updated_at", desc=True, limit=1)
+        except Exception as e:
+            if getattr(e, "code", None) in MISSING_MIGRATION_ERRORS:
+                return None
+            raise
+        count = self.backend.count(table)
+        if count is None:
+            return None
+        return f"{count}:{latest[0]['updated_at'] if latest else ''}"
+
+    def _memoized(self, key: tuple, fetch, user_id: Optional[str] = None, ttl: Optional[float] = None):
+        # Etiquetas "<tipo>" y "<tipo>:<user_id>" para invalidar por usuario o en bloque
+        kind = key[0]
+        tags = (kind, f"{kind}:{user_id}") if user_id is not None else (kind,)
+        return self._memo.get_or_call(key, fetch, ttl=ttl, tags=tags)
+
+    def _invalidate_user(self, user_id: str, *kinds: str):
+        self._memo.invalidate(*(f"{kind}:{user_id}" for kind in kinds))
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Contadores de aciertos/fallos de la memoización (para diagnóstico)."""
+        return self._memo.stats()
 
+    def invalidate_catalog_cache(self, table: Optional[str] = None):
+        if self.catalog_cache is not None:
+            self.catalog_cache.invalidate(table)
+
+    @instrumented
+    def warm_up(self) -> bool:
+        """Abre la conexión con el servidor antes de que la necesiten las vistas (al iniciar sesión)."""
+        try:
+            self.backend.warm_up()
+            return True
+        except Exception as e:
+            report_error("Error warming up connection", e)
+            return False
+
+    @instrumented
     def create_user(self, username: str, display_name: str) -> Optional[Dict[str, Any]]:
         try:
-            response = self.supabase.table("app_users").insert({
+            rows = self.backend.insert("app_users", {
                 "username": username,
                 "display_name": display_name
-            }).execute()
+            })
 
-            if response.data:
-                return response.data[0]
+            if rows:
+                return rows[0]
             return None
         except Exception as e:
-            print(f"Error creating user: {e}")
+            report_error("Error creating user", e)
             return None
 
+    @instrumented
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         try:
-            response = self.supabase.table("app_users").select("*").eq("username", username).maybe_single().execute()
-            return response.data
+            return self.backend.select("app_users", filters={"username": username}, single=True)
         except Exception as e:
-            print(f"Error getting user: {e}")
+            report_error("Error getting user", e)
             return None
 
+    @instrumented
     def update_last_login(self, user_id: str) -> bool:
         try:
-            self.supabase.table("app_users").update({
+            self.backend.update("app_users", {
                 "last_login": datetime.now(timezone.utc).isoformat()
-            }).eq("id", user_id).execute()
+            }, {"id": user_id})
             return True
         except Exception as e:
-            print(f"Error updating last login: {e}")
+            report_error("Error updating last login", e)
             return False
 
-    def get_all_modules(self) -> List[Dict[str, Any]]:
+    @instrumented
+    def get_all_modules(self, *, strict: bool = False) -> List[Dict[str, Any]]:
+        """Módulos en orden. Ante un error devuelve [], o lo propaga con `strict`
+        (para que una vista distinga "falló la carga" de "no hay módulos")."""
+        def fetch(source):
+            return source.select("modules", order="order_index")
+        snapshot = self.session_snapshot(self._session_user, wait=False)
+        if snapshot is not None and snapshot.modules:
+            return list(snapshot.modules)
         try:
-            response = self.supabase.table("modules").select("*").order("order_index").execute()
-            return response.data if response.data else []
+            return self._catalog("modules", "modules", fetch)
         except Exception as e:
-            print(f"Error getting modules: {e}")
+            report_error("Error getting modules", e)
+            if strict:
+                raise
             return []
 
+    @instrumented
     def get_module_by_id(self, module_id: int) -> Optional[Dict[str, Any]]:
+        def fetch():
+            return self._catalog_source("modules").select("modules", filters={"id": module_id}, single=True)
         try:
-            response = self.supabase.table("modules").select("*").eq("id", module_id).maybe_single().execute()
-            return response.data
+            return self._memoized(("module", module_id), fetch, ttl=CATALOG_ROW_TTL_SECONDS)
         except Exception as e:
-            print(f"Error getting module by id: {e}")
+            report_error("Error getting module by id", e)
             return None
 
+    @instrumented
     def get_lessons_by_module(self, module_id: int) -> List[Dict[str, Any]]:
+        def fetch(source):
+            return source.select("lessons", LESSON_CARD_COLUMNS, {"module_id": module_id}, order="order_index")
         try:
-            response = self.supabase.table("lessons").select("*").eq("module_id", module_id).order("order_index").execute()
-            return response.data if response.data else []
+            return list(self._memoized(
+                ("lesson_cards", module_id),
+                lambda: self._catalog(f"lesson_cards:module={module_id}", "lessons", fetch, scope=str(module_id)),
+                ttl=CATALOG_ROW_TTL_SECONDS,
+            ))
         except Exception as e:
-            print(f"Error getting lessons: {e}")
+            report_error("Error getting lessons", e)
             return []
 
+    @instrumented
     def get_lesson_by_id(self, lesson_id: str) -> Optional[Dict[str, Any]]:
+        def fetch():
+            return self._catalog_source("lessons").select("lessons", filters={"id": lesson_id}, single=True)
         try:
-            response = self.supabase.table("lessons").select("*").eq("id", lesson_id).maybe_single().execute()
-            return response.data
+            return self._memoized(("lesson", lesson_id), fetch, ttl=CATALOG_ROW_TTL_SECONDS)
         except Exception as e:
-            print(f"Error getting lesson: {e}")
+            report_error("Error getting lesson", e)
             return None
 
+    @instrumented
+    def get_lesson_content(self, lesson_id: str) -> Optional[str]:
+        """HTML de una lección; se descarga al abrirla y se guarda en una caché LRU."""
+        content = self._lesson_content.get(lesson_id)
+        if content is not None:
+            return content
+
+        def fetch():
+            row = self._catalog_source("lessons").select("lessons", "content", {"id": lesson_id}, single=True)
+            return (row or {}).get("content")
+        try:
+            content = self._memoized(("lesson_content", lesson_id), fetch, ttl=0)
+        except Exception as e:
+            report_error("Error getting lesson content", e)
+            return None
+        if content is not None:
+            self._lesson_content.put(lesson_id, content)
+        return content
+
+    def peek_lesson_content(self, lesson_id: str) -> Optional[str]:
+        """HTML de la lección solo si ya está en memoria (precargado); nunca va a la red."""
+        return self._lesson_content.get(lesson_id)
+
+    def peek_quizzes(self, lesson_id: str) -> Optional[List[Dict[str, Any]]]:
+        """Quizzes de la lección solo si ya están en memoria; nunca va a la red."""
+        quizzes = self._memo.peek(("quizzes", lesson_id))
+        return list(quizzes) if quizzes is not None else None
+
+    @instrumented
     def get_quizzes_by_lesson(self, lesson_id: str) -> List[Dict[str, Any]]:
+        def fetch(source):
+            return source.select("quizzes", filters={"lesson_id": lesson_id}, order="order_index")
         try:
-            response = self.supabase.table("quizzes").select("*").eq("lesson_id", lesson_id).order("order_index").execute()
-            return response.data if response.data else []
+            return list(self._memoized(
+                ("quizzes", lesson_id),
+                lambda: self._catalog(f"quizzes:lesson={lesson_id}", "quizzes", fetch, scope=str(lesson_id)),
+                ttl=CATALOG_ROW_TTL_SECONDS,
+            ))
         except Exception as e:
-            print(f"Error getting quizzes: {e}")
+            report_error("Error getting quizzes", e)
             return []
 
+    @instrumented
+    def get_module_bundle(self, module_id: int) -> Optional[Dict[str, Any]]:
+        """Módulo con sus lecciones ordenadas y los quizzes de cada una, en una sola consulta.
+
+        Rellena las cachés de get_module_by_id, get_lessons_by_module,
+        get_lesson_by_id, get_lesson_content y get_quizzes_by_lesson, de modo
+        que navegar dentro del módulo ya no necesita más lecturas.
+        """
+        source = self._catalog_source("modules", "lessons", "quizzes")
+
+        def fetch():
+            bundle = source.select_module_bundle(module_id)
+            if bundle is not None:
+                self._fill_from_bundle(module_id, bundle)
+            return bundle
+        try:
+            return self._memoized(("module_bundle", module_id), fetch, ttl=CATALOG_ROW_TTL_SECONDS)
+        except Exception as e:
+            report_error("Error getting module bundle", e)
+            return None
+
+    def _fill_from_bundle(self, module_id: int, bundle: Dict[str, Any]):
+        ttl = CATALOG_ROW_TTL_SECONDS
+        lessons = bundle.get("lessons") or []
+        card_columns = LESSON_CARD_COLUMNS.split(",")
+        cards = [{c: lesson.get(c) for c in card_columns} for lesson in lessons]
+        self._memo.put(("module", module_id), {k: v for k, v in bundle.items() if k != "lessons"}, ttl, ("module",))
+        self._memo.put(("lesson_cards", module_id), cards, ttl, ("lesson_cards",))
+        for lesson in lessons:
+            lesson_id = lesson["id"]
+            quizzes = lesson.get("quizzes") or []
+            row = {k: v for k, v in lesson.items() if k != "quizzes"}
+            self._memo.put(("lesson", lesson_id), row, ttl, ("lesson",))
+            self._memo.put(("quizzes", lesson_id), quizzes, ttl, ("quizzes",))
+            if row.get("content") is not None:
+                self._lesson_content.put(lesson_id, row["content"])
+            if self._persists("quizzes"):
+                self.catalog_cache.put(f"quizzes:lesson={lesson_id}", "quizzes", quizzes, scope=str(lesson_id))
+        if self._persists("lessons"):
+            self.catalog_cache.put(f"lesson_cards:module={module_id}", "lessons", cards, scope=str(module_id))
+
+    @instrumented
     def get_user_progress(self, user_id: str) -> List[Dict[str, Any]]:
+        snapshot = self.session_snapshot(user_id)
+        if snapshot is not None:
+            return snapshot.progress()
+        def fetch():
+            return self.backend.select("user_progress", PROGRESS_COLUMNS, {"user_id": user_id})
         try:
-            response = self.supabase.table("user_progress").select("*").eq("user_id", user_id).execute()
-            return response.data if response.data else []
+            rows = list(self._memoized(("progress", user_id), fetch, user_id))
         except Exception as e:
-            print(f"Error getting user progress: {e}")
-            return []
+            report_error("Error getting user progress", e)
+            rows = []
+        return self.with_pending_progress(user_id, rows)
+
+    def iter_user_progress(self, user_id: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Progreso del usuario en páginas por lesson_id, sin cargarlo entero en memoria.
+
+        Lee directamente del servidor (sin caché ni cola local) y propaga los
+        errores; pensado para scripts y análisis, no para las vistas.
+        """
+        return iter_keyset(self.backend, "user_progress", PROGRESS_COLUMNS, {"user_id": user_id},
+                           key="lesson_id", page_size=page_size)
+
+    def iter_user_achievements(self, user_id: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        return iter_keyset(self.backend, "user_achievements", USER_ACHIEVEMENT_COLUMNS, {"user_id": user_id},
+                           key="achievement_id", page_size=page_size)
 
+    def iter_table(self, table: str, columns: str = "*", filters: Optional[Dict[str, Any]] = None,
+                   key: str = "id", page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Recorre una tabla completa (p. ej. user_progress de todos los alumnos) página a página."""
+        return iter_keyset(self.backend, table, columns, filters, key=key, page_size=page_size)
+
+    @instrumented
     def save_lesson_progress(self, user_id: str, lesson_id: str, completed: bool, score: int) -> bool:
         try:
-            response = self.supabase.table("user_progress").upsert({
+            self.backend.upsert("user_progress", {
                 "user_id": user_id,
                 "lesson_id": lesson_id,
                 "completed": completed,
                 "score": score,
                 "completed_at": datetime.now(timezone.utc).isoformat()
-            }).execute()
+            }, on_conflict="user_id,lesson_id")
+            self._invalidate_user(user_id, "progress", "completion")
+            self._session_apply_progress(user_id, lesson_id, completed, score)
             return True
         except Exception as e:
-            print(f"Error saving progress: {e}")
+            report_error("Error saving progress", e)
             return False
 
-    def get_all_achievements(self) -> List[Dict[str, Any]]:
+    @instrumented
+    def submit_quiz(self, user_id: str, lesson_id: str, score: int) -> Optional[List[Dict[str, Any]]]:
+        """Guarda el resultado y otorga los logros en el servidor con una sola llamada.
+
+        Devuelve los logros recién desbloqueados, o None si la RPC no está
+        disponible (sin red o migración sin aplicar) para que el llamador use
+        el flujo local.
+        """
+        if not self._submit_quiz_rpc:
+            return None
+        # Sin vaciados de la cola entre la RPC y el descarte: un progreso antiguo de
+        # esta lección (p. ej. en backoff) no debe llegar después y pisar el nuevo
+        with (self.write_queue.paused() if self.write_queue is not None else nullcontext()):
+            try:
+                awarded = self.backend.rpc("submit_quiz", {
+                    "p_user_id": user_id,
+                    "p_lesson_id": lesson_id,
+                    "p_score": score
+                }) or []
+            except Exception as e:
+                report_error("Error submitting quiz", e)
+                # PGRST202: la función no existe en el servidor; no volver a intentarlo
+                if getattr(e, "code", None) == "PGRST202":
+                    self._submit_quiz_rpc = False
+                return None
+            if self.write_queue is not None:
+                try:
+                    self.write_queue.discard_progress(user_id, lesson_id)
+                except Exception as e:
+                    report_error("Error discarding superseded progress", e)
+        self._invalidate_user(user_id, "progress", "completion", "achievements")
+        self._session_apply_progress(user_id, lesson_id, True, score)
+        for achievement in awarded:
+            self._session_apply_achievement(user_id, achievement["id"])
+        # Mantener al día el motor local, si ya está construido
+        engine = self._achievement_engines.get(user_id)
+        if engine is not None:
+            engine.record_lesson(lesson_id, score)
+            engine.mark_earned(a["id"] for a in awarded)
+        return awarded
+
+    @instrumented
+    def queue_lesson_progress(self, user_id: str, lesson_id: str, completed: bool, score: int) -> bool:
+        """Acepta el progreso al instante en la cola local; se envía en el próximo vaciado."""
+        if self.write_queue is None:
+            return self.save_lesson_progress(user_id, lesson_id, completed, score)
         try:
-            response = self.supabase.table("achievements").select("*").execute()
-            return response.data if response.data else []
+            row = self.write_queue.enqueue_progress(user_id, lesson_id, completed, score)
         except Exception as e:
-            print(f"Error getting achievements: {e}")
-            return []
+            report_error("Error queueing progress", e)
+            return self.save_lesson_progress(user_id, lesson_id, completed, score)
+        self._invalidate_user(user_id, "progress", "completion")
+        self._session_apply_progress(user_id, lesson_id, completed, score, row["completed_at"])
+        self._wake_write_flusher()
+        return True
+
+    @instrumented
+    def queue_achievement(self, user_id: str, achievement_id: str) -> bool:
+        return achievement_id in self.queue_achievements(user_id, [achievement_id])
+
+    @instrumented
+    def queue_achievements(self, user_id: str, achievement_ids: List[str]) -> List[str]:
+        """Como queue_achievement para varios logros; devuelve los ids aceptados."""
+        if self.write_queue is None:
+            return self.award_achievements(user_id, achievement_ids)
+        queued, failed = [], []
+        for achievement_id in achievement_ids:
+            try:
+                self.write_queue.enqueue_achievement(user_id, achievement_id)
+                queued.append(achievement_id)
+            except Exception as e:
+                report_error("Error queueing achievement", e)
+                failed.append(achievement_id)
+        if queued:
+            self._invalidate_user(user_id, "achievements")
+            for achievement_id in queued:
+                self._session_apply_achievement(user_id, achievement_id)
+            self._wake_write_flusher()
+        if failed:
+            queued += self.award_achievements(user_id, failed)
+        return queued
+
+    @instrumented
+    def flush_pending_writes(self) -> bool:
+        """Envía la cola local en un upsert por tabla. Devuelve True si quedó vacía."""
+        if self.write_queue is None:
+            return True
+        had_pending = self.write_queue.pending_count() > 0
+        flushed = self.write_queue.flush(self._upsert_progress_batch, self._upsert_achievement_batch)
+        if had_pending:
+            # La cola no distingue usuarios al vaciarse: invalidar en bloque
+            self._memo.invalidate("progress", "completion", "achievements")
+        return flushed
+
+    @instrumented
+    def _upsert_progress_batch(self, rows: List[Dict[str, Any]]):
+        self.backend.upsert("user_progress", rows, on_conflict="user_id,lesson_id")
 
-    def get_user_achievements(self, user_id: str) -> List[Dict[str, Any]]:
+    @instrumented
+    def _upsert_achievement_batch(self, rows: List[Dict[str, Any]]):
+        self.backend.upsert("user_achievements", rows, on_conflict="user_id,achievement_id", ignore_duplicates=True)
+
+    @instrumented
+    def sync_catalog(self) -> Dict[str, int]:
+        """Trae los cambios del catálogo desde la última pasada y descarta lo que quedó viejo."""
+        if self.catalog_sync is None:
+            return {}
+        seeded = self.catalog_sync.seeded_tables()
         try:
-            response = self.supabase.table("user_achievements").select("*, achievements(*)").eq("user_id", user_id).execute()
-            return response.data if response.data else []
+            changed = self.catalog_sync.sync()
+        finally:
+            # Las tablas recién completadas pasan a leerse de la réplica
+            self._drop_cached_mirror_tables(self.catalog_sync.seeded_tables() - seeded)
+        if changed:
+            self._memo.invalidate("module", "lesson", "lesson_content", "lesson_cards", "quizzes",
+                                  "module_bundle", "completion")
+            self._lesson_content.clear()
+            self.reset_achievement_engines()
+            snapshot = self.session_snapshot(self._session_user, wait=False)
+            if snapshot is not None:
+                mirror = self.catalog_sync.mirror
+                snapshot.replace_catalog(
+                    mirror.select("modules", order="order_index"),
+                    mirror.select("achievements"),
+                    {row["id"]: row["module_id"] for row in mirror.select("lessons", "id,module_id")},
+                )
+        return changed
+
+    def start_catalog_sync(self):
+        if self.catalog_sync is None or self._catalog_syncer is not None:
+            return
+        interval = float(os.environ.get("QUIMICAPRO_CATALOG_SYNC_SECONDS", 0) or 0)
+        self._catalog_syncer = CatalogSyncer(self.sync_catalog, **({"interval": interval} if interval > 0 else {}))
+        self._catalog_syncer.start()
+
+    def stop_catalog_sync(self):
+        if self._catalog_syncer is not None:
+            self._catalog_syncer.stop()
+            self._catalog_syncer = None
+
+    def start_write_flusher(self):
+        if self.write_queue is None or self._write_flusher is not None:
+            return
+        self._write_flusher = WriteQueueFlusher(self.flush_pending_writes, self.write_queue)
+        self._write_flusher.start()
+
+    def stop_write_flusher(self):
+        if self._write_flusher is not None:
+            self._write_flusher.stop()
+            self._write_flusher = None
+
+    def _wake_write_flusher(self):
+        if self._write_flusher is not None:
+            self._write_flusher.wake()
+
+    def with_pending_progress(self, user_id: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Superpone a `rows` el progreso aún en cola, para que la UI lo vea antes de que llegue al servidor."""
+        if self.write_queue is None:
+            return rows
+        try:
+            pending = self.write_queue.pending_progress(user_id)
+        except Exception:
+            return rows
+        if not pending:
+            return rows
+        pending_ids = {p["lesson_id"] for p in pending}
+        return [r for r in rows if r.get("lesson_id") not in pending_ids] + pending
+
+    @instrumented
+    def get_all_achievements(self, *, strict: bool = False) -> List[Dict[str, Any]]:
+        """Catálogo de logros; `strict` como en get_all_modules."""
+        def fetch(source):
+            return source.select("achievements")
+        snapshot = self.session_snapshot(self._session_user, wait=False)
+        if snapshot is not None and snapshot.achievements:
+            return list(snapshot.achievements)
+        try:
+            return self._catalog("achievements", "achievements", fetch)
         except Exception as e:
-            print(f"Error getting user achievements: {e}")
+            report_error("Error getting achievements", e)
+            if strict:
+                raise
             return []
 
-    def award_achievement(self, user_id: str, achievement_id: str) -> bool:
+    @instrumented
+    def get_user_achievements(self, user_id: str, *, strict: bool = False) -> List[Dict[str, Any]]:
+        """Logros obtenidos (incluidos los aún en cola); `strict` como en get_all_modules."""
+        snapshot = self.session_snapshot(user_id)
+        if snapshot is not None:
+            return snapshot.user_achievements()
+        def fetch():
+            # Sin incrustar achievements(*): el catálogo ya está en caché
+            return self.backend.select("user_achievements", USER_ACHIEVEMENT_COLUMNS, {"user_id": user_id})
+        try:
+            rows = list(self._memoized(("achievements", user_id), fetch, user_id))
+        except Exception as e:
+            report_error("Error getting user achievements", e)
+            if strict:
+                raise
+            rows = []
+        return self.with_pending_achievements(user_id, rows)
+
+    def with_pending_achievements(self, user_id: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Como with_pending_progress, para los logros aún en cola."""
+        if self.write_queue is None:
+            return rows
         try:
-            existing = self.supabase.table("user_achievements").select("*").eq("user_id", user_id).eq("achievement_id", achievement_id).maybe_single().execute()
+            pending = self.write_queue.pending_achievements(user_id)
+        except Exception:
+            return rows
+        earned = {r.get("achievement_id") for r in rows}
+        return rows + [p for p in pending if p["achievement_id"] not in earned]
 
-            if existing.data:
-                return False
+    @instrumented
+    def get_achievement_engine(self, user_id: str) -> AchievementEngine:
+        """Motor de logros del usuario; se construye una vez por sesión."""
+        with self._engines_lock:
+            engine = self._achievement_engines.get(user_id)
+            if engine is None:
+                lesson_modules = self.get_lesson_modules()
+                earned_ids = [ua["achievement_id"] for ua in self.get_user_achievements(user_id)]
+                engine = AchievementEngine(self.get_all_achievements(), self.get_user_progress(user_id),
+                                           lesson_modules, earned_ids)
+                self._achievement_engines[user_id] = engine
+            return engine
 
-            self.supabase.table("user_achievements").insert({
-                "user_id": user_id,
-                "achievement_id": achievement_id
-            }).execute()
-            return True
+    def attach_session(self, user_id: str, future: Future):
+        """Asocia la precarga en curso de la sesión de `user_id` (un Future de SessionSnapshot)."""
+        with self._session_lock:
+            self._session_user = user_id
+            self._session_future = future
+            self._session_writes = []
+
+    def end_session(self):
+        """Descarta la sesión precargada y el estado por usuario (al cerrar sesión).
+
+        El catálogo memoizado (módulos, lecciones, quizzes) es el mismo para
+        todos los alumnos y se conserva: el siguiente en entrar lo lee caliente.
+        """
+        with self._session_lock:
+            future = self._session_future
+            self._session_user = None
+            self._session_future = None
+            self._session_writes = []
+        if future is not None:
+            future.cancel()
+        self._memo.invalidate(*USER_MEMO_KINDS)
+        self.reset_achievement_engines()
+
+    def session_snapshot(self, user_id: Optional[str], wait: bool = True) -> Optional["SessionSnapshot"]:
+        """Sesión precargada de `user_id`, o None si no hay (o falló su descarga).
+
+        Con `wait` se espera a que termine la precarga; llamar solo desde hilos
+        de trabajo, nunca desde el de la interfaz.
+        """
+        future = self._session_future
+        if future is None or user_id is None or user_id != self._session_user:
+            return None
+        if not wait and not future.done():
+            return None
+        try:
+            snapshot = future.result(timeout=SESSION_WAIT_SECONDS)
         except Exception as e:
-            print(f"Error awarding achievement: {e}")
-            return False
+            report_error("Session prefetch unavailable, reading from network", e)
+            with self._session_lock:
+                if self._session_future is future:
+                    self._session_future = None
+                    self._session_writes = []
+            return None
+        with self._session_lock:
+            if self._session_future is future:
+                writes, self._session_writes = self._session_writes, []
+                for apply in writes:
+                    apply(snapshot)
+        return snapshot
 
-    def get_module_completion(self, user_id: str, module_id: int) -> Dict[str, Any]:
+    def _session_apply(self, user_id: str, apply: Callable[["SessionSnapshot"], None]):
+        """Refleja una escritura en la sesión precargada sin esperar a que termine de bajar.
+
+        Si la precarga sigue en curso, el cambio queda anotado y se aplica en la
+        primera lectura de la sesión (la descarga pudo leer el servidor antes de
+        la escritura): guardar un cuestionario nunca espera a la precarga.
+        """
+        with self._session_lock:
+            future = self._session_future
+            if future is None or user_id is None or user_id != self._session_user:
+                return
+            if not future.done():
+                self._session_writes.append(apply)
+                return
+        snapshot = self.session_snapshot(user_id, wait=False)
+        if snapshot is not None:
+            apply(snapshot)
+
+    def _session_apply_progress(self, user_id: str, lesson_id: str, completed: bool, score: int,
+                                completed_at: Optional[str] = None):
+        self._session_apply(user_id, lambda snapshot: snapshot.apply_progress(lesson_id, completed, score,
+                                                                              completed_at))
+
+    def _session_apply_achievement(self, user_id: str, achievement_id: str):
+        self._session_apply(user_id, lambda snapshot: snapshot.apply_achievement(achievement_id))
+
+    def reset_achievement_engines(self):
+        with self._engines_lock:
+            self._achievement_engines.clear()
+
+    @instrumented
+    def award_achievement(self, user_id: str, achievement_id: str) -> bool:
+        return achievement_id in self.award_achievements(user_id, [achievement_id])
+
+    @instrumented
+    def award_achievements(self, user_id: str, achievement_ids: List[str]) -> List[str]:
+        """Otorga varios logros en un solo upsert y devuelve los ids que eran nuevos.
+
+        La restricción única (user_id, achievement_id) hace que los ya obtenidos
+        se ignoren en el servidor: sin consulta previa ni duplicados por carreras.
+        """
+        rows = [{"user_id": user_id, "achievement_id": a} for a in dict.fromkeys(achievement_ids)]
+        if not rows:
+            return []
         try:
+            inserted = self.backend.upsert("user_achievements", rows,
+                                           on_conflict="user_id,achievement_id", ignore_duplicates=True)
+        except Exception as e:
+            report_error("Error awarding achievement", e)
+            return []
+        awarded = [row["achievement_id"] for row in inserted]
+        if awarded:
+            self._invalidate_user(user_id, "achievements")
+            for achievement_id in awarded:
+                self._session_apply_achievement(user_id, achievement_id)
+        return awarded
+
+    @instrumented
+    def get_module_completion(self, user_id: str, module_id: int) -> Dict[str, Any]:
+        snapshot = self.session_snapshot(user_id)
+        if snapshot is not None:
+            return snapshot.module_completion(module_id)
+        def fetch():
             lessons = self.get_lessons_by_module(module_id)
             total_lessons = len(lessons)
 
             if total_lessons == 0:
-                return {"completed": 0, "total": 0, "percentage": 0}
+                return self._completion(0, 0)
 
             lesson_ids = [lesson["id"] for lesson in lessons]
 
-            progress = self.supabase.table("user_progress").select("*").eq("user_id", user_id).eq("completed", True).in_("lesson_id", lesson_ids).execute()
+            progress = self.backend.select("user_progress", "lesson_id",
+                                           {"user_id": user_id, "completed": True, "lesson_id": lesson_ids})
 
-            completed_count = len(progress.data) if progress.data else 0
-            percentage = int((completed_count / total_lessons) * 100)
+            completed_count = len(progress)
+            return self._completion(completed_count, total_lessons)
+        try:
+            return dict(self._memoized(("completion", user_id, module_id), fetch, user_id))
+        except Exception as e:
+            report_error("Error getting module completion", e)
+            return self._completion(0, 0)
+
+    @instrumented
+    def get_all_module_completion(self, user_id: str) -> Dict[int, Dict[str, Any]]:
+        """Completitud de todos los módulos del usuario, indexada por module_id.
+
+        Usa la función RPC get_module_completion_bulk (una sola llamada). Si la
+        migración aún no está aplicada, cae a dos consultas: mapa lección→módulo
+        (cacheado como catálogo) y lecciones completadas del usuario.
+        """
+        snapshot = self.session_snapshot(user_id)
+        if snapshot is not None:
+            return snapshot.completions()
+        return self._fetch_all_module_completion(user_id)
 
-            return {
-                "completed": completed_count,
-                "total": total_lessons,
-                "percentage": percentage
-            }
+    def _fetch_all_module_completion(self, user_id: str) -> Dict[int, Dict[str, Any]]:
+        try:
+            return dict(self._memoized(("completion", user_id), lambda: self._query_all_module_completion(user_id), user_id))
         except Exception as e:
-            print(f"Error getting module completion: {e}")
-            return {"completed": 0, "total": 0, "percentage": 0}
+            report_error("Error getting module completion", e)
+            return {}
+
+    @instrumented
+    def _query_all_module_completion(self, user_id: str) -> Dict[int, Dict[str, Any]]:
+        if self._bulk_completion_rpc:
+            try:
+                rows = self.backend.rpc("get_module_completion_bulk", {"p_user_id": user_id})
+                return {
+                    row["module_id"]: self._completion(row["completed"], row["total"])
+                    for row in (rows or [])
+                }
+            except Exception as e:
+                report_error("Bulk completion RPC failed, using fallback", e)
+                # PGRST202: la función no existe en el servidor; otros errores (red,
+                # 5xx) solo usan la alternativa en esta llamada
+                if getattr(e, "code", None) == "PGRST202":
+                    self._bulk_completion_rpc = False
+
+        lessons = self._lesson_module_rows()
+        progress = self.backend.select("user_progress", "lesson_id", {"user_id": user_id, "completed": True})
+        completed_ids = {p["lesson_id"] for p in progress}
+
+        totals: Dict[int, int] = {}
+        completed: Dict[int, int] = {}
+        for lesson in lessons:
+            module_id = lesson["module_id"]
+            totals[module_id] = totals.get(module_id, 0) + 1
+            if lesson["id"] in completed_ids:
+                completed[module_id] = completed.get(module_id, 0) + 1
+
+        return {module_id: self._completion(completed.get(module_id, 0), total)
+                for module_id, total in totals.items()}
+
+    @instrumented
+    def _lesson_module_rows(self) -> List[Dict[str, Any]]:
+        def fetch(source):
+            return source.select("lessons", "id,module_id")
+
+        return self._catalog("lessons:module_map", "lessons", fetch)
+
+    def get_lesson_modules(self) -> Dict[str, int]:
+        """Mapa lección → módulo de todo el catálogo (cacheado como catálogo); propaga los errores."""
+        return {row["id"]: row["module_id"] for row in self._lesson_module_rows()}
+
+    @instrumented
+    def get_dashboard_stats(self, user_id: str) -> Dict[str, int]:
+        """Cifras del panel (lecciones, promedio, logros, módulos) en una sola respuesta.
+
+        Usa la RPC get_dashboard_stats, que lee la fila de user_stats mantenida
+        por triggers en el servidor. Con la sesión precargada, escrituras aún en
+        la cola local o sin la migración aplicada, se calculan en el cliente.
+        """
+        snapshot = self.session_snapshot(user_id)
+        if snapshot is not None:
+            return snapshot.dashboard_stats()
+        if self._dashboard_stats_rpc and not self._has_pending_writes(user_id):
+            # Las mismas etiquetas que progreso, logros y completitud: se invalida con ellos
+            tags = ("stats", "progress", f"progress:{user_id}", "achievements", f"achievements:{user_id}",
+                    "completion", f"completion:{user_id}")
+            try:
+                stats = self._memo.get_or_call(("stats", user_id),
+                                               lambda: self.backend.rpc("get_dashboard_stats", {"p_user_id": user_id}),
+                                               tags=tags)
+                return dict(stats or self._dashboard_stats([], 0, [], {}))
+            except Exception as e:
+                report_error("Error getting dashboard stats", e)
+                if getattr(e, "code", None) == "PGRST202":
+                    self._dashboard_stats_rpc = False
+        return self._dashboard_stats(self.get_user_progress(user_id), len(self.get_user_achievements(user_id)),
+                                     self.get_all_modules(), self.get_all_module_completion(user_id))
+
+    def _has_pending_writes(self, user_id: str) -> bool:
+        if self.write_queue is None:
+            return False
+        try:
+            return bool(self.write_queue.pending_progress(user_id) or self.write_queue.pending_achievements(user_id))
+        except Exception:
+            return False
+
+    @staticmethod
+    def _dashboard_stats(progress: List[Dict[str, Any]], achievement_count: int, modules: List[Dict[str, Any]],
+                         completions: Dict[int, Dict[str, Any]]) -> Dict[str, int]:
+        """Mismas cifras que la RPC get_dashboard_stats, a partir de los datos completos."""
+        module_completions = [completions.get(m.get("id"), {}) for m in modules]
+        return {
+            "lessons_started": len(progress),
+            "lessons_completed": sum(1 for p in progress if p.get("completed")),
+            "average_score": sum(p.get("score") or 0 for p in progress) // len(progress) if progress else 0,
+            "achievements": achievement_count,
+            "modules_total": len(modules),
+            "modules_completed": sum(1 for c in module_completions if c.get("percentage", 0) == 100),
+            "lessons_total": sum(c.get("total", 0) for c in module_completions),
+            "module_lessons_completed": sum(c.get("completed", 0) for c in module_completions),
+        }
+
+    @staticmethod
+    def _completion(completed: int, total: int) -> Dict[str, Any]:
+        percentage = int((completed / total) * 100) if total > 0 else 0
+        return {"completed": completed, "total": total, "percentage": percentage}
@@ -0,0 +1,177 @@
+import importlib.util
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+from src.metrics import get_metrics, percentile
+
+# Límites del pool compartido: pocas conexiones calientes bastan para una app de escritorio
+POOL_MAX_CONNECTIONS = 10
+POOL_MAX_KEEPALIVE = 5
+# httpx cierra por defecto las conexiones ociosas a los 5 s: tras una pausa corta
+# cada ráfaga volvía a pagar TCP + TLS
+KEEPALIVE_EXPIRY_SECONDS = 90.0
+CONNECT_TIMEOUT_SECONDS = 10.0
+REQUEST_TIMEOUT_SECONDS = 30.0
+MAX_HANDSHAKE_SAMPLES = 200
+
+
+def http2_available() -> bool:
+    """HTTP/2 (multiplexación en una sola conexión) requiere el paquete `h2`."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class ConnectionStats:
+    """Conexiones nuevas frente a reutilizadas y tiempo de handshake (TCP + TLS).
+
+    Se alimenta del evento `trace` de httpcore: una petición que abre conexión
+    emite `connection.connect_tcp.*`; una que reutiliza una conexión viva, no.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.handshake_seconds = 0.0
+        self._samples: Deque[float] = deque(maxlen=MAX_HANDSHAKE_SAMPLES)
+
+    def record(self, connected: bool, handshake: float):
+        with self._lock:
+            self.requests += 1
+            if connected:
+                self.new_connections += 1
+                self.handshake_seconds += handshake
+                self._samples.append(handshake)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            samples_ms = [s * 1000 for s in self._samples]
+            reused = self.requests - self.new_connections
+            return {
+                "http2": http2_available(),
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+                "handshake_total_ms": round(self.handshake_seconds * 1000, 1),
+                "handshake_p50_ms": round(percentile(samples_ms, 50), 1),
+                "handshake_max_ms": round(max(samples_ms), 1) if samples_ms else 0.0,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.handshake_seconds = 0.0
+            self._samples.clear()
+
+
+_stats = ConnectionStats()
+get_metrics().add_section("connections", _stats.to_dict)
+
+
+def get_connection_stats() -> ConnectionStats:
+    return _stats
+
+
+class _RequestTrace:
+    """Recoge los eventos de httpcore de una petición y los vuelca en ConnectionStats al terminar."""
+
+    _HANDSHAKE = ("connection.connect_tcp", "connection.start_tls")
+
+    def __init__(self):
+        self.connected = False
+        self.handshake = 0.0
+        self._started: Dict[str, float] = {}
+
+    def __call__(self, event: str, info: Dict[str, Any]):
+        step, _, phase = event.rpartition(".")
+        if step not in self._HANDSHAKE:
+            return
+        if phase == "started":
+            self._started[step] = time.perf_counter()
+            return
+        started = self._started.pop(step, None)
+        if started is not None:
+            self.handshake += time.perf_counter() - started
+        if step == "connection.connect_tcp":
+            self.connected = True
+
+    def finish(self):
+        _stats.record(self.connected, self.handshake)
+
+
+class _AsyncRequestTrace(_RequestTrace):
+    # httpcore exige un callback asíncrono con clientes asíncronos
+    async def __call__(self, event: str, info: Dict[str, Any]):
+        _RequestTrace.__call__(self, event, info)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=POOL_MAX_CONNECTIONS,
+                        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                        keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS)
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(REQUEST_TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS)
+
+
+def create_http_client() -> httpx.Client:
+    """Cliente httpx con keep-alive, HTTP/2 si está disponible y métricas de conexión."""
+
+    def on_request(request: httpx.Request):
+        trace = _RequestTrace()
+        request.extensions["trace"] = trace
+        request.extensions["quimicapro_trace"] = trace
+
+    def on_response(response: httpx.Response):
+        trace = response.request.extensions.get("quimicapro_trace")
+        if trace is not None:
+            trace.finish()
+
+    return httpx.Client(http2=http2_available(), limits=_limits(), timeout=_timeout(),
+                        follow_redirects=True,
+                        event_hooks={"request": [on_request], "response": [on_response]})
+
+
+def create_async_http_client() -> httpx.AsyncClient:
+    """Variante asíncrona de create_http_client (para AsyncDatabase)."""
+
+    async def on_request(request: httpx.Request):
+        trace = _AsyncRequestTrace()
+        request.extensions["trace"] = trace
+        request.extensions["quimicapro_trace"] = trace
+
+    async def on_response(response: httpx.Response):
+        trace = response.request.extensions.get("quimicapro_trace")
+        if trace is not None:
+            trace.finish()
+
+    return httpx.AsyncClient(http2=http2_available(), limits=_limits(), timeout=_timeout(),
+                             follow_redirects=True,
+                             event_hooks={"request": [on_request], "response": [on_response]})
+
+
+_shared: Optional[httpx.Client] = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Cliente compartido por el backend de Supabase y las descargas de imágenes."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = create_http_client()
+        return _shared
+
+
+def close_http_client():
+    global _shared
+    with _shared_lock:
+        if _shared is not None:
+            _shared.close()
+            _shared = None
@@ -0,0 +1,170 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+DEFAULT_TTL = 10.0
+
+
+class _Flight:
+    """Consulta en curso compartida por todos los que piden la misma clave."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class Memoizer:
+    """Memoización con TTL corto, agrupación de consultas en vuelo e invalidación por etiquetas.
+
+    Si varias hebras piden la misma clave a la vez, solo una ejecuta la consulta
+    y las demás esperan su resultado. Los errores no se guardan. Cada entrada
+    lleva etiquetas (p. ej. "progress:<user_id>") para que las escrituras
+    invaliden exactamente lo que afectan; una invalidación durante una consulta
+    en vuelo impide guardar su resultado, que podría ser anterior a la escritura.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, Any, Tuple[str, ...]]] = {}
+        self._tags: Dict[str, Set[Hashable]] = {}
+        self._inflight: Dict[Hashable, _Flight] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def get_or_call(self, key: Hashable, fn: Callable[[], Any], ttl: Optional[float] = None,
+                    tags: Iterable[str] = ()) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self.hits += 1
+                return entry[1]
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                self.misses += 1
+                flight = self._inflight[key] = _Flight()
+                generation = self._generation
+                leader = True
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                if flight.error is None and generation == self._generation:
+                    self._store(key, flight.result, self.ttl if ttl is None else ttl, tuple(tags))
+            flight.done.set()
+        return flight.result
+
+    def peek(self, key: Hashable) -> Any:
+        """Valor vigente de `key` sin consultar nada; None si no está."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self.hits += 1
+                return entry[1]
+        return None
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None, tags: Iterable[str] = ()):
+        """Guarda un valor obtenido por otra vía (p. ej. dentro de una respuesta más grande)."""
+        with self._lock:
+            self._store(key, value, self.ttl if ttl is None else ttl, tuple(tags))
+
+    def _store(self, key: Hashable, value: Any, ttl: float, tags: Tuple[str, ...]):
+        if ttl <= 0:
+            # Solo agrupación de consultas en vuelo, sin guardar el resultado
+            return
+        self._entries[key] = (self._clock() + ttl, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if self._entries.pop(key, None) is not None:
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+
+class LRUCache:
+    """Caché acotada (por número de entradas y tamaño total) que descarta lo menos usado."""
+
+    def __init__(self, max_entries: int = 32, max_size: int = 4 * 1024 * 1024,
+                 sizeof: Callable[[Any], int] = len):
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._size = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        size = self._sizeof(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            if size > self.max_size:
+                return
+            self._entries[key] = (value, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or self._size > self.max_size:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
@@ -0,0 +1,303 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import math
+import os
+import platform
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_MS = 500.0
+MAX_SAMPLES = 1000      # latencias guardadas por método para los percentiles
+MAX_SLOW_LOG = 200
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class _Call:
+    """Llamada instrumentada en curso; `parent` permite distinguir llamadas anidadas."""
+
+    __slots__ = ("method", "parent", "failed")
+
+    def __init__(self, method: str, parent: Optional["_Call"]):
+        self.method = method
+        self.parent = parent
+        self.failed = False
+
+
+class ActionScope:
+    """Acción de la interfaz (p. ej. refrescar una pestaña) a la que se atribuyen llamadas."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.perf_counter()
+        self.calls = 0
+        self.errors = 0
+        self.db_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float, failed: bool):
+        with self._lock:
+            self.calls += 1
+            self.db_seconds += seconds
+            if failed:
+                self.errors += 1
+
+
+_current_call: contextvars.ContextVar[Optional[_Call]] = contextvars.ContextVar("db_current_call", default=None)
+_current_action: contextvars.ContextVar[Optional[ActionScope]] = contextvars.ContextVar("ui_action", default=None)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    # Rango más cercano
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _row_count(result: Any) -> int:
+    if result is None or isinstance(result, bool):
+        return 0
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, dict):
+        # Un diccionario de diccionarios (p. ej. completitud por módulo) cuenta una fila por clave
+        values = list(result.values())
+        return len(values) if values and all(isinstance(v, dict) for v in values) else 1
+    return 1
+
+
+class _MethodStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.samples: Deque[float] = deque(maxlen=MAX_SAMPLES)
+
+    def to_dict(self) -> Dict[str, Any]:
+        samples_ms = [s * 1000 for s in self.samples]
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "rows": self.rows,
+            "avg_rows": round(self.rows / self.calls, 1) if self.calls else 0,
+            "total_ms": round(self.total_seconds * 1000, 1),
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "p50_ms": round(percentile(samples_ms, 50), 1),
+            "p95_ms": round(percentile(samples_ms, 95), 1),
+            "p99_ms": round(percentile(samples_ms, 99), 1),
+        }
+
+
+class _ActionStats:
+    def __init__(self):
+        self.runs = 0
+        self.calls = 0
+        self.errors = 0
+        self.db_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.last_calls = 0
+        self.last_wall_seconds = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_calls": round(self.calls / self.runs, 1) if self.runs else 0,
+            "db_ms": round(self.db_seconds * 1000, 1),
+            "avg_wall_ms": round(self.wall_seconds * 1000 / self.runs, 1) if self.runs else 0,
+            "last_calls": self.last_calls,
+            "last_wall_ms": round(self.last_wall_seconds * 1000, 1),
+        }
+
+
+class DatabaseMetrics:
+    """Latencias, filas y errores de las llamadas a Database, por método y por acción de la UI.
+
+    Solo las llamadas de primer nivel (no las que un método de Database hace a
+    otro) cuentan para las acciones, para no contar dos veces el mismo trabajo.
+    Las llamadas por encima de `slow_query_ms` se guardan en un registro aparte.
+    """
+
+    def __init__(self, slow_query_ms: Optional[float] = None):
+        if slow_query_ms is None:
+            slow_query_ms = _env_float("QUIMICAPRO_SLOW_QUERY_MS", DEFAULT_SLOW_QUERY_MS)
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._methods: Dict[str, _MethodStats] = {}
+        self._actions: Dict[str, _ActionStats] = {}
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=MAX_SLOW_LOG)
+        # Secciones extra del informe (p. ej. "connections" de src/http_pool.py)
+        self._sections: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self.started_at = datetime.now(timezone.utc).isoformat()
+
+    def record(self, method: str, seconds: float, rows: int, failed: bool, nested: bool):
+        action = _current_action.get()
+        with self._lock:
+            stats = self._methods.setdefault(method, _MethodStats())
+            stats.calls += 1
+            stats.rows += rows
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.samples.append(seconds)
+            if failed:
+                stats.errors += 1
+            slow = seconds * 1000 >= self.slow_query_ms
+            if slow:
+                self._slow.append({
+                    "method": method,
+                    "ms": round(seconds * 1000, 1),
+                    "rows": rows,
+                    "failed": failed,
+                    "action": action.name if action else None,
+                    "at": datetime.now(timezone.utc).isoformat(),
+                })
+        if slow:
+            logger.warning("Slow database call %s: %.0f ms (%d rows)", method, seconds * 1000, rows)
+        if action is not None and not nested:
+            action.add(seconds, failed)
+
+    def add_section(self, name: str, source: Callable[[], Dict[str, Any]]):
+        self._sections[name] = source
+
+    def begin_action(self, name: str) -> ActionScope:
+        return ActionScope(name)
+
+    @contextmanager
+    def activate(self, scope: Optional[ActionScope]):
+        """Atribuye a `scope` las llamadas hechas dentro del bloque (y en tareas lanzadas desde él)."""
+        token = _current_action.set(scope)
+        try:
+            yield scope
+        finally:
+            _current_action.reset(token)
+
+    def finish_action(self, scope: ActionScope):
+        wall = time.perf_counter() - scope.started
+        with self._lock:
+            stats = self._actions.setdefault(scope.name, _ActionStats())
+            stats.runs += 1
+            stats.calls += scope.calls
+            stats.errors += scope.errors
+            stats.db_seconds += scope.db_seconds
+            stats.wall_seconds += wall
+            stats.last_calls = scope.calls
+            stats.last_wall_seconds = wall
+        logger.info("%s: %d llamadas / %.2f s", scope.name, scope.calls, wall)
+
+    def to_dict(self) -> Dict[str, Any]:
+        sections = {name: source() for name, source in self._sections.items()}
+        with self._lock:
+            return {**sections,
+                "started_at": self.started_at,
+                "exported_at": datetime.now(timezone.utc).isoformat(),
+                "platform": platform.platform(),
+                "python": platform.python_version(),
+                "slow_query_ms": self.slow_query_ms,
+                "methods": {name: stats.to_dict() for name, stats in sorted(self._methods.items())},
+                "actions": {name: stats.to_dict() for name, stats in sorted(self._actions.items())},
+                "slow_queries": list(self._slow),
+            }
+
+    def export_json(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self._actions.clear()
+            self._slow.clear()
+
+
+_metrics: Optional[DatabaseMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> DatabaseMetrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = DatabaseMetrics()
+        return _metrics
+
+
+def current_action() -> Optional[ActionScope]:
+    return _current_action.get()
+
+
+def report_error(message: str, error: BaseException):
+    """Imprime el error como hasta ahora y lo cuenta en la llamada instrumentada en curso."""
+    print(f"{message}: {error}")
+    call = _current_call.get()
+    if call is not None:
+        call.failed = True
+
+
+def instrumented(fn: Callable) -> Callable:
+    """Mide latencia, filas devueltas y errores de un método (síncrono o corrutina)."""
+    name = fn.__qualname__
+
+    def _finish(call: _Call, started: float, result: Any, failed: bool):
+        get_metrics().record(name, time.perf_counter() - started, _row_count(result),
+                             failed or call.failed, nested=call.parent is not None)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            call = _Call(name, _current_call.get())
+            token = _current_call.set(call)
+            started = time.perf_counter()
+            result, failed = None, True
+            try:
+                result = await fn(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                _current_call.reset(token)
+                _finish(call, started, result, failed)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        call = _Call(name, _current_call.get())
+        token = _current_call.set(call)
+        started = time.perf_counter()
+        result, failed = None, True
+        try:
+            result = fn(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            _current_call.reset(token)
+            _finish(call, started, result, failed)
+    return wrapper
+
+
+def export_from_env():
+    """Vuelca las métricas a QUIMICAPRO_METRICS_FILE, si está definida (p. ej. al cerrar la app)."""
+    path = os.environ.get("QUIMICAPRO_METRICS_FILE")
+    if not path:
+        return
+    try:
+        get_metrics().export_json(path)
+    except OSError as e:
+        logger.warning("Could not export metrics to %s: %s", path, e)
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.backends import After, DatabaseBackend, Filters
+
+# Por debajo del `max-rows` de PostgREST por defecto en Supabase (1000); si un
+# proyecto lo baja, las páginas llegan más cortas y el recorrido sigue igual
+DEFAULT_PAGE_SIZE = 500
+
+
+def _with_key(columns: str, keys: Tuple[str, ...]) -> str:
+    if columns.strip() == "*":
+        return columns
+    present = [c.strip() for c in columns.split(",")]
+    return ",".join([columns, *(k for k in keys if k not in present)])
+
+
+def iter_keyset(backend: DatabaseBackend, table: str, columns: str = "*",
+                filters: Optional[Filters] = None, key: Union[str, Tuple[str, ...]] = "id",
+                page_size: int = DEFAULT_PAGE_SIZE, prefetch: bool = True,
+                start: Optional[After] = None) -> Iterator[Dict[str, Any]]:
+    """Recorre `table` página a página ordenando por `key` (que debe ser único con `filters`).
+
+    Paginación por clave (`key > último visto`) en lugar de OFFSET: cada página
+    usa el índice y cuesta lo mismo aunque la tabla tenga miles de filas. Solo
+    hay en memoria la página actual y la siguiente, que con `prefetch` se pide
+    en un hilo mientras se consume la actual. Termina con la primera página
+    vacía, así que un servidor que devuelve menos filas que `page_size` no
+    corta el recorrido. Los errores se propagan: un recorrido incompleto no
+    debe pasar por uno completo.
+
+    `key` puede ser una tupla de columnas, p. ej. `("updated_at", "id")` para
+    recorrer por una columna que se repite desempatando por otra. `start` es
+    la condición `after` de la primera página (p. ej. `("updated_at", marca)`).
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    keys = (key,) if isinstance(key, str) else tuple(key)
+    columns = _with_key(columns, keys)
+
+    def fetch(after: Optional[Any]) -> List[Dict[str, Any]]:
+        if after is None:
+            condition = start
+        else:
+            condition = (key, after) if isinstance(key, str) else (keys, after)
+        return backend.select(table, columns, filters, order=",".join(keys), limit=page_size,
+                              after=condition)
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="keyset") if prefetch else None
+    try:
+        page = fetch(None)
+        while page:
+            # Una página corta no indica el final: el servidor puede cortar por debajo
+            # de page_size (db-max-rows). Solo una página vacía cierra el recorrido
+            last = page[-1][key] if isinstance(key, str) else tuple(page[-1][k] for k in keys)
+            upcoming = executor.submit(fetch, last) if executor else None
+            yield from page
+            page = upcoming.result() if upcoming is not None else fetch(last)
+    finally:
+        if executor is not None:
+            # Al abandonar el recorrido no esperar a la página que ya no se usará
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,19 @@
+import os
+import sys
+
+
+def user_data_dir() -> str:
+    """Devuelve (y crea si hace falta) la carpeta de datos locales de la aplicación."""
+    override = os.environ.get("QUIMICAPRO_DATA_DIR")
+    if override:
+        base = override
+    elif sys.platform.startswith("win"):
+        root = os.environ.get("LOCALAPPDATA") or os.environ.get("APPDATA") or os.path.expanduser("~")
+        base = os.path.join(root, "QuimicaPro")
+    elif sys.platform == "darwin":
+        base = os.path.join(os.path.expanduser("~"), "Library", "Application Support", "QuimicaPro")
+    else:
+        root = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+        base = os.path.join(root, "quimicapro")
+    os.makedirs(base, exist_ok=True)
+    return base
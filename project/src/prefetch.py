@@ -0,0 +1,167 @@
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src.http_pool import get_http_client
+from src.memo import LRUCache, Memoizer
+from src.metrics import report_error
+
+# Presupuesto de cada precarga: pocas lecturas y pocos bytes de imágenes, para
+# no competir con lo que el alumno está mirando
+PREFETCH_MAX_ITEMS = 6
+PREFETCH_MAX_IMAGE_BYTES = 2 * 1024 * 1024
+
+# Cuánto espera la precarga a que terminen las tareas de primer plano antes de rendirse
+PREFETCH_IDLE_WAIT_SECONDS = 5.0
+
+IMAGE_CACHE_BYTES = 16 * 1024 * 1024
+MAX_IMAGE_BYTES = 2 * 1024 * 1024
+IMAGE_TIMEOUT_SECONDS = 10.0
+
+_IMG_SRC = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+
+
+def image_urls(html: Optional[str]) -> List[str]:
+    """URLs http(s) de las imágenes de un HTML, sin repetir y en orden de aparición."""
+    seen: Dict[str, None] = {}
+    for url in _IMG_SRC.findall(html or ""):
+        if url.lower().startswith(("http://", "https://")):
+            seen.setdefault(url, None)
+    return list(seen)
+
+
+class ImageCache:
+    """Imágenes de las lecciones descargadas una vez y guardadas en memoria (LRU por bytes).
+
+    QTextBrowser no descarga imágenes remotas por sí mismo: LessonView las pide
+    aquí y la precarga las deja listas antes de abrir la lección.
+    """
+
+    def __init__(self, max_size: int = IMAGE_CACHE_BYTES,
+                 fetch: Optional[Callable[[str], bytes]] = None):
+        self._images = LRUCache(max_entries=256, max_size=max_size)
+        self._fetch = fetch or self._download
+        # Solo agrupa descargas simultáneas de la misma URL
+        self._inflight = Memoizer(ttl=0)
+
+    def get(self, url: str) -> Optional[bytes]:
+        return self._images.get(url)
+
+    def load(self, url: str) -> Optional[bytes]:
+        """Bytes de la imagen (de la caché o descargándola); None si no se pudo obtener."""
+        data = self._images.get(url)
+        if data is not None:
+            return data
+        try:
+            data = self._inflight.get_or_call(url, lambda: self._fetch(url))
+        except Exception as e:
+            report_error(f"Error loading image {url}", e)
+            return None
+        if data:
+            self._images.put(url, data)
+        return data
+
+    def _download(self, url: str) -> bytes:
+        response = get_http_client().get(url, timeout=IMAGE_TIMEOUT_SECONDS)
+        response.raise_for_status()
+        if len(response.content) > MAX_IMAGE_BYTES:
+            raise ValueError(f"image larger than {MAX_IMAGE_BYTES} bytes")
+        return response.content
+
+
+_images: Optional[ImageCache] = None
+_images_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    global _images
+    with _images_lock:
+        if _images is None:
+            _images = ImageCache()
+        return _images
+
+
+class LessonPrefetcher:
+    """Precarga lo que el alumno abrirá después de una lección: su cuestionario y la siguiente.
+
+    Orden: quizzes de la lección, HTML y quizzes de la siguiente lección y las
+    imágenes de ambas. Todo queda en las cachés en memoria de Database e
+    ImageCache. Antes de cada lectura espera a que no haya trabajo en primer
+    plano (`is_busy`) y se detiene al agotar el presupuesto, si se cancela o si
+    esa espera se alarga.
+    """
+
+    def __init__(self, database, images: Optional[ImageCache] = None,
+                 is_busy: Callable[[], bool] = lambda: False,
+                 max_items: int = PREFETCH_MAX_ITEMS, max_image_bytes: int = PREFETCH_MAX_IMAGE_BYTES,
+                 idle_wait: float = PREFETCH_IDLE_WAIT_SECONDS):
+        self.db = database
+        self.images = images or get_image_cache()
+        self.is_busy = is_busy
+        self.max_items = max_items
+        self.max_image_bytes = max_image_bytes
+        self.idle_wait = idle_wait
+
+    def _wait_idle(self, cancelled: Callable[[], bool]) -> bool:
+        # Cede el paso a las tareas de primer plano; False si no quedan libres a tiempo
+        deadline = time.monotonic() + self.idle_wait
+        while self.is_busy():
+            if cancelled() or time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def next_lesson(self, lesson: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        module_id = lesson.get("module_id")
+        if module_id is None:
+            return None
+        cards = sorted(self.db.get_lessons_by_module(module_id) or [], key=lambda l: l.get("order_index", 0))
+        if lesson.get("is_virtual"):
+            # La introducción generada por ModulesView va antes de todas
+            return cards[0] if cards else None
+        ids = [card["id"] for card in cards]
+        if lesson.get("id") not in ids:
+            return None
+        index = ids.index(lesson["id"])
+        return cards[index + 1] if index + 1 < len(cards) else None
+
+    def run(self, lesson: Dict[str, Any], cancelled: Callable[[], bool] = lambda: False) -> int:
+        """Ejecuta la precarga y devuelve cuántas lecturas hizo."""
+        done = 0
+        image_bytes = 0
+
+        def allowed() -> bool:
+            return done < self.max_items and not cancelled() and self._wait_idle(cancelled)
+
+        if not lesson.get("is_virtual") and lesson.get("id") and allowed():
+            self.db.get_quizzes_by_lesson(lesson["id"])
+            done += 1
+
+        htmls = [lesson.get("content")]
+        upcoming = self.next_lesson(lesson) if allowed() else None
+        if upcoming is not None:
+            if allowed():
+                htmls.append(self.db.get_lesson_content(upcoming["id"]))
+                done += 1
+            if allowed():
+                self.db.get_quizzes_by_lesson(upcoming["id"])
+                done += 1
+
+        if lesson.get("content") is None and lesson.get("id") and not lesson.get("is_virtual"):
+            # Tarjeta sin HTML: normalmente ya lo descargó LessonView; si no, es
+            # una lectura más, con el mismo presupuesto que las demás
+            htmls[0] = self.db.peek_lesson_content(lesson["id"])
+            if htmls[0] is None and allowed():
+                htmls[0] = self.db.get_lesson_content(lesson["id"])
+                done += 1
+        for html in htmls:
+            for url in image_urls(html):
+                if self.images.get(url) is not None:
+                    continue
+                if not allowed() or image_bytes >= self.max_image_bytes:
+                    return done
+                data = self.images.load(url)
+                done += 1
+                image_bytes += len(data or b"")
+        return done
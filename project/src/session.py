@@ -0,0 +1,120 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from src.database import Database
+from src.async_database import AsyncDatabase, get_async_database
+
+
+class SessionSnapshot:
+    """Copia en memoria de los datos de la sesión de un usuario.
+
+    Se descarga una vez al iniciar sesión (progreso, logros y catálogo a la vez)
+    y sirve las lecturas de todas las vistas. Las escrituras de la sesión se
+    aplican también aquí para que la copia no quede atrasada.
+    """
+
+    def __init__(self, user_id: str, progress: List[Dict[str, Any]], user_achievements: List[Dict[str, Any]],
+                 modules: List[Dict[str, Any]], achievements: List[Dict[str, Any]],
+                 lesson_modules: Dict[str, int]):
+        self._lock = threading.Lock()
+        self.user_id = user_id
+        self.modules = modules
+        self.achievements = achievements
+        self.lesson_modules = lesson_modules
+        self._progress: Dict[str, Dict[str, Any]] = {row["lesson_id"]: row for row in progress}
+        self._earned: Dict[str, Dict[str, Any]] = {row["achievement_id"]: row for row in user_achievements}
+        self._module_totals: Dict[int, int] = {}
+        for module_id in lesson_modules.values():
+            self._module_totals[module_id] = self._module_totals.get(module_id, 0) + 1
+
+    def replace_catalog(self, modules: List[Dict[str, Any]], achievements: List[Dict[str, Any]],
+                        lesson_modules: Dict[str, int]):
+        """Sustituye el catálogo de la copia tras una sincronización con cambios."""
+        totals: Dict[int, int] = {}
+        for module_id in lesson_modules.values():
+            totals[module_id] = totals.get(module_id, 0) + 1
+        with self._lock:
+            self.modules = modules
+            self.achievements = achievements
+            self.lesson_modules = lesson_modules
+            self._module_totals = totals
+
+    def progress(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._progress.values()]
+
+    def user_achievements(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self._earned.values()]
+
+    def completions(self) -> Dict[int, Dict[str, Any]]:
+        with self._lock:
+            completed: Dict[int, int] = {}
+            for lesson_id, row in self._progress.items():
+                module_id = self.lesson_modules.get(lesson_id)
+                if row.get("completed") and module_id is not None:
+                    completed[module_id] = completed.get(module_id, 0) + 1
+        module_ids = {m["id"] for m in self.modules} | set(self._module_totals)
+        return {module_id: Database._completion(completed.get(module_id, 0), self._module_totals.get(module_id, 0))
+                for module_id in module_ids}
+
+    def module_completion(self, module_id: int) -> Dict[str, Any]:
+        return self.completions().get(module_id, Database._completion(0, 0))
+
+    def dashboard_stats(self) -> Dict[str, int]:
+        with self._lock:
+            achievement_count = len(self._earned)
+        return Database._dashboard_stats(self.progress(), achievement_count, list(self.modules), self.completions())
+
+    def dashboard(self) -> Dict[str, Any]:
+        return {
+            "stats": self.dashboard_stats(),
+            "modules": list(self.modules),
+            "completions": self.completions(),
+        }
+
+    def apply_progress(self, lesson_id: str, completed: bool, score: int, completed_at: Optional[str] = None):
+        with self._lock:
+            row = dict(self._progress.get(lesson_id, {"user_id": self.user_id, "lesson_id": lesson_id}))
+            row.update({
+                "completed": completed,
+                "score": score,
+                "completed_at": completed_at or datetime.now(timezone.utc).isoformat(),
+            })
+            self._progress[lesson_id] = row
+
+    def apply_achievement(self, achievement_id: str):
+        with self._lock:
+            if achievement_id in self._earned:
+                return
+            self._earned[achievement_id] = {
+                "user_id": self.user_id,
+                "achievement_id": achievement_id,
+                "earned_at": datetime.now(timezone.utc).isoformat(),
+            }
+
+
+async def load_session(async_db: AsyncDatabase, user_id: str) -> SessionSnapshot:
+    """Descarga a la vez todo lo que usan las vistas; cualquier fallo anula la copia."""
+    progress, user_achievements, modules, achievements, lesson_modules = await asyncio.gather(
+        async_db.fetch_user_progress(user_id),
+        async_db.fetch_user_achievements(user_id),
+        async_db.get_all_modules(),
+        async_db.get_all_achievements(),
+        async_db.get_lesson_modules(),
+    )
+    return SessionSnapshot(user_id, progress, user_achievements, modules, achievements, lesson_modules)
+
+
+def prefetch_session(database: Database, user_id: str):
+    """Lanza en segundo plano la descarga de la sesión; las vistas esperan a ella.
+
+    No bloquea: se llama justo al aceptar el login, mientras se construye la
+    ventana principal. Sin cliente asíncrono (p. ej. dobles de prueba) no hace nada.
+    """
+    async_db = get_async_database(database)
+    if async_db is None or not user_id:
+        return
+    database.attach_session(user_id, async_db.submit(load_session(async_db, user_id)))
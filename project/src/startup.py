@@ -0,0 +1,53 @@
+import importlib
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Callable, Optional
+
+from src.startup_profile import profile_span
+
+if TYPE_CHECKING:
+    from src.database import Database
+
+# Módulos que el login no necesita: se importan en segundo plano mientras el
+# usuario escribe, para que MainWindow se construya sin esperar a la importación
+DEFERRED_MODULES = (
+    "src.session",
+    "src.ui.main_window",
+)
+
+
+class DeferredDatabase:
+    """Database que se construye en un hilo mientras ya se muestra LoginWindow.
+
+    Importar `src.database` arrastra el cliente de Supabase (httpx, pydantic,
+    gotrue...), que por sí solo tarda más que pintar el login. `load` corre en
+    el TaskRunner; `get` espera a que termine y relanza su error, si lo hubo.
+    """
+
+    def __init__(self, factory: Optional[Callable[[], "Database"]] = None):
+        self._factory = factory
+        self._future: Future = Future()
+
+    def load(self) -> "Database":
+        try:
+            with profile_span("Database()"):
+                if self._factory is None:
+                    from src.database import Database
+                    self._factory = Database
+                database = self._factory()
+        except BaseException as e:
+            self._future.set_exception(e)
+            raise
+        self._future.set_result(database)
+        return database
+
+    def get(self, timeout: Optional[float] = None) -> "Database":
+        return self._future.result(timeout)
+
+    def ready(self) -> bool:
+        return self._future.done() and self._future.exception() is None
+
+
+def import_deferred_modules():
+    with profile_span("import_deferred_modules"):
+        for name in DEFERRED_MODULES:
+            importlib.import_module(name)
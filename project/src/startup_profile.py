@@ -0,0 +1,261 @@
+import importlib.abc
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Solo biblioteca estándar: se importa antes que todo lo demás para poder medirlo
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FLAG = "--profile-startup"
+PROFILE_ENV = "QUIMICAPRO_PROFILE_STARTUP"
+DEFAULT_REPORT_PATH = "startup_profile.json"
+TOP_IMPORTS = 30
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Mide create_module + exec_module de un módulo y devuelve su loader original."""
+
+    def __init__(self, loader, name: str, profiler: "StartupProfiler"):
+        self.loader = loader
+        self.name = name
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        # Las extensiones (PyQt5.QtWidgets...) hacen casi todo su trabajo aquí
+        self.profiler._push(self.name, "import")
+        try:
+            return self.loader.create_module(spec)
+        except BaseException:
+            self.profiler._pop()
+            raise
+
+    def exec_module(self, module):
+        # El módulo ve su loader real (importlib.resources, pkgutil...)
+        module.__loader__ = self.loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self.loader
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.profiler._pop()
+
+
+class _ImportHook(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler: "StartupProfiler"):
+        self.profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, name, path, target=None):
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.busy = False
+        if spec.loader is None or not hasattr(spec.loader, "exec_module"):
+            return spec
+        spec.loader = _TimedLoader(spec.loader, name, self.profiler)
+        return spec
+
+
+class StartupProfiler:
+    """Tramos del arranque (importaciones, QApplication, ventanas, vistas) con su duración.
+
+    Cada tramo se anida en los abiertos del mismo hilo, así que el informe
+    sirve tal cual como flamegraph: `write` guarda un JSON en formato Trace
+    Event (chrome://tracing, Perfetto, speedscope) con un resumen, y junto a él
+    un `.folded` de pilas colapsadas (flamegraph.pl, speedscope). Si dos hilos
+    importan a la vez, la espera por el bloqueo de importación cuenta como
+    tiempo propio del módulo que espera.
+    """
+
+    def __init__(self, path: str = DEFAULT_REPORT_PATH):
+        self.path = path
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._events: List[Dict[str, Any]] = []
+        self._marks: Dict[str, float] = {}
+        self._hook: Optional[_ImportHook] = None
+
+    def _now_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def _stack(self) -> List[Dict[str, Any]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, name: str, category: str):
+        self._stack().append({"name": name, "cat": category, "start": self._now_ms(), "children": 0.0})
+
+    def _pop(self):
+        stack = self._stack()
+        if not stack:
+            return
+        frame = stack.pop()
+        duration = self._now_ms() - frame["start"]
+        if stack:
+            stack[-1]["children"] += duration
+        thread = threading.current_thread()
+        with self._lock:
+            self._events.append({
+                "name": frame["name"],
+                "cat": frame["cat"],
+                "start_ms": frame["start"],
+                "duration_ms": duration,
+                "self_ms": max(duration - frame["children"], 0.0),
+                "thread": thread.name,
+                "tid": thread.ident,
+                "stack": [f["name"] for f in stack] + [frame["name"]],
+            })
+
+    def install_import_hook(self):
+        if self._hook is None:
+            self._hook = _ImportHook(self)
+            sys.meta_path.insert(0, self._hook)
+
+    def remove_import_hook(self):
+        if self._hook is not None and self._hook in sys.meta_path:
+            sys.meta_path.remove(self._hook)
+        self._hook = None
+
+    @contextmanager
+    def span(self, name: str, category: str = "phase") -> Iterator[None]:
+        self._push(name, category)
+        try:
+            yield
+        finally:
+            self._pop()
+
+    def mark(self, name: str):
+        """Instante con nombre (p. ej. primer pintado del login), en ms desde el arranque."""
+        with self._lock:
+            self._marks.setdefault(name, self._now_ms())
+
+    def watch_first_paint(self, widget, name: str, on_painted=None):
+        """Marca `name` cuando `widget` recibe su primer evento Paint."""
+        from PyQt5.QtCore import QEvent, QObject
+
+        profiler = self
+
+        class _FirstPaint(QObject):
+            def eventFilter(self, obj, event):
+                if event.type() == QEvent.Paint:
+                    obj.removeEventFilter(self)
+                    profiler.mark(name)
+                    if on_painted is not None:
+                        on_painted()
+                return False
+
+        watcher = _FirstPaint(widget)
+        widget.installEventFilter(watcher)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            events = list(self._events)
+            marks = dict(self._marks)
+        imports = [e for e in events if e["cat"] == "import"]
+        by_package: Dict[str, float] = {}
+        for event in imports:
+            package = event["name"].split(".")[0]
+            by_package[package] = by_package.get(package, 0.0) + event["self_ms"]
+        summary = {
+            "marks_ms": {k: round(v, 1) for k, v in sorted(marks.items(), key=lambda kv: kv[1])},
+            "phases_ms": {e["name"]: round(e["duration_ms"], 1) for e in events if e["cat"] == "phase"},
+            "views_ms": {e["name"]: round(e["duration_ms"], 1) for e in events if e["cat"] == "view"},
+            "imports": {
+                "count": len(imports),
+                "total_self_ms": round(sum(e["self_ms"] for e in imports), 1),
+                "by_package_ms": {k: round(v, 1) for k, v in
+                                  sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:TOP_IMPORTS]},
+                "slowest": [{"module": e["name"], "self_ms": round(e["self_ms"], 2),
+                             "cumulative_ms": round(e["duration_ms"], 2), "thread": e["thread"]}
+                            for e in sorted(imports, key=lambda e: e["self_ms"], reverse=True)[:TOP_IMPORTS]],
+            },
+        }
+        pid = os.getpid()
+        trace = [{"name": e["name"], "cat": e["cat"], "ph": "X", "pid": pid, "tid": e["tid"],
+                  "ts": round(e["start_ms"] * 1000), "dur": max(round(e["duration_ms"] * 1000), 1),
+                  "args": {"self_ms": round(e["self_ms"], 3), "thread": e["thread"]}}
+                 for e in events]
+        trace += [{"name": name, "ph": "i", "s": "g", "pid": pid, "tid": 0, "ts": round(ms * 1000)}
+                  for name, ms in marks.items()]
+        return {"summary": summary, "traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def folded(self) -> str:
+        """Pilas colapsadas (`hilo;tramo;subtramo microsegundos`) para flamegraph.pl."""
+        with self._lock:
+            events = list(self._events)
+        lines: Dict[str, int] = {}
+        for event in events:
+            key = ";".join([event["thread"]] + event["stack"])
+            lines[key] = lines.get(key, 0) + round(event["self_ms"] * 1000)
+        return "".join(f"{stack} {us}\n" for stack, us in lines.items() if us > 0)
+
+    def write(self):
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, ensure_ascii=False, indent=2)
+            with open(os.path.splitext(self.path)[0] + ".folded", "w", encoding="utf-8") as f:
+                f.write(self.folded())
+        except OSError as e:
+            logger.warning("Could not write startup profile to %s: %s", self.path, e)
+
+
+_profiler: Optional[StartupProfiler] = None
+
+
+def start_startup_profile(argv: List[str]) -> Optional[StartupProfiler]:
+    """Activa el perfilado si se pidió con --profile-startup[=ruta] o QUIMICAPRO_PROFILE_STARTUP.
+
+    Quita la opción de `argv` (para que no llegue a QApplication) e instala el
+    gancho de importaciones: llamarla antes de importar nada más.
+    """
+    global _profiler
+    path = os.environ.get(PROFILE_ENV, "").strip() or None
+    if path is not None and path.lower() in ("0", "false", "no", "off"):
+        path = None
+    for arg in list(argv[1:]):
+        if arg == PROFILE_FLAG or arg.startswith(PROFILE_FLAG + "="):
+            argv.remove(arg)
+            path = arg.partition("=")[2] or path or DEFAULT_REPORT_PATH
+    if path is None:
+        return None
+    if path.lower() in ("1", "true", "yes", "on"):
+        path = DEFAULT_REPORT_PATH
+    _profiler = StartupProfiler(path)
+    _profiler.install_import_hook()
+    return _profiler
+
+
+def get_startup_profiler() -> Optional[StartupProfiler]:
+    return _profiler
+
+
+@contextmanager
+def profile_span(name: str, category: str = "phase") -> Iterator[None]:
+    """Tramo del arranque; no hace nada si el perfilado no está activo."""
+    if _profiler is None:
+        yield
+        return
+    with _profiler.span(name, category):
+        yield
@@ -1,17 +1,18 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QFrame, QGridLayout, QScrollArea)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from src.database import Database
 from src.auth import AuthManager
 from src.ui.widgets.loading_overlay import LoadingOverlay
+from src.ui.data_view import DataView, clear_layout
 from src.ui.theme import Theme
 
-class AchievementsView(QWidget):
+class AchievementsView(DataView):
+    action_name = "Logros"
+
     def __init__(self, database: Database, auth_manager: AuthManager):
-        super().__init__()
-        self.db = database
-        self.auth = auth_manager
+        super().__init__(database, auth_manager)
         self.init_ui()
 
     def init_ui(self):
@@ -48,39 +49,51 @@ class AchievementsView(QWidget):
         # Overlay de carga durante refrescos
         self.loading_overlay = LoadingOverlay(self, text="Cargando…")
 
-    def refresh(self):
-        self.loading_overlay.show_overlay()
-        QTimer.singleShot(0, self._do_refresh)
+    def reset(self):
+        super().reset()
+        clear_layout(self.achievements_layout)
 
-    def _do_refresh(self):
+    def fetch_data(self):
+        # Corre en un hilo del TaskRunner; None indica error de carga
         try:
-            self.load_achievements()
-        finally:
-            self.loading_overlay.hide_overlay()
+            user_id = self.auth.get_current_user_id()
+            all_achievements = self.db.get_all_achievements(strict=True) or []
+            user_achievements = self.db.get_user_achievements(user_id, strict=True) or []
+        except Exception:
+            return None
+        try:
+            engine = self.db.get_achievement_engine(user_id)
+            progress = {a.get('id'): engine.progress_for(a) for a in all_achievements}
+        except Exception:
+            # Sin avance la vista sigue mostrando el requisito de cada logro
+            progress = {}
+        return {"all": all_achievements, "earned": user_achievements, "progress": progress}
 
-    def load_achievements(self):
+    def render(self, data):
+        self.load_achievements(data)
+
+    def load_achievements(self, data):
         while self.achievements_layout.count():
             child = self.achievements_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
 
-        try:
-            user_id = self.auth.get_current_user_id()
-            all_achievements = self.db.get_all_achievements() or []
-            user_achievements = self.db.get_user_achievements(user_id) or []
-        except Exception:
+        if data is None:
             error_label = QLabel("Error al cargar logros")
             error_label.setStyleSheet("color: #c62828;")
             self.achievements_layout.addWidget(error_label, 0, 0)
             return
 
+        all_achievements = data["all"]
+        user_achievements = data["earned"]
         earned_achievement_ids = {ua['achievement_id'] for ua in user_achievements}
 
         row = 0
         col = 0
         for achievement in all_achievements:
             is_earned = achievement.get('id') in earned_achievement_ids
-            card = self.create_achievement_card(achievement, is_earned)
+            card = self.create_achievement_card(achievement, is_earned,
+                                                data.get("progress", {}).get(achievement.get('id')))
             self.achievements_layout.addWidget(card, row, col)
 
             col += 1
@@ -88,7 +101,7 @@ class AchievementsView(QWidget):
                 col = 0
                 row += 1
 
-    def create_achievement_card(self, achievement: dict, is_earned: bool) -> QFrame:
+    def create_achievement_card(self, achievement: dict, is_earned: bool, progress=None) -> QFrame:
         card = QFrame()
 
         if is_earned:
@@ -191,7 +204,10 @@ class AchievementsView(QWidget):
             status_label.setStyleSheet("color: white;")
             status_label.setAlignment(Qt.AlignCenter)
         else:
-            status_label = QLabel(self.get_requirement_text(achievement))
+            status_text = self.get_requirement_text(achievement)
+            if progress and progress[1] > 0:
+                status_text += f" ({progress[0]}/{progress[1]})"
+            status_label = QLabel(status_text)
             status_label.setFont(QFont("Arial", 10))
             status_label.setStyleSheet(f"color: {Theme.TEXT_SECONDARY};")
             status_label.setAlignment(Qt.AlignCenter)
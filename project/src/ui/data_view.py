@@ -0,0 +1,128 @@
+import hashlib
+import json
+from typing import Any, Optional
+
+from PyQt5.QtWidgets import QWidget
+from PyQt5.QtCore import pyqtSignal
+from src.database import Database
+from src.auth import AuthManager
+from src.ui.task_runner import get_task_runner, PRIORITY_HIGH
+from src.ui.widgets.stale_banner import StaleBanner
+
+
+def data_digest(data: Any) -> Optional[str]:
+    """Huella del resultado de `fetch_data` para saber si cambió; None si no se puede calcular."""
+    try:
+        encoded = json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+def clear_layout(layout):
+    """Quita y libera los widgets de `layout` (tarjetas de la carga anterior)."""
+    while layout.count():
+        child = layout.takeAt(0)
+        if child.widget():
+            child.widget().deleteLater()
+
+
+class DataView(QWidget):
+    """Base de las vistas que cargan datos de Database.
+
+    `fetch_data()` corre en un hilo del TaskRunner (sin tocar widgets) y
+    `render(data)` se ejecuta después en el hilo de la interfaz. Cada nuevo
+    refresco descarta el resultado del anterior si aún no había llegado.
+    Las subclases deben crear `self.loading_overlay` en su `init_ui`.
+
+    Refresco stale-while-revalidate: si ya hay algo pintado se deja a la vista
+    mientras se revalida, sin overlay, y solo se vuelve a pintar si la huella
+    de los datos (`data_digest`) cambió. El overlay queda para la carga en frío.
+    Si la revalidación falla (`fetch_failed`) se conserva lo pintado y solo se
+    muestra un aviso encima.
+    """
+
+    loaded = pyqtSignal()
+    # Nombre de la vista en las métricas de llamadas por acción
+    action_name = "Vista"
+
+    def __init__(self, database: Database, auth_manager: AuthManager):
+        super().__init__()
+        self.db = database
+        self.auth = auth_manager
+        self.runner = get_task_runner()
+        # True tras el primer render; _digest es la huella de lo que está pintado
+        self.rendered = False
+        self._digest: Optional[str] = None
+        self.stale_banner: Optional[StaleBanner] = None
+
+    def refresh(self, priority: int = PRIORITY_HIGH):
+        self.cancel_pending()
+        if not self.rendered:
+            self.loading_overlay.show_overlay()
+        self.runner.submit(self.fetch_data, on_result=self._on_data, on_error=self._on_error,
+                           priority=priority, group=self, action=f"{self.action_name}: refresco")
+
+    def cancel_pending(self):
+        """Descarta los refrescos en curso (p. ej. al navegar a otra pestaña)."""
+        self.runner.cancel_group(self)
+        self.loading_overlay.hide_overlay()
+
+    def reset(self):
+        """Olvida lo mostrado al usuario anterior; la vista se reutiliza en la siguiente sesión.
+
+        Las subclases vacían aquí sus widgets con datos del alumno. Lo que es
+        igual para todos (títulos, estilos, el catálogo) se conserva.
+        """
+        self.cancel_pending()
+        self._hide_stale_error()
+        self.rendered = False
+        self._digest = None
+
+    def mark_stale(self):
+        """Obliga a repintar en el próximo refresco aunque los datos no cambien (p. ej. al cambiar el tema)."""
+        self._digest = None
+
+    def fetch_data(self) -> Any:
+        raise NotImplementedError
+
+    def render(self, data: Any):
+        raise NotImplementedError
+
+    def fetch_failed(self, data: Any) -> bool:
+        """True si `fetch_data` no pudo leer los datos (por defecto, si devolvió None)."""
+        return data is None
+
+    def _on_data(self, data: Any):
+        # Ocultar antes de pintar: render() puede lanzar cargas propias con overlay
+        self.loading_overlay.hide_overlay()
+        try:
+            if self.rendered and self.fetch_failed(data):
+                # Falló la revalidación: mejor los datos de antes que la pantalla de error
+                self._show_stale_error()
+                return
+            self._hide_stale_error()
+            digest = data_digest(data)
+            if self.rendered and digest is not None and digest == self._digest:
+                # Mismos datos que lo que ya se ve: no reconstruir los widgets
+                return
+            self.render(data)
+            self.rendered = True
+            self._digest = digest
+        finally:
+            self.loaded.emit()
+
+    def _on_error(self, error: Exception):
+        self.loading_overlay.hide_overlay()
+        if self.rendered:
+            self._show_stale_error()
+        self.loaded.emit()
+
+    def _show_stale_error(self):
+        if self.stale_banner is None:
+            self.stale_banner = StaleBanner(self)
+        self.stale_banner.show_banner()
+
+    def _hide_stale_error(self):
+        if self.stale_banner is not None:
+            self.stale_banner.hide_banner()
@@ -1,19 +1,21 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QFrame, QGridLayout, QGraphicsDropShadowEffect)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPixmap, QColor
 from src.database import Database
 from src.auth import AuthManager
+from src.async_database import get_async_database
 from src.ui.widgets.loading_overlay import LoadingOverlay
+from src.ui.data_view import DataView, clear_layout
 from src.ui.theme import Theme, lighten_color
 from src.ui.icon_helper import display_icon_text
 from src.ui.assets import get_stat_icon_path
 
-class HomeView(QWidget):
+class HomeView(DataView):
+    action_name = "Inicio"
+
     def __init__(self, database: Database, auth_manager: AuthManager):
-        super().__init__()
-        self.db = database
-        self.auth = auth_manager
+        super().__init__(database, auth_manager)
         self.init_ui()
 
     def init_ui(self):
@@ -21,19 +23,18 @@ class HomeView(QWidget):
         layout.setContentsMargins(40, 40, 40, 40)
         layout.setSpacing(30)
 
-        current_user = self.auth.get_current_user() or {}
-        display_name = current_user.get('display_name') or "Estudiante"
-        welcome_label = QLabel(f"¡Bienvenido, {display_name}!")
+        self.welcome_label = QLabel()
         font = QFont("Arial", 28)
         font.setBold(True)
-        welcome_label.setFont(font)
-        welcome_label.setStyleSheet(f"color: {Theme.TEXT_PRIMARY};")
+        self.welcome_label.setFont(font)
+        self.welcome_label.setStyleSheet(f"color: {Theme.TEXT_PRIMARY};")
+        self.update_welcome()
 
         subtitle_label = QLabel("Continúa tu viaje de aprendizaje en química")
         subtitle_label.setFont(QFont("Arial", 14))
         subtitle_label.setStyleSheet(f"color: {Theme.TEXT_SECONDARY};")
 
-        layout.addWidget(welcome_label)
+        layout.addWidget(self.welcome_label)
         layout.addWidget(subtitle_label)
 
         self.stats_container = QWidget()
@@ -66,54 +67,70 @@ class HomeView(QWidget):
         self.setLayout(layout)
         # Overlay de carga para operaciones de refresco
         self.loading_overlay = LoadingOverlay(self, text="Cargando…")
-        # Lanzamos el primer refresco de forma diferida para que el overlay se pinte
-        self.start_refresh()
-
-    def start_refresh(self):
-        self.loading_overlay.show_overlay()
-        QTimer.singleShot(0, self.refresh)
+        # Sin refresco aquí: lo lanza MainWindow.show_view al mostrar la pestaña
 
-    def refresh(self):
+    def update_welcome(self):
+        current_user = self.auth.get_current_user() or {}
+        display_name = current_user.get('display_name') or "Estudiante"
+        self.welcome_label.setText(f"¡Bienvenido, {display_name}!")
+
+    def reset(self):
+        super().reset()
+        clear_layout(self.stats_layout)
+        clear_layout(self.modules_layout)
+        self.update_welcome()
+
+    def fetch_data(self) -> dict:
+        # Corre en un hilo del TaskRunner: solo llamadas a Database, nada de widgets
+        user_id = self.auth.get_current_user_id()
+        async_db = get_async_database(self.db)
+        if async_db is not None:
+            # Lecturas independientes en paralelo: el panel tarda lo que la más lenta
+            try:
+                return async_db.run(async_db.load_dashboard(user_id))
+            except Exception:
+                pass
+        data = {"stats": None, "modules": None, "completions": {}}
+        try:
+            data["stats"] = self.db.get_dashboard_stats(user_id)
+        except Exception:
+            pass
         try:
-            self.load_stats()
-            self.load_modules()
-        finally:
-            self.loading_overlay.hide_overlay()
+            data["modules"] = self.db.get_all_modules(strict=True) or []
+        except Exception:
+            return data
+        try:
+            data["completions"] = self.db.get_all_module_completion(user_id) or {}
+        except Exception:
+            pass
+        return data
 
-    def load_stats(self):
+    def fetch_failed(self, data: dict) -> bool:
+        return data is None or data.get("stats") is None or data.get("modules") is None
+
+    def render(self, data: dict):
+        self.load_stats(data["stats"])
+        self.load_modules(data["modules"], data["completions"])
+
+    def load_stats(self, stats):
         while self.stats_layout.count():
             child = self.stats_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
 
-        try:
-            user_id = self.auth.get_current_user_id()
-            progress = self.db.get_user_progress(user_id) or []
-        except Exception:
+        if stats is None:
             error_label = QLabel("Error al cargar estadísticas")
             error_label.setStyleSheet("color: #c62828;")
             self.stats_layout.addWidget(error_label)
             return
 
-        total_completed = sum(1 for p in progress if p['completed'])
-
-        try:
-            achievements = self.db.get_user_achievements(user_id) or []
-        except Exception:
-            achievements = []
-        total_achievements = len(achievements)
-
-        avg_score = 0
-        if progress:
-            avg_score = sum(p['score'] for p in progress) // len(progress)
-
-        stats = [
-            ("📖", "Lecciones Completadas", str(total_completed), get_stat_icon_path("lessons", "📖")),
-            ("🏆", "Logros Obtenidos", str(total_achievements), get_stat_icon_path("achievements", "🏆")),
-            ("⭐", "Puntuación Promedio", f"{avg_score}%", get_stat_icon_path("avg_score", "⭐"))
+        cards = [
+            ("📖", "Lecciones Completadas", str(stats["lessons_completed"]), get_stat_icon_path("lessons", "📖")),
+            ("🏆", "Logros Obtenidos", str(stats["achievements"]), get_stat_icon_path("achievements", "🏆")),
+            ("⭐", "Puntuación Promedio", f"{stats['average_score']}%", get_stat_icon_path("avg_score", "⭐"))
         ]
 
-        for emoji, title, value, icon_path in stats:
+        for emoji, title, value, icon_path in cards:
             stat_card = self.create_stat_card(emoji, title, value, icon_path=icon_path)
             self.stats_layout.addWidget(stat_card)
 
@@ -196,15 +213,12 @@ class HomeView(QWidget):
         card.setLayout(layout)
         return card
 
-    def load_modules(self):
+    def load_modules(self, modules, completions):
         while self.modules_layout.count():
             child = self.modules_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
-        try:
-            modules = self.db.get_all_modules() or []
-            user_id = self.auth.get_current_user_id()
-        except Exception:
+        if modules is None:
             error_label = QLabel("Error al cargar módulos")
             error_label.setStyleSheet("color: #c62828;")
             self.modules_layout.addWidget(error_label, 0, 0)
@@ -213,10 +227,7 @@ class HomeView(QWidget):
         row = 0
         col = 0
         for module in modules:
-            try:
-                completion = self.db.get_module_completion(user_id, module['id']) or {}
-            except Exception:
-                completion = {}
+            completion = completions.get(module['id'], {})
             card = self.create_module_card(module, completion)
             self.modules_layout.addWidget(card, row, col)
 
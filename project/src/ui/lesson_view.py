@@ -1,11 +1,14 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                             QPushButton, QTextBrowser, QScrollArea, QFrame,
+                             QPushButton, QScrollArea, QFrame,
                              QGraphicsDropShadowEffect)
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from src.database import Database
 from src.auth import AuthManager
+from src.prefetch import LessonPrefetcher
 from src.ui.quiz_view import QuizView
+from src.ui.task_runner import get_task_runner, PRIORITY_HIGH, PRIORITY_LOW
+from src.ui.widgets.lesson_browser import LessonBrowser
 
 class LessonView(QWidget):
     def __init__(self, database: Database, auth_manager: AuthManager, lesson: dict, parent_view):
@@ -14,7 +17,10 @@ class LessonView(QWidget):
         self.auth = auth_manager
         self.lesson = lesson
         self.parent_view = parent_view
+        self.runner = get_task_runner()
+        self._html = ''
         self.init_ui()
+        self._start_prefetch()
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -69,17 +75,20 @@ class LessonView(QWidget):
         content_layout.setContentsMargins(60, 40, 60, 40)
         content_layout.setSpacing(30)
 
-        content_browser = QTextBrowser()
-        html_content = self.lesson.get('content') or ''
-        placeholder = html_content.strip() == '' or 'Contenido próximamente' in html_content
-        if placeholder:
-            module = None
-            module_id = self.lesson.get('module_id')
-            if module_id is not None:
-                module = self.db.get_module_by_id(module_id)
-            title = (module or {}).get('title', '')
-            html_content = self._intro_html_for_module(title)
-        content_browser.setHtml(html_content)
+        content_browser = LessonBrowser()
+        self.content_browser = content_browser
+        cached = self.db.peek_lesson_content(self.lesson['id']) if 'content' not in self.lesson else None
+        if 'content' in self.lesson:
+            self._show_content(self.lesson['content'])
+        elif cached is not None:
+            # Ya en memoria (get_module_bundle o la precarga de la lección anterior)
+            self._show_content(cached)
+        else:
+            # Las tarjetas de lección no traen el HTML: se descarga al abrirla
+            content_browser.setHtml("<p>Cargando lección…</p>")
+            self.runner.submit(self.db.get_lesson_content, self.lesson['id'],
+                               on_result=self._show_content, priority=PRIORITY_HIGH, group=self,
+                               action="Lección: abrir")
         content_browser.setStyleSheet("""
             QTextBrowser {
                 border: none;
@@ -117,6 +126,7 @@ class LessonView(QWidget):
         quiz_description.setWordWrap(True)
 
         start_quiz_btn = QPushButton("Iniciar Cuestionario")
+        self.start_quiz_btn = start_quiz_btn
         start_quiz_btn.setStyleSheet("""
             QPushButton {
                 background-color: #4CAF50;
@@ -154,6 +164,44 @@ class LessonView(QWidget):
 
         self.setLayout(layout)
 
+    def _show_content(self, html_content):
+        html_content = html_content or ''
+        placeholder = html_content.strip() == '' or 'Contenido próximamente' in html_content
+        if placeholder:
+            # Introducción genérica mientras llega el título del módulo
+            html_content = self._intro_html_for_module('')
+            module_id = self.lesson.get('module_id')
+            if module_id is not None:
+                self.runner.submit(self.db.get_module_by_id, module_id,
+                                   on_result=self._on_module_loaded, priority=PRIORITY_HIGH, group=self)
+        self._html = html_content
+        self.content_browser.setHtml(html_content)
+        self._load_missing_images()
+
+    def _load_missing_images(self):
+        missing = self.content_browser.missing_images()
+        if not missing:
+            return
+        images = self.content_browser.images
+        self.runner.submit(lambda: sum(1 for url in missing if images.load(url) is not None),
+                           on_result=self._on_images_loaded, priority=PRIORITY_HIGH, group=self)
+
+    def _on_images_loaded(self, loaded):
+        if loaded:
+            self.content_browser.setHtml(self._html)
+
+    def _on_module_loaded(self, module):
+        title = (module or {}).get('title', '')
+        self._html = self._intro_html_for_module(title)
+        self.content_browser.setHtml(self._html)
+
+    def _start_prefetch(self):
+        # Lo siguiente que abrirá el alumno: este cuestionario y la próxima lección
+        prefetcher = LessonPrefetcher(self.db, images=self.content_browser.images,
+                                      is_busy=self.runner.foreground_pending)
+        self.runner.submit(prefetcher.run, dict(self.lesson), priority=PRIORITY_LOW, group=(self, "prefetch"),
+                           cancellable=True)
+
     def _intro_html_for_module(self, module_title: str) -> str:
         t = (module_title or '').lower()
         if 'conceptos básicos' in t:
@@ -221,9 +269,22 @@ class LessonView(QWidget):
 
     def start_quiz(self):
         lesson_id = self.lesson.get('id')
-        quizzes = []
-        if lesson_id:
-            quizzes = self.db.get_quizzes_by_lesson(lesson_id)
+        if not lesson_id:
+            self._open_quiz([])
+            return
+        quizzes = self.db.peek_quizzes(lesson_id)
+        if quizzes is not None:
+            self._open_quiz(quizzes)
+            return
+        self.start_quiz_btn.setEnabled(False)
+        self.start_quiz_btn.setText("Cargando…")
+        self.runner.submit(self.db.get_quizzes_by_lesson, lesson_id,
+                           on_result=self._open_quiz, on_error=lambda e: self._open_quiz([]),
+                           priority=PRIORITY_HIGH, group=self, action="Lección: iniciar cuestionario")
+
+    def _open_quiz(self, quizzes):
+        self.start_quiz_btn.setEnabled(True)
+        self.start_quiz_btn.setText("Iniciar Cuestionario")
 
         if not quizzes:
             from PyQt5.QtWidgets import QMessageBox
@@ -237,5 +298,11 @@ class LessonView(QWidget):
             parent.addWidget(quiz_view)
             parent.setCurrentWidget(quiz_view)
 
+    def cancel_pending(self):
+        """Descarta las cargas de la lección y detiene su precarga."""
+        self.runner.cancel_group(self)
+        self.runner.cancel_group((self, "prefetch"))
+
     def go_back(self):
+        self.cancel_pending()
         self.parent_view.return_to_module()
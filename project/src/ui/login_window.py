@@ -6,6 +6,7 @@ from src.auth import AuthManager
 import re
 from PyQt5.QtCore import QTimer
 from src.ui.widgets.loading_overlay import LoadingOverlay
+from src.ui.task_runner import get_task_runner, PRIORITY_HIGH
 
 class LoginWindow(QWidget):
     login_successful = pyqtSignal()
@@ -207,6 +208,22 @@ class LoginWindow(QWidget):
         page.setLayout(layout)
         return page
 
+    def reset(self):
+        """Deja el formulario vacío para el siguiente alumno (la ventana se reutiliza)."""
+        for field in (self.login_username_input, self.register_username_input,
+                      self.register_display_name_input):
+            field.blockSignals(True)
+            field.clear()
+            field.blockSignals(False)
+        self.login_debounce_timer.stop()
+        self.register_debounce_timer.stop()
+        self.login_error_label.hide()
+        self.register_error_label.hide()
+        self.stop_processing_login()
+        self.stop_processing_register()
+        self.stacked_widget.setCurrentIndex(0)
+        self.login_username_input.setFocus()
+
     def handle_login(self):
         username = self.login_username_input.text().strip()
         error = self.validate_username(username)
@@ -215,7 +232,14 @@ class LoginWindow(QWidget):
             self.login_error_label.show()
             return
         self.start_processing_login()
-        success, message = self.auth_manager.login(username)
+        # La consulta a Database corre en segundo plano para no congelar el overlay
+        get_task_runner().submit(self.auth_manager.login, username,
+                                 on_result=self._on_login_result,
+                                 on_error=lambda e: self._on_login_result((False, "Error de conexión. Intenta nuevamente.")),
+                                 priority=PRIORITY_HIGH, action="Inicio de sesión")
+
+    def _on_login_result(self, result):
+        success, message = result
         self.stop_processing_login()
 
         if success:
@@ -236,7 +260,13 @@ class LoginWindow(QWidget):
             return
 
         self.start_processing_register()
-        success, message = self.auth_manager.register(username, display_name)
+        get_task_runner().submit(self.auth_manager.register, username, display_name,
+                                 on_result=self._on_register_result,
+                                 on_error=lambda e: self._on_register_result((False, "Error de conexión. Intenta nuevamente.")),
+                                 priority=PRIORITY_HIGH, action="Registro")
+
+    def _on_register_result(self, result):
+        success, message = result
         self.stop_processing_register()
 
         if success:
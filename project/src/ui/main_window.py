@@ -1,6 +1,9 @@
+import os
+from typing import Callable, List, Optional, Sequence, Tuple
+
 from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QStackedWidget, QLabel, QScrollArea, QProgressBar, QCheckBox)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+from PyQt5.QtCore import Qt, QEvent, QTimer, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
 from src.database import Database
 from src.auth import AuthManager
@@ -8,16 +11,44 @@ from src.ui.home_view import HomeView
 from src.ui.modules_view import ModulesView
 from src.ui.progress_view import ProgressView
 from src.ui.achievements_view import AchievementsView
+from src.ui.data_view import DataView
 from src.ui.widgets.loading_overlay import LoadingOverlay
 from src.ui.widgets.about_dialog import AboutDialog
 from src.ui.theme import Theme, lighten_color, set_mode
+from src.ui.task_runner import get_task_runner, PRIORITY_HIGH
+from src.startup_profile import profile_span
+
+ViewFactory = Callable[[Database, AuthManager], DataView]
+
+# Vista de cada pestaña, en el orden de los botones. Cada una se construye la
+# primera vez que se abre; las demás, en ratos libres tras el primer pintado
+VIEW_FACTORIES: Tuple[Tuple[str, ViewFactory], ...] = (
+    ("HomeView", HomeView),
+    ("ModulesView", ModulesView),
+    ("ProgressView", ProgressView),
+    ("AchievementsView", AchievementsView),
+)
+# "0" deja sin construir las pestañas que el alumno no abra (menos memoria)
+PREBUILD_ENV = "QUIMICAPRO_PREBUILD_VIEWS"
+PREBUILD_DELAY_MS = 200
+
+
+def prebuild_enabled() -> bool:
+    return os.environ.get(PREBUILD_ENV, "1").strip().lower() not in ("0", "false", "no", "off")
+
 
 class MainWindow(QMainWindow):
     logout_requested = pyqtSignal()
-    def __init__(self, database: Database, auth_manager: AuthManager):
+    def __init__(self, database: Database, auth_manager: AuthManager,
+                 view_factories: Sequence[Tuple[str, ViewFactory]] = VIEW_FACTORIES,
+                 prebuild: Optional[bool] = None):
         super().__init__()
         self.db = database
         self.auth = auth_manager
+        self.view_factories = list(view_factories)
+        self.views: List[Optional[DataView]] = [None] * len(self.view_factories)
+        self.runner = get_task_runner()
+        self._prebuild_pending = prebuild_enabled() if prebuild is None else prebuild
         self.init_ui()
 
     def init_ui(self):
@@ -82,15 +113,9 @@ class MainWindow(QMainWindow):
         self.content_stack = QStackedWidget()
         self.content_stack.setStyleSheet(f"background-color: {Theme.BACKGROUND};")
 
-        self.home_view = HomeView(self.db, self.auth)
-        self.modules_view = ModulesView(self.db, self.auth)
-        self.progress_view = ProgressView(self.db, self.auth)
-        self.achievements_view = AchievementsView(self.db, self.auth)
-
-        self.content_stack.addWidget(self.home_view)
-        self.content_stack.addWidget(self.modules_view)
-        self.content_stack.addWidget(self.progress_view)
-        self.content_stack.addWidget(self.achievements_view)
+        # Un hueco vacío por pestaña hasta que se construya su vista (get_view)
+        for _ in self.view_factories:
+            self.content_stack.addWidget(QWidget())
 
         content_layout.addWidget(self.loading_bar)
         content_layout.addWidget(self.content_stack, 1)
@@ -133,14 +158,14 @@ class MainWindow(QMainWindow):
         app_title.setStyleSheet("color: white;")
         app_title.setAlignment(Qt.AlignCenter)
 
-        user = self.auth.get_current_user()
-        user_label = QLabel(f"👤 {user['display_name']}")
-        user_label.setFont(QFont("Arial", 12))
-        user_label.setStyleSheet("color: white; padding: 10px;")
-        user_label.setAlignment(Qt.AlignCenter)
+        self.user_label = QLabel()
+        self.user_label.setFont(QFont("Arial", 12))
+        self.user_label.setStyleSheet("color: white; padding: 10px;")
+        self.user_label.setAlignment(Qt.AlignCenter)
+        self.update_user_label()
 
         layout.addWidget(app_title)
-        layout.addWidget(user_label)
+        layout.addWidget(self.user_label)
         layout.addSpacing(20)
 
         # Switch de tema (Claro/Oscuro)
@@ -222,6 +247,59 @@ class MainWindow(QMainWindow):
         self.sidebar = sidebar
         return sidebar
 
+    def update_user_label(self):
+        user = self.auth.get_current_user() or {}
+        self.user_label.setText(f"👤 {user.get('display_name', '')}")
+
+    def start_session(self):
+        """Prepara la ventana para el usuario que acaba de iniciar sesión.
+
+        La ventana y sus vistas sobreviven al cierre de sesión (cambio rápido de
+        alumno en el aula): solo se vacía lo que era del usuario anterior y se
+        vuelve a Inicio. El catálogo sigue en las cachés de Database.
+        """
+        for view in self.built_views():
+            view.reset()
+        self.update_user_label()
+        self.show_view(0)
+
+    def get_view(self, index: int) -> DataView:
+        """Vista de la pestaña `index`; se construye la primera vez que se pide."""
+        view = self.views[index]
+        if view is None:
+            name, factory = self.view_factories[index]
+            # Cada vista se mide por separado con --profile-startup
+            with profile_span(name, "view"):
+                view = factory(self.db, self.auth)
+            placeholder = self.content_stack.widget(index)
+            self.content_stack.insertWidget(index, view)
+            self.content_stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+            view.loaded.connect(lambda index=index: self._on_view_loaded(index))
+            self.views[index] = view
+        return view
+
+    def built_views(self) -> List[DataView]:
+        return [view for view in self.views if view is not None]
+
+    def event(self, event):
+        if event.type() == QEvent.Paint and self._prebuild_pending:
+            # Primer pintado: Inicio ya está en pantalla, el resto puede esperar
+            self._prebuild_pending = False
+            QTimer.singleShot(PREBUILD_DELAY_MS, self._prebuild_next_view)
+        return super().event(event)
+
+    def _prebuild_next_view(self):
+        pending = [index for index, view in enumerate(self.views) if view is None]
+        if not pending:
+            return
+        # Ceder el paso mientras la pestaña visible esté cargando sus datos
+        if not self.runner.foreground_pending():
+            self.get_view(pending[0])
+            pending = pending[1:]
+        if pending:
+            QTimer.singleShot(PREBUILD_DELAY_MS, self._prebuild_next_view)
+
     def show_about_dialog(self):
         try:
             dlg = AboutDialog(self)
@@ -233,6 +311,9 @@ class MainWindow(QMainWindow):
         mode = "dark" if checked else "light"
         set_mode(mode)
         self.apply_theme()
+        # Los widgets ya pintados llevan los colores del tema anterior
+        for view in self.built_views():
+            view.mark_stale()
         current = self.content_stack.currentIndex()
         self.show_view(current)
 
@@ -252,46 +333,53 @@ class MainWindow(QMainWindow):
             btn.setChecked(False)
 
         self.nav_buttons[index].setChecked(True)
+        previous = self.content_stack.currentIndex()
+        if previous != index and self.views[previous] is not None:
+            # Descartar la carga de la pestaña que se abandona
+            self.views[previous].cancel_pending()
+        view = self.get_view(index)
         self.content_stack.setCurrentIndex(index)
 
-        # Mostrar indicador y diferir la actualización para permitir refrescar UI
-        self.start_loading()
-        QTimer.singleShot(0, lambda: self._refresh_view(index))
+        # El refresco corre en segundo plano; el indicador se oculta con la señal `loaded`.
+        # Si la vista ya tiene datos se muestran al instante y solo se revalidan
+        self.start_loading(cold=not view.rendered)
+        self._refresh_view(index)
 
     def _refresh_view(self, index: int):
-        try:
-            if index == 0:
-                self.home_view.refresh()
-            elif index == 1:
-                self.modules_view.refresh()
-            elif index == 2:
-                self.progress_view.refresh()
-            elif index == 3:
-                self.achievements_view.refresh()
-        finally:
+        self.views[index].refresh(priority=PRIORITY_HIGH)
+
+    def _on_view_loaded(self, index: int):
+        if index == self.content_stack.currentIndex():
             self.stop_loading()
 
-    def start_loading(self):
+    def start_loading(self, cold: bool = True):
         self.loading_bar.show()
-        self.loading_overlay.show_overlay()
+        if cold:
+            self.loading_overlay.show_overlay()
 
     def stop_loading(self):
         self.loading_bar.hide()
         self.loading_overlay.hide_overlay()
 
     def handle_logout(self):
+        # Nada del alumno que se va debe llegar a pintarse: se cancelan sus
+        # cargas y se vacían las vistas antes de cerrar la sesión
+        for view in self.built_views():
+            view.reset()
+        self.db.end_session()
         self.auth.logout()
-        # Emitimos señal explícita para que la app muestre LoginWindow
+        # Emitimos señal explícita para que la app muestre LoginWindow.
+        # Se oculta sin destruirla: el siguiente inicio de sesión la reutiliza
         try:
             self.logout_requested.emit()
         finally:
-            self.close()
+            self.hide()
 
     # Notificación desde vistas hijas cuando se otorga un logro
     def notify_achievement_awarded(self):
         try:
             # Si la pestaña de Logros está visible, refrescar inmediatamente
             if self.content_stack.currentIndex() == 3:
-                self.achievements_view.refresh()
+                self.views[3].refresh()
         except Exception:
             pass
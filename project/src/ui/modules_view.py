@@ -1,20 +1,22 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QFrame, QScrollArea, QListWidget,
                              QListWidgetItem, QStackedWidget)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from src.database import Database
 from src.auth import AuthManager
 from src.ui.lesson_view import LessonView
 from src.ui.widgets.loading_overlay import LoadingOverlay
+from src.ui.data_view import DataView
+from src.ui.task_runner import PRIORITY_HIGH
 from src.ui.theme import Theme, lighten_color
 from src.ui.icon_helper import display_icon_text
 
-class ModulesView(QWidget):
+class ModulesView(DataView):
+    action_name = "Módulos"
+
     def __init__(self, database: Database, auth_manager: AuthManager):
-        super().__init__()
-        self.db = database
-        self.auth = auth_manager
+        super().__init__(database, auth_manager)
         self.current_module = None
         self.init_ui()
 
@@ -77,46 +79,92 @@ class ModulesView(QWidget):
         # Overlay de carga para refrescos y selección de módulo
         self.loading_overlay = LoadingOverlay(self, text="Cargando…")
 
-    def refresh(self):
-        self.loading_overlay.show_overlay()
-        QTimer.singleShot(0, self._do_refresh)
-
-    def _do_refresh(self):
+    def fetch_data(self):
+        # None indica error de carga (ver DataView.fetch_failed); [] es que no hay módulos
         try:
-            self.modules_list.clear()
-            try:
-                modules = self.db.get_all_modules() or []
-            except Exception:
-                error_item = QListWidgetItem("Error al cargar módulos")
-                self.modules_list.addItem(error_item)
-                return
-
-            for module in modules:
-                item = QListWidgetItem(f"{display_icon_text(module.get('icon'))}  {module.get('title','(Sin título)')}")
-                item.setData(Qt.UserRole, module)
-                font = QFont("Arial", 12)
-                font.setBold(True)
-                item.setFont(font)
-                self.modules_list.addItem(item)
-
-            if self.current_module:
-                self.load_module_content(self.current_module)
-        finally:
-            self.loading_overlay.hide_overlay()
+            return self.db.get_all_modules(strict=True) or []
+        except Exception:
+            return None
+
+    def render(self, modules):
+        self.modules_list.clear()
+        if modules is None:
+            error_item = QListWidgetItem("Error al cargar módulos")
+            self.modules_list.addItem(error_item)
+            return
+
+        for module in modules:
+            item = QListWidgetItem(f"{display_icon_text(module.get('icon'))}  {module.get('title','(Sin título)')}")
+            item.setData(Qt.UserRole, module)
+            font = QFont("Arial", 12)
+            font.setBold(True)
+            item.setFont(font)
+            self.modules_list.addItem(item)
+
+        if self.current_module:
+            self.load_module_content(self.current_module)
+
+    def cancel_pending(self):
+        # Incluye el módulo que se esté abriendo: su resultado es del alumno actual
+        self.runner.cancel_group((self, "module"))
+        super().cancel_pending()
+
+    def reset(self):
+        # La lista de módulos es catálogo y se conserva; el módulo abierto y
+        # las lecciones (con su progreso) son del alumno anterior
+        self.runner.cancel_group((self, "module"))
+        super().reset()
+        self.current_module = None
+        self.lesson_view = None
+        self.modules_list.clearSelection()
+        while self.content_stack.count() > 1:
+            widget = self.content_stack.widget(1)
+            self.runner.cancel_group(widget)
+            self.runner.cancel_group((widget, "prefetch"))
+            self.content_stack.removeWidget(widget)
+            widget.deleteLater()
+        self.content_stack.setCurrentIndex(0)
 
     def on_module_selected(self, item: QListWidgetItem):
         module = item.data(Qt.UserRole)
         self.current_module = module
+        self.load_module_content(module)
+
+    def load_module_content(self, module: dict):
+        # Descarga en segundo plano; si el usuario elige otro módulo antes, el resultado se descarta
+        group = (self, "module")
+        self.runner.cancel_group(group)
         self.loading_overlay.show_overlay()
-        QTimer.singleShot(0, lambda: self._load_module_safe(module))
+        self.runner.submit(self.fetch_module_content, module,
+                           on_result=lambda data: self._on_module_content(module, data),
+                           on_error=lambda e: self.loading_overlay.hide_overlay(),
+                           priority=PRIORITY_HIGH, group=group, action="Módulos: abrir módulo")
+
+    def fetch_module_content(self, module: dict) -> dict:
+        user_id = self.auth.get_current_user_id()
+        data = {"completion": {}, "lessons": [], "progress": []}
+        try:
+            data["completion"] = self.db.get_module_completion(user_id, module.get('id')) or {}
+        except Exception:
+            pass
+        try:
+            # Una sola consulta trae lecciones y quizzes del módulo y llena las cachés
+            # que usan LessonView y QuizView al navegar dentro de él
+            self.db.get_module_bundle(module.get('id'))
+            data["lessons"] = self.db.get_lessons_by_module(module.get('id')) or []
+            data["progress"] = self.db.get_user_progress(user_id) or []
+        except Exception:
+            data["lessons"] = []
+            data["progress"] = []
+        return data
 
-    def _load_module_safe(self, module: dict):
+    def _on_module_content(self, module: dict, data: dict):
         try:
-            self.load_module_content(module)
+            self.render_module_content(module, data)
         finally:
             self.loading_overlay.hide_overlay()
 
-    def load_module_content(self, module: dict):
+    def render_module_content(self, module: dict, data: dict):
         while self.content_stack.count() > 1:
             widget = self.content_stack.widget(1)
             self.content_stack.removeWidget(widget)
@@ -138,12 +186,7 @@ class ModulesView(QWidget):
         description.setStyleSheet(f"color: {Theme.TEXT_SECONDARY};")
         description.setWordWrap(True)
 
-        try:
-            user_id = self.auth.get_current_user_id()
-            completion = self.db.get_module_completion(user_id, module.get('id')) or {}
-        except Exception:
-            completion = {}
-
+        completion = data["completion"]
         completed = completion.get('completed', 0)
         total = completion.get('total', 0)
         percentage = completion.get('percentage', 0)
@@ -164,12 +207,8 @@ class ModulesView(QWidget):
         lessons_label.setStyleSheet(f"color: {Theme.TEXT_PRIMARY}; margin-top: 20px;")
         layout.addWidget(lessons_label)
 
-        try:
-            lessons = self.db.get_lessons_by_module(module.get('id')) or []
-            progress_data = self.db.get_user_progress(user_id) or []
-        except Exception:
-            lessons = []
-            progress_data = []
+        lessons = data["lessons"]
+        progress_data = data["progress"]
 
         # Filtrar la lección de prueba si existiera en BD
         def _is_test_lesson(l: dict) -> bool:
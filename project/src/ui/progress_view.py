@@ -1,18 +1,20 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QFrame, QScrollArea, QProgressBar)
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont, QPixmap
 from src.database import Database
 from src.auth import AuthManager
+from src.async_database import get_async_database
 from src.ui.widgets.loading_overlay import LoadingOverlay
+from src.ui.data_view import DataView, clear_layout
 from src.ui.theme import Theme, lighten_color
 from src.ui.assets import get_stat_icon_path
 
-class ProgressView(QWidget):
+class ProgressView(DataView):
+    action_name = "Progreso"
+
     def __init__(self, database: Database, auth_manager: AuthManager):
-        super().__init__()
-        self.db = database
-        self.auth = auth_manager
+        super().__init__(database, auth_manager)
         self.init_ui()
 
     def init_ui(self):
@@ -64,69 +66,69 @@ class ProgressView(QWidget):
         # Overlay de carga para refrescos
         self.loading_overlay = LoadingOverlay(self, text="Cargando…")
 
-    def refresh(self):
-        self.loading_overlay.show_overlay()
-        QTimer.singleShot(0, self._do_refresh)
-
-    def _do_refresh(self):
+    def reset(self):
+        super().reset()
+        clear_layout(self.stats_layout)
+        clear_layout(self.modules_layout)
+
+    def fetch_data(self) -> dict:
+        # Corre en un hilo del TaskRunner; módulos y completitud se piden una sola vez
+        # y se comparten entre las estadísticas globales y las tarjetas por módulo
+        user_id = self.auth.get_current_user_id()
+        async_db = get_async_database(self.db)
+        if async_db is not None:
+            try:
+                return async_db.run(async_db.load_dashboard(user_id))
+            except Exception:
+                pass
+        data = {"stats": None, "modules": None, "completions": {}}
+        try:
+            data["stats"] = self.db.get_dashboard_stats(user_id)
+        except Exception:
+            pass
         try:
-            self.load_overall_stats()
-            self.load_module_progress()
-        finally:
-            self.loading_overlay.hide_overlay()
+            data["modules"] = self.db.get_all_modules(strict=True) or []
+            data["completions"] = self.db.get_all_module_completion(user_id) or {}
+        except Exception:
+            pass
+        return data
+
+    def fetch_failed(self, data: dict) -> bool:
+        return data is None or data.get("stats") is None or data.get("modules") is None
+
+    def render(self, data: dict):
+        self.load_overall_stats(data["stats"])
+        self.load_module_progress(data["modules"], data["completions"])
 
-    def load_overall_stats(self):
+    def load_overall_stats(self, stats):
         while self.stats_layout.count():
             child = self.stats_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
 
-        try:
-            user_id = self.auth.get_current_user_id()
-            progress = self.db.get_user_progress(user_id) or []
-        except Exception:
+        if stats is None:
             error_label = QLabel("Error al cargar estadísticas")
             error_label.setStyleSheet("color: #c62828;")
             self.stats_layout.addWidget(error_label)
             return
 
-        total_completed = sum(1 for p in progress if p['completed'])
-
-        avg_score = 0
-        if progress:
-            avg_score = sum(p['score'] for p in progress) // len(progress)
-
-        try:
-            modules = self.db.get_all_modules() or []
-        except Exception:
-            modules = []
-        completed_modules = 0
-        # Acumular lecciones para poder calcular porcentaje global
-        lessons_completed_total = 0
-        lessons_total = 0
-        for module in modules:
-            try:
-                completion = self.db.get_module_completion(user_id, module.get('id')) or {}
-            except Exception:
-                completion = {}
-            if completion['percentage'] == 100:
-                completed_modules += 1
-            # Sumar lecciones completadas y totales si están disponibles
-            lessons_completed_total += completion.get('completed', 0)
-            lessons_total += completion.get('total', 0)
+        completed_modules = stats["modules_completed"]
+        modules_total = stats["modules_total"]
+        avg_score = stats["average_score"]
 
         # Calcular porcentajes para cada estadística
-        percent_modules = int((completed_modules / len(modules)) * 100) if len(modules) > 0 else 0
-        percent_lessons = int((lessons_completed_total / lessons_total) * 100) if lessons_total > 0 else 0
+        percent_modules = int((completed_modules / modules_total) * 100) if modules_total > 0 else 0
+        lessons_total = stats["lessons_total"]
+        percent_lessons = int((stats["module_lessons_completed"] / lessons_total) * 100) if lessons_total > 0 else 0
         percent_score = int(avg_score)
 
-        stats = [
-            ("📚", "Módulos Completados", f"{completed_modules}/{len(modules)}", get_stat_icon_path("modules", "📚"), percent_modules),
-            ("📖", "Lecciones Completadas", str(total_completed), get_stat_icon_path("lessons", "📖"), percent_lessons),
+        cards = [
+            ("📚", "Módulos Completados", f"{completed_modules}/{modules_total}", get_stat_icon_path("modules", "📚"), percent_modules),
+            ("📖", "Lecciones Completadas", str(stats["lessons_completed"]), get_stat_icon_path("lessons", "📖"), percent_lessons),
             ("⭐", "Puntuación Promedio", str(avg_score), get_stat_icon_path("avg_score", "⭐"), percent_score)
         ]
 
-        for emoji, title, value, icon_path, percent in stats:
+        for emoji, title, value, icon_path, percent in cards:
             stat_card = self.create_stat_card(emoji, title, value, icon_path=icon_path, percent=percent)
             self.stats_layout.addWidget(stat_card)
 
@@ -212,23 +214,14 @@ class ProgressView(QWidget):
         card.setLayout(layout)
         return card
 
-    def load_module_progress(self):
+    def load_module_progress(self, modules, completions):
         while self.modules_layout.count():
             child = self.modules_layout.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
 
-        try:
-            user_id = self.auth.get_current_user_id()
-            modules = self.db.get_all_modules() or []
-        except Exception:
-            modules = []
-
-        for module in modules:
-            try:
-                completion = self.db.get_module_completion(user_id, module.get('id')) or {}
-            except Exception:
-                completion = {}
+        for module in modules or []:
+            completion = completions.get(module.get('id'), {})
             card = self.create_module_progress_card(module, completion)
             self.modules_layout.addWidget(card)
 
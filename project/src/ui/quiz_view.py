@@ -5,7 +5,8 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 from src.database import Database
 from src.auth import AuthManager
-from datetime import datetime, timedelta
+from src.metrics import report_error
+from src.ui.task_runner import get_task_runner, PRIORITY_HIGH
 
 class QuizView(QWidget):
     def __init__(self, database: Database, auth_manager: AuthManager, lesson: dict, quizzes: list, parent_view):
@@ -18,6 +19,7 @@ class QuizView(QWidget):
         self.current_question_index = 0
         self.score = 0
         self.answers = {}
+        self.runner = get_task_runner()
         self.init_ui()
 
     def init_ui(self):
@@ -326,9 +328,11 @@ class QuizView(QWidget):
         self.content_layout.addWidget(finish_btn, alignment=Qt.AlignCenter)
 
         user_id = self.auth.get_current_user_id()
-        self.db.save_lesson_progress(user_id, self.lesson['id'], True, percentage)
-
-        self.check_achievements(percentage)
+        # Guardar y evaluar logros en segundo plano; los avisos se muestran al terminar.
+        # Sin grupo: la escritura debe completarse aunque el usuario salga del resultado.
+        self.runner.submit(self.save_and_check_achievements, user_id, percentage,
+                           on_result=self.on_achievements_awarded, priority=PRIORITY_HIGH,
+                           action="Cuestionario: enviar")
 
     def create_review_card(self, index: int, quiz: dict) -> QFrame:
         user_answer = self.answers.get(index, "Sin respuesta")
@@ -378,75 +382,45 @@ class QuizView(QWidget):
         card.setLayout(layout)
         return card
 
-    def check_achievements(self, percentage: int):
-        user_id = self.auth.get_current_user_id()
-        achievements = self.db.get_all_achievements()
-        progress = self.db.get_user_progress(user_id)
-        any_awarded = False
-        completed_lessons = sum(1 for p in progress if p['completed'])
-
-        for achievement in achievements:
-            if achievement['requirement_type'] == 'lesson_complete' and completed_lessons >= achievement['requirement_value']:
-                awarded = self.db.award_achievement(user_id, achievement['id'])
-                if awarded:
-                    any_awarded = True
-                    QMessageBox.information(self, "🏆 ¡Logro Desbloqueado!",
-                                          f"{achievement['title']}\n\n{achievement['description']}")
-
-            elif achievement['requirement_type'] == 'perfect_score' and percentage >= achievement['requirement_value']:
-                awarded = self.db.award_achievement(user_id, achievement['id'])
-                if awarded:
-                    any_awarded = True
-                    QMessageBox.information(self, "🏆 ¡Logro Desbloqueado!",
-                                          f"{achievement['title']}\n\n{achievement['description']}")
-
-        # Calcular racha diaria de aprendizaje (días consecutivos con al menos una lección completada)
-        dates = []
-        for p in progress:
-            if p.get('completed') and p.get('completed_at'):
-                try:
-                    dt = datetime.fromisoformat(p['completed_at'])
-                    dates.append(dt.date())
-                except Exception:
-                    pass
-        unique_dates = sorted(set(dates))
-        max_streak = 0
-        current_streak = 0
-        prev_date = None
-        for d in unique_dates:
-            if prev_date is None or d == prev_date + timedelta(days=1):
-                current_streak += 1
-            else:
-                current_streak = 1
-            max_streak = max(max_streak, current_streak)
-            prev_date = d
-
-        for achievement in achievements:
-            if achievement['requirement_type'] == 'streak' and max_streak >= achievement['requirement_value']:
-                awarded = self.db.award_achievement(user_id, achievement['id'])
-                if awarded:
-                    any_awarded = True
-                    QMessageBox.information(self, "🏆 ¡Logro Desbloqueado!",
-                                          f"{achievement['title']}\n\n{achievement['description']}")
-
-        modules = self.db.get_all_modules()
-        for module in modules:
-            completion = self.db.get_module_completion(user_id, module['id'])
-            if completion['percentage'] == 100:
-                matching_achievements = [a for a in achievements
-                                       if a['requirement_type'] == 'module_complete'
-                                       and a['requirement_value'] == module['id']]
-                for achievement in matching_achievements:
-                    awarded = self.db.award_achievement(user_id, achievement['id'])
-                    if awarded:
-                        any_awarded = True
-                        QMessageBox.information(self, "🏆 ¡Logro Desbloqueado!",
-                                              f"{achievement['title']}\n\n{achievement['description']}")
+    def save_and_check_achievements(self, user_id: str, percentage: int) -> list:
+        # Corre en un hilo del TaskRunner: solo Database, nada de widgets
+        # Enviar antes lo que quedó en cola para que el servidor otorgue los logros con
+        # todo el progreso; submit_quiz descarta lo que quede en cola de esta lección
+        self.db.flush_pending_writes()
+        awarded = self.db.submit_quiz(user_id, self.lesson['id'], percentage)
+        if awarded is not None:
+            return awarded
+        # Sin RPC: el progreso queda en la cola local aunque no haya red
+        # y los logros se evalúan en el cliente
+        self.db.queue_lesson_progress(user_id, self.lesson['id'], True, percentage)
+        self.db.flush_pending_writes()
+        return self.check_achievements(user_id, percentage)
+
+    def check_achievements(self, user_id: str, percentage: int) -> list:
+        """Otorga los logros alcanzados y devuelve los recién desbloqueados.
+
+        El motor de logros solo evalúa las reglas afectadas por esta lección.
+        """
+        try:
+            engine = self.db.get_achievement_engine(user_id)
+        except Exception as e:
+            report_error("Error checking achievements", e)
+            return []
+        unlocked = engine.record_lesson(self.lesson['id'], percentage)
+        if not unlocked:
+            return []
+        accepted = set(self.db.queue_achievements(user_id, [a['id'] for a in unlocked]))
+        return [achievement for achievement in unlocked if achievement['id'] in accepted]
+
+    def on_achievements_awarded(self, awarded_achievements: list):
+        for achievement in awarded_achievements:
+            QMessageBox.information(self, "🏆 ¡Logro Desbloqueado!",
+                                  f"{achievement['title']}\n\n{achievement['description']}")
 
         # Notificar ventana principal si hay nuevos logros
         try:
             main_window = self.window()
-            if hasattr(main_window, 'notify_achievement_awarded') and any_awarded:
+            if hasattr(main_window, 'notify_achievement_awarded') and awarded_achievements:
                 main_window.notify_achievement_awarded()
         except Exception:
             pass
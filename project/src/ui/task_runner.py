@@ -0,0 +1,163 @@
+import contextvars
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from src.metrics import ActionScope, get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Prioridades de QThreadPool: los números mayores salen antes de la cola
+PRIORITY_HIGH = 10      # vista visible
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 0        # precargas y trabajo en segundo plano
+
+MAX_THREADS = 4
+
+
+class TaskHandle:
+    """Identifica una tarea enviada; permite cancelarla o descartar su resultado."""
+
+    def __init__(self, group: Optional[Hashable] = None, foreground: bool = True):
+        self.group = group
+        self.foreground = foreground
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class _Task(QRunnable):
+    def __init__(self, fn: Callable[..., Any], args, kwargs, handle: TaskHandle, signals: _TaskSignals,
+                 context: contextvars.Context):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.handle = handle
+        self.signals = signals
+        # Contexto del hilo que envió la tarea (acción de la UI para las métricas)
+        self.context = context
+
+    def run(self):
+        # Una tarea cancelada antes de empezar ni siquiera toca la red;
+        # igualmente se notifica para que el runner libere sus referencias
+        if self.handle.cancelled:
+            self.signals.finished.emit(None)
+            return
+        try:
+            result = self.context.run(self.fn, *self.args, **self.kwargs)
+        except Exception as e:
+            logger.exception("Background task failed")
+            self.signals.failed.emit(e)
+            return
+        self.signals.finished.emit(result)
+
+
+class TaskRunner(QObject):
+    """Ejecuta llamadas bloqueantes (p. ej. Database) en un QThreadPool.
+
+    Los resultados vuelven al hilo de la interfaz mediante señales, así que los
+    callbacks `on_result`/`on_error` pueden tocar widgets con seguridad. Las
+    tareas se agrupan (normalmente por vista) para poder descartar resultados
+    obsoletos cuando el usuario navega a otra parte antes de que terminen.
+    """
+
+    def __init__(self, pool: Optional[QThreadPool] = None, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        if pool is None:
+            pool = QThreadPool()
+            pool.setMaxThreadCount(MAX_THREADS)
+        self.pool = pool
+        self._active: Dict[TaskHandle, _TaskSignals] = {}
+        self._groups: Dict[Hashable, Set[TaskHandle]] = {}
+        # Tareas por encima de PRIORITY_LOW aún sin entregar (ver foreground_pending)
+        self._foreground = 0
+
+    def submit(self, fn: Callable[..., Any], *args,
+               on_result: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               priority: int = PRIORITY_NORMAL,
+               group: Optional[Hashable] = None,
+               action: Optional[str] = None,
+               cancellable: bool = False,
+               **kwargs) -> TaskHandle:
+        """Encola `fn(*args, **kwargs)`.
+
+        Con `action` (p. ej. "Progreso: refresco") las llamadas a Database de la
+        tarea se agrupan bajo esa acción en las métricas hasta entregar el resultado.
+        Con `cancellable`, `fn` recibe además `cancelled`, una función que dice si
+        la tarea ya se canceló, para que los trabajos largos corten a mitad.
+        """
+        handle = TaskHandle(group, foreground=priority > PRIORITY_LOW)
+        if cancellable:
+            kwargs["cancelled"] = lambda: handle.cancelled
+        if handle.foreground:
+            self._foreground += 1
+        signals = _TaskSignals()
+        metrics = get_metrics()
+        scope = metrics.begin_action(action) if action else None
+        if scope is not None:
+            with metrics.activate(scope):
+                context = contextvars.copy_context()
+        else:
+            context = contextvars.copy_context()
+        signals.finished.connect(lambda result: self._deliver(handle, on_result, result, scope))
+        signals.failed.connect(lambda error: self._deliver(handle, on_error, error, scope))
+        self._active[handle] = signals
+        if group is not None:
+            self._groups.setdefault(group, set()).add(handle)
+        self.pool.start(_Task(fn, args, kwargs, handle, signals, context), priority)
+        return handle
+
+    def foreground_pending(self) -> bool:
+        """True si hay tareas de primer plano en curso; las precargas lo consultan para cederles el paso."""
+        return self._foreground > 0
+
+    def cancel_group(self, group: Hashable):
+        """Cancela todas las tareas pendientes de un grupo (sus resultados se descartan)."""
+        for handle in list(self._groups.pop(group, ())):
+            handle.cancel()
+
+    def _deliver(self, handle: TaskHandle, callback: Optional[Callable[[Any], None]], value: Any,
+                 scope: Optional[ActionScope] = None):
+        if self._active.pop(handle, None) is not None and handle.foreground:
+            self._foreground -= 1
+        members = self._groups.get(handle.group)
+        if members is not None:
+            members.discard(handle)
+            if not members:
+                self._groups.pop(handle.group, None)
+        # Siempre se cierra la acción, también si se canceló: sus llamadas a Database ya cuentan
+        if scope is not None:
+            get_metrics().finish_action(scope)
+        if handle.cancelled or callback is None:
+            return
+        try:
+            callback(value)
+        except RuntimeError as e:
+            # El widget destino se destruyó mientras la tarea estaba en curso
+            if "has been deleted" not in str(e):
+                raise
+            logger.debug("Dropped task result for deleted widget: %s", e)
+
+
+_runner: Optional[TaskRunner] = None
+
+
+def get_task_runner() -> TaskRunner:
+    """Devuelve el ejecutor compartido por todas las vistas (se crea en el hilo de UI)."""
+    global _runner
+    if _runner is None:
+        _runner = TaskRunner()
+    return _runner
@@ -0,0 +1,41 @@
+from typing import List, Optional
+
+from PyQt5.QtCore import QUrl
+from PyQt5.QtGui import QImage, QTextDocument
+from PyQt5.QtWidgets import QTextBrowser
+
+from src.prefetch import ImageCache, get_image_cache
+
+
+class LessonBrowser(QTextBrowser):
+    """QTextBrowser que muestra las imágenes remotas de las lecciones desde ImageCache.
+
+    Las que aún no están descargadas se anotan en `missing_images()` para que la
+    vista las pida en segundo plano y vuelva a pintar el HTML.
+    """
+
+    def __init__(self, images: Optional[ImageCache] = None, parent=None):
+        super().__init__(parent)
+        self.images = images or get_image_cache()
+        self._missing: List[str] = []
+
+    def loadResource(self, resource_type: int, url: QUrl):
+        if resource_type == QTextDocument.ImageResource and url.scheme() in ("http", "https"):
+            key = url.toString()
+            data = self.images.get(key)
+            if data is not None:
+                image = QImage()
+                if image.loadFromData(data):
+                    return image
+                return None
+            if key not in self._missing:
+                self._missing.append(key)
+            return None
+        return super().loadResource(resource_type, url)
+
+    def setHtml(self, html: str):
+        self._missing = []
+        super().setHtml(html)
+
+    def missing_images(self) -> List[str]:
+        return list(self._missing)
@@ -0,0 +1,31 @@
+from PyQt5.QtWidgets import QLabel, QWidget
+from PyQt5.QtCore import Qt, QEvent
+
+
+class StaleBanner(QLabel):
+    """Aviso sobre el borde superior de una vista cuando lo que muestra no se pudo actualizar."""
+
+    def __init__(self, parent: QWidget, text: str = "No se pudo actualizar; se muestran los últimos datos"):
+        super().__init__(text, parent)
+        # Solo informa: los clics pasan a la vista que está debajo
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, True)
+        self.setAlignment(Qt.AlignCenter)
+        self.setStyleSheet("background-color: #c62828; color: white; padding: 6px; font-weight: bold;")
+        self.hide()
+        parent.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.parent() and event.type() == QEvent.Resize:
+            self._resize_to_parent()
+        return super().eventFilter(obj, event)
+
+    def _resize_to_parent(self):
+        self.setGeometry(0, 0, self.parent().width(), self.sizeHint().height())
+
+    def show_banner(self):
+        self._resize_to_parent()
+        self.raise_()
+        self.show()
+
+    def hide_banner(self):
+        self.hide()
@@ -0,0 +1,332 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.metrics import report_error
+from src.paths import user_data_dir
+
+KIND_PROGRESS = "progress"
+KIND_ACHIEVEMENT = "achievement"
+
+DEFAULT_BASE_DELAY = 2.0
+DEFAULT_MAX_DELAY = 5 * 60.0
+DEFAULT_FLUSH_INTERVAL = 15.0
+# Con el backoff tope de 5 min son unas 4 h de reintentos antes de apartar la fila
+DEFAULT_MAX_ATTEMPTS = 50
+
+# Clases SQLSTATE que el servidor no va a aceptar por mucho que se reintente:
+# datos inválidos (22), restricciones (23) y esquema/permisos (42)
+PERMANENT_SQLSTATE_CLASSES = ("22", "23", "42")
+
+
+def is_permanent_error(error: BaseException) -> bool:
+    """True si el servidor rechazó los datos (4xx, SQLSTATE 22/23/42); False si vale la pena reintentar."""
+    code = getattr(error, "code", None)
+    if isinstance(code, str) and code:
+        if code[:2] in PERMANENT_SQLSTATE_CLASSES:
+            return True
+        if code.startswith("PGRST1") or code.startswith("PGRST2"):
+            # Errores de PostgREST en la petición o el esquema (p. ej. columna inexistente)
+            return True
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if isinstance(status, int):
+        # 408 y 429 son de carga: se reintentan como la red o un 5xx
+        return 400 <= status < 500 and status not in (408, 429)
+    return False
+
+
+class WriteQueue:
+    """Cola persistente (SQLite) de escrituras de progreso y logros.
+
+    Las escrituras se aceptan al instante y sobreviven a cierres de la app. Al
+    vaciarse, el progreso de una misma lección se combina (gana el último) y los
+    logros repetidos se descartan, de modo que cada tipo viaja en un único upsert.
+    Si el envío falla por la red o el servidor, las filas esperan con backoff
+    exponencial antes de reintentar. Si el servidor rechaza el lote, se parte
+    en mitades hasta aislar las filas culpables, que pasan a `dead_writes` junto
+    con las que agotan `max_attempts`; el resto del lote se envía igualmente.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time,
+                 base_delay: float = DEFAULT_BASE_DELAY, max_delay: float = DEFAULT_MAX_DELAY,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self._clock = clock
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pending_writes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                target_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pending_writes_user ON pending_writes(user_id, kind)")
+        # Filas que el servidor no aceptará: se guardan para poder revisarlas, fuera de la cola
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dead_writes (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                user_id TEXT NOT NULL,
+                target_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL,
+                error TEXT NOT NULL,
+                failed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @classmethod
+    def open_default(cls) -> Optional["WriteQueue"]:
+        try:
+            return cls(os.path.join(user_data_dir(), "pending_writes.sqlite3"))
+        except Exception as e:
+            print(f"Write queue disabled: {e}")
+            return None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _enqueue(self, kind: str, user_id: str, target_id: str, payload: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pending_writes (kind, user_id, target_id, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (kind, user_id, str(target_id), json.dumps(payload), self._clock()),
+            )
+            self._conn.commit()
+
+    def enqueue_progress(self, user_id: str, lesson_id: str, completed: bool, score: int,
+                         completed_at: Optional[str] = None) -> Dict[str, Any]:
+        payload = {
+            "user_id": user_id,
+            "lesson_id": lesson_id,
+            "completed": completed,
+            "score": score,
+            "completed_at": completed_at or datetime.now(timezone.utc).isoformat(),
+        }
+        self._enqueue(KIND_PROGRESS, user_id, lesson_id, payload)
+        return payload
+
+    def enqueue_achievement(self, user_id: str, achievement_id: str) -> Dict[str, Any]:
+        payload = {
+            "user_id": user_id,
+            "achievement_id": achievement_id,
+            "earned_at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._enqueue(KIND_ACHIEVEMENT, user_id, achievement_id, payload)
+        return payload
+
+    def _rows(self, where: str, params: tuple) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT id, kind, target_id, payload, attempts FROM pending_writes WHERE {where} ORDER BY id",
+                params,
+            ).fetchall()
+
+    def pending_progress(self, user_id: str) -> List[Dict[str, Any]]:
+        """Progreso aún no confirmado por el servidor (combinado por lección)."""
+        latest: Dict[str, Dict[str, Any]] = {}
+        for _, _, target_id, payload, _ in self._rows("user_id = ? AND kind = ?", (user_id, KIND_PROGRESS)):
+            latest[target_id] = json.loads(payload)
+        return list(latest.values())
+
+    def pending_achievements(self, user_id: str) -> List[Dict[str, Any]]:
+        latest: Dict[str, Dict[str, Any]] = {}
+        for _, _, target_id, payload, _ in self._rows("user_id = ? AND kind = ?", (user_id, KIND_ACHIEVEMENT)):
+            latest.setdefault(target_id, json.loads(payload))
+        return list(latest.values())
+
+    def discard_progress(self, user_id: str, lesson_id: str) -> int:
+        """Quita de la cola el progreso de una lección que ya se guardó por otra vía (p. ej. submit_quiz)."""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM pending_writes WHERE kind = ? AND user_id = ? AND target_id = ?",
+                (KIND_PROGRESS, user_id, str(lesson_id)),
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    @contextmanager
+    def paused(self):
+        """Bloque durante el que no se vacía la cola (espera al vaciado en curso, si lo hay)."""
+        with self._flush_lock:
+            yield
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_writes").fetchone()[0]
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Escrituras apartadas por rechazo del servidor o por agotar los reintentos."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, target_id, payload, attempts, error FROM dead_writes ORDER BY id"
+            ).fetchall()
+        return [{"kind": kind, "target_id": target_id, "payload": json.loads(payload),
+                 "attempts": attempts, "error": error}
+                for kind, target_id, payload, attempts, error in rows]
+
+    def next_due_in(self) -> Optional[float]:
+        """Segundos hasta la próxima fila enviable; None si la cola está vacía."""
+        with self._lock:
+            row = self._conn.execute("SELECT MIN(next_attempt_at) FROM pending_writes").fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - self._clock())
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, attempts - 1)))
+        # Jitter para que los equipos de un aula no reintenten todos a la vez
+        return delay * random.uniform(0.5, 1.0)
+
+    def _send_isolating(self, entries: List[tuple], send: Callable[[List[Dict[str, Any]]], None]
+                        ) -> List[Tuple[tuple, Exception]]:
+        """Envía `entries` y devuelve las que fallaron, cada una con su error.
+
+        Un error reintentable (red, 5xx) afecta a todo el lote y no se parte: solo
+        multiplicaría las peticiones. Un rechazo del servidor se aísla por bisección,
+        de modo que una fila envenenada no bloquea a las demás.
+        """
+        try:
+            send([data for _, data, _ in entries])
+            return []
+        except Exception as e:
+            if len(entries) == 1 or not is_permanent_error(e):
+                return [(entry, e) for entry in entries]
+        middle = len(entries) // 2
+        return self._send_isolating(entries[:middle], send) + self._send_isolating(entries[middle:], send)
+
+    def _bury(self, kind: str, entry: tuple, attempts: int, error: Exception):
+        key, _, ids = entry
+        report_error(f"Discarding pending {kind} write {key} after {attempts} attempt(s)", error)
+        placeholders = ",".join("?" * len(ids))
+        with self._lock:
+            self._conn.execute(
+                f"""
+                INSERT INTO dead_writes (id, kind, user_id, target_id, payload, created_at, attempts, error, failed_at)
+                SELECT id, kind, user_id, target_id, payload, created_at, ?, ?, ? FROM pending_writes
+                WHERE id IN ({placeholders})
+                """,
+                (attempts, str(error), self._clock(), *ids),
+            )
+            self._conn.execute(f"DELETE FROM pending_writes WHERE id IN ({placeholders})", ids)
+            self._conn.commit()
+
+    def _flush_kind(self, kind: str, key_fields: tuple, keep_last: bool,
+                    send: Callable[[List[Dict[str, Any]]], None]) -> bool:
+        rows = self._rows("kind = ? AND next_attempt_at <= ?", (kind, self._clock()))
+        if not rows:
+            return True
+        # Una entrada por clave: (clave, datos a enviar, ids de la cola que cubre)
+        batch: Dict[tuple, tuple] = {}
+        attempts_by_id: Dict[int, int] = {}
+        for row_id, _, _, payload, attempts in rows:
+            attempts_by_id[row_id] = attempts
+            data = json.loads(payload)
+            key = tuple(data[f] for f in key_fields)
+            ids = batch[key][2] if key in batch else []
+            ids.append(row_id)
+            if keep_last or key not in batch:
+                batch[key] = (key, data, ids)
+        entries = list(batch.values())
+        failed = self._send_isolating(entries, send)
+
+        failed_ids = set()
+        retry_error: Optional[Exception] = None
+        for entry, error in failed:
+            ids = entry[2]
+            failed_ids.update(ids)
+            attempts = max(attempts_by_id[i] for i in ids) + 1
+            if is_permanent_error(error) or attempts >= self.max_attempts:
+                self._bury(kind, entry, attempts, error)
+                continue
+            retry_error = error
+            placeholders = ",".join("?" * len(ids))
+            with self._lock:
+                self._conn.execute(
+                    f"UPDATE pending_writes SET attempts = ?, next_attempt_at = ? WHERE id IN ({placeholders})",
+                    (attempts, self._clock() + self._backoff(attempts), *ids),
+                )
+                self._conn.commit()
+        sent_ids = [row[0] for row in rows if row[0] not in failed_ids]
+        if sent_ids:
+            placeholders = ",".join("?" * len(sent_ids))
+            with self._lock:
+                self._conn.execute(f"DELETE FROM pending_writes WHERE id IN ({placeholders})", sent_ids)
+                self._conn.commit()
+        if retry_error is not None:
+            print(f"Error flushing pending {kind} writes: {retry_error}")
+            return False
+        return True
+
+    def flush(self, send_progress: Callable[[List[Dict[str, Any]]], None],
+              send_achievements: Callable[[List[Dict[str, Any]]], None]) -> bool:
+        """Envía lo pendiente en un upsert por tipo. Devuelve True si no quedó nada por reintentar."""
+        with self._flush_lock:
+            progress_ok = self._flush_kind(KIND_PROGRESS, ("user_id", "lesson_id"), True, send_progress)
+            # Mismo orden que el flujo original: primero el progreso, luego los logros
+            achievements_ok = self._flush_kind(KIND_ACHIEVEMENT, ("user_id", "achievement_id"), False, send_achievements)
+        return progress_ok and achievements_ok
+
+
+class WriteQueueFlusher(threading.Thread):
+    """Hilo que vacía la cola periódicamente o en cuanto se le avisa con `wake()`."""
+
+    def __init__(self, flush: Callable[[], bool], queue: WriteQueue,
+                 interval: float = DEFAULT_FLUSH_INTERVAL):
+        super().__init__(name="WriteQueueFlusher", daemon=True)
+        self._flush = flush
+        self._queue = queue
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping.set()
+        self._wake.set()
+        self.join(timeout)
+
+    def run(self):
+        while not self._stopping.is_set():
+            due_in = self._queue.next_due_in()
+            timeout = self.interval if due_in is None else min(self.interval, due_in)
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self._queue.pending_count():
+                try:
+                    self._flush()
+                except Exception as e:
+                    print(f"Error in write queue flusher: {e}")
+        # Último intento al cerrar la aplicación
+        if self._queue.pending_count():
+            try:
+                self._flush()
+            except Exception:
+                pass
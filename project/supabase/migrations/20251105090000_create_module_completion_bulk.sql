@@ -0,0 +1,29 @@
+/*
+  # Bulk Module Completion
+  Returns completed/total lesson counts for every module of a user in a single call,
+  replacing the per-module queries done by Database.get_module_completion.
+
+  Usage (PostgREST RPC):
+    POST /rest/v1/rpc/get_module_completion_bulk  {"p_user_id": "<uuid>"}
+*/
+
+CREATE OR REPLACE FUNCTION public.get_module_completion_bulk(p_user_id uuid)
+RETURNS TABLE (module_id integer, completed integer, total integer)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT m.id AS module_id,
+         COUNT(up.id)::integer AS completed,
+         COUNT(l.id)::integer AS total
+  FROM public.modules m
+  LEFT JOIN public.lessons l
+         ON l.module_id = m.id
+  LEFT JOIN public.user_progress up
+         ON up.lesson_id = l.id
+        AND up.user_id = p_user_id
+        AND up.completed
+  GROUP BY m.id
+  ORDER BY m.id;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_module_completion_bulk(uuid) TO anon;
@@ -0,0 +1,85 @@
+/*
+  # Submit Quiz
+  Saves a quiz result and awards every achievement it unlocks in a single call,
+  replacing the client-side sequence of progress upsert, catalog reads and one
+  select + insert per achievement done by QuizView.check_achievements.
+
+  Rules (same as the client):
+    - lesson_complete: completed lessons >= requirement_value
+    - perfect_score:   quiz percentage >= requirement_value
+    - streak:          longest run of consecutive UTC days with a completed lesson
+    - module_complete: every lesson of module requirement_value is completed
+
+  Returns only the achievements awarded by this call.
+
+  Usage (PostgREST RPC):
+    POST /rest/v1/rpc/submit_quiz  {"p_user_id": "<uuid>", "p_lesson_id": "<uuid>", "p_score": 90}
+*/
+
+CREATE OR REPLACE FUNCTION public.submit_quiz(p_user_id uuid, p_lesson_id uuid, p_score integer)
+RETURNS SETOF public.achievements
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_completed integer;
+  v_max_streak integer;
+BEGIN
+  INSERT INTO public.user_progress (user_id, lesson_id, completed, score, completed_at)
+  VALUES (p_user_id, p_lesson_id, true, p_score, now())
+  ON CONFLICT (user_id, lesson_id)
+  DO UPDATE SET completed = true,
+                score = EXCLUDED.score,
+                completed_at = EXCLUDED.completed_at;
+
+  SELECT COUNT(*)::integer INTO v_completed
+  FROM public.user_progress
+  WHERE user_id = p_user_id AND completed;
+
+  -- Racha máxima: días consecutivos agrupados por (día - posición)
+  SELECT COALESCE(MAX(streak), 0)::integer INTO v_max_streak
+  FROM (
+    SELECT COUNT(*) AS streak
+    FROM (
+      SELECT d, d - (ROW_NUMBER() OVER (ORDER BY d))::integer AS grp
+      FROM (
+        SELECT DISTINCT (completed_at AT TIME ZONE 'UTC')::date AS d
+        FROM public.user_progress
+        WHERE user_id = p_user_id AND completed AND completed_at IS NOT NULL
+      ) days
+    ) islands
+    GROUP BY grp
+  ) streaks;
+
+  RETURN QUERY
+  WITH completed_modules AS (
+    SELECT l.module_id
+    FROM public.lessons l
+    LEFT JOIN public.user_progress up
+           ON up.lesson_id = l.id
+          AND up.user_id = p_user_id
+          AND up.completed
+    GROUP BY l.module_id
+    HAVING COUNT(up.id) = COUNT(l.id)
+  ),
+  eligible AS (
+    SELECT a.id
+    FROM public.achievements a
+    WHERE (a.requirement_type = 'lesson_complete' AND v_completed >= a.requirement_value)
+       OR (a.requirement_type = 'perfect_score' AND p_score >= a.requirement_value)
+       OR (a.requirement_type = 'streak' AND v_max_streak >= a.requirement_value)
+       OR (a.requirement_type = 'module_complete'
+           AND a.requirement_value IN (SELECT module_id FROM completed_modules))
+  ),
+  inserted AS (
+    INSERT INTO public.user_achievements (user_id, achievement_id)
+    SELECT p_user_id, e.id FROM eligible e
+    ON CONFLICT (user_id, achievement_id) DO NOTHING
+    RETURNING achievement_id
+  )
+  SELECT a.*
+  FROM public.achievements a
+  JOIN inserted i ON i.achievement_id = a.id;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.submit_quiz(uuid, uuid, integer) TO anon;
@@ -0,0 +1,84 @@
+/*
+  # Catalog Change Tracking (delta sync)
+  Lets the desktop app refresh its local copy of the catalog by downloading
+  only what changed since its last sync instead of whole tables.
+
+  1. Columns
+    - `updated_at timestamptz` on modules, lessons, quizzes and achievements,
+      set on insert and bumped on every update by the `set_updated_at` trigger.
+
+  2. Tombstones
+    - `catalog_deletions`: one row per deleted catalog row (table name, id and
+      time), written by the `record_catalog_deletion` trigger, so clients can
+      drop rows they would never see again in a "changed since" query.
+
+  3. Indexes
+    - `(updated_at)` on each catalog table and `(table_name, deleted_at)` on
+      the tombstones, used by `updated_at > watermark` queries.
+
+  Usage (PostgREST):
+    GET /rest/v1/lessons?updated_at=gt.<watermark>&order=updated_at
+    GET /rest/v1/catalog_deletions?table_name=eq.lessons&deleted_at=gt.<watermark>
+*/
+
+CREATE OR REPLACE FUNCTION public.set_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.updated_at := now();
+  RETURN NEW;
+END;
+$$;
+
+CREATE TABLE IF NOT EXISTS public.catalog_deletions (
+  id bigserial PRIMARY KEY,
+  table_name text NOT NULL,
+  row_id text NOT NULL,
+  deleted_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_catalog_deletions_table_deleted
+  ON public.catalog_deletions (table_name, deleted_at);
+
+ALTER TABLE public.catalog_deletions ENABLE ROW LEVEL SECURITY;
+
+DO $$ BEGIN
+  CREATE POLICY "Anon can view catalog deletions"
+    ON public.catalog_deletions FOR SELECT
+    TO anon
+    USING (true);
+EXCEPTION WHEN duplicate_object THEN NULL; END $$;
+
+CREATE OR REPLACE FUNCTION public.record_catalog_deletion()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  INSERT INTO public.catalog_deletions (table_name, row_id)
+  VALUES (TG_TABLE_NAME, OLD.id::text);
+  RETURN OLD;
+END;
+$$;
+
+DO $$
+DECLARE
+  t text;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['modules', 'lessons', 'quizzes', 'achievements'] LOOP
+    EXECUTE format('ALTER TABLE public.%I ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now()', t);
+    EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON public.%I (updated_at)', 'idx_' || t || '_updated_at', t);
+
+    EXECUTE format('DROP TRIGGER IF EXISTS set_updated_at ON public.%I', t);
+    EXECUTE format(
+      'CREATE TRIGGER set_updated_at BEFORE UPDATE ON public.%I
+         FOR EACH ROW EXECUTE FUNCTION public.set_updated_at()', t);
+
+    EXECUTE format('DROP TRIGGER IF EXISTS record_catalog_deletion ON public.%I', t);
+    EXECUTE format(
+      'CREATE TRIGGER record_catalog_deletion AFTER DELETE ON public.%I
+         FOR EACH ROW EXECUTE FUNCTION public.record_catalog_deletion()', t);
+  END LOOP;
+END $$;
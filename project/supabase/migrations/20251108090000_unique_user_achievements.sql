@@ -0,0 +1,43 @@
+/*
+  # Restricción única en user_achievements
+
+  `Database.award_achievements` otorga logros con un único
+  `INSERT ... ON CONFLICT (user_id, achievement_id) DO NOTHING` (upsert con
+  ignore_duplicates) en lugar de consultar y luego insertar. Eso requiere un
+  índice único sobre el par; las bases creadas antes de que el esquema lo
+  incluyera pueden no tenerlo y, por carreras, tener filas repetidas.
+
+  ## Cambios
+  - Elimina duplicados conservando el logro obtenido primero
+  - Añade UNIQUE (user_id, achievement_id) si no existe ya un índice único equivalente
+*/
+
+DELETE FROM public.user_achievements
+WHERE id IN (
+  SELECT id
+  FROM (
+    SELECT id,
+           row_number() OVER (PARTITION BY user_id, achievement_id
+                              ORDER BY earned_at NULLS LAST, id) AS rn
+    FROM public.user_achievements
+  ) ranked
+  WHERE rn > 1
+);
+
+DO $$
+BEGIN
+  IF NOT EXISTS (
+    SELECT 1
+    FROM pg_index i
+    WHERE i.indrelid = 'public.user_achievements'::regclass
+      AND i.indisunique
+      AND (
+        SELECT array_agg(a.attname::text ORDER BY a.attname)
+        FROM pg_attribute a
+        WHERE a.attrelid = i.indrelid AND a.attnum = ANY (i.indkey)
+      ) = ARRAY['achievement_id', 'user_id']
+  ) THEN
+    ALTER TABLE public.user_achievements
+      ADD CONSTRAINT user_achievements_user_id_achievement_id_key UNIQUE (user_id, achievement_id);
+  END IF;
+END $$;
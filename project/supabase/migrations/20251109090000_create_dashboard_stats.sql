@@ -0,0 +1,169 @@
+/*
+  # Dashboard Stats
+  HomeView and ProgressView used to download every user_progress row and add up
+  scores and counts on the client. This keeps one user_stats row per user,
+  updated incrementally by triggers on user_progress and user_achievements, and
+  exposes every dashboard number in a single small response.
+
+  ## Changes
+  - `user_stats` table (lessons started/completed, score sum, achievements)
+  - `bump_user_stats` helper and AFTER triggers on user_progress / user_achievements
+  - Backfill from the existing rows
+  - `get_dashboard_stats(p_user_id)` returning a JSON object:
+      lessons_started, lessons_completed, average_score, achievements,
+      modules_total, modules_completed, lessons_total, module_lessons_completed
+
+  Usage (PostgREST RPC):
+    POST /rest/v1/rpc/get_dashboard_stats  {"p_user_id": "<uuid>"}
+*/
+
+CREATE TABLE IF NOT EXISTS public.user_stats (
+  user_id uuid PRIMARY KEY REFERENCES public.app_users(id) ON DELETE CASCADE,
+  lessons_started integer NOT NULL DEFAULT 0,
+  lessons_completed integer NOT NULL DEFAULT 0,
+  score_sum bigint NOT NULL DEFAULT 0,
+  achievements integer NOT NULL DEFAULT 0,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE public.user_stats ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Anon can view user_stats" ON public.user_stats;
+CREATE POLICY "Anon can view user_stats"
+  ON public.user_stats FOR SELECT
+  TO anon
+  USING (true);
+
+-- Las escrituras llegan solo desde los triggers (SECURITY DEFINER)
+CREATE OR REPLACE FUNCTION public.bump_user_stats(
+  p_user_id uuid, p_started integer, p_completed integer, p_score bigint, p_achievements integer
+)
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  INSERT INTO public.user_stats AS s (user_id, lessons_started, lessons_completed, score_sum, achievements)
+  VALUES (p_user_id, p_started, p_completed, p_score, p_achievements)
+  ON CONFLICT (user_id) DO UPDATE
+    SET lessons_started = s.lessons_started + EXCLUDED.lessons_started,
+        lessons_completed = s.lessons_completed + EXCLUDED.lessons_completed,
+        score_sum = s.score_sum + EXCLUDED.score_sum,
+        achievements = s.achievements + EXCLUDED.achievements,
+        updated_at = now();
+$$;
+
+REVOKE EXECUTE ON FUNCTION public.bump_user_stats(uuid, integer, integer, bigint, integer) FROM PUBLIC, anon;
+
+CREATE OR REPLACE FUNCTION public.user_progress_stats_trigger()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' AND NEW.user_id = OLD.user_id THEN
+    -- Caso habitual (upsert de un resultado): solo cambian completado y puntuación
+    IF NEW.completed IS DISTINCT FROM OLD.completed OR NEW.score IS DISTINCT FROM OLD.score THEN
+      PERFORM public.bump_user_stats(
+        NEW.user_id, 0,
+        COALESCE(NEW.completed, false)::integer - COALESCE(OLD.completed, false)::integer,
+        COALESCE(NEW.score, 0)::bigint - COALESCE(OLD.score, 0), 0);
+    END IF;
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM public.bump_user_stats(OLD.user_id, -1, -COALESCE(OLD.completed, false)::integer,
+                                   -COALESCE(OLD.score, 0)::bigint, 0);
+  END IF;
+  IF TG_OP IN ('UPDATE', 'INSERT') THEN
+    PERFORM public.bump_user_stats(NEW.user_id, 1, COALESCE(NEW.completed, false)::integer,
+                                   COALESCE(NEW.score, 0)::bigint, 0);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.user_achievements_stats_trigger()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    PERFORM public.bump_user_stats(OLD.user_id, 0, 0, 0, -1);
+  ELSE
+    PERFORM public.bump_user_stats(NEW.user_id, 0, 0, 0, 1);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS user_progress_stats ON public.user_progress;
+CREATE TRIGGER user_progress_stats
+  AFTER INSERT OR UPDATE OR DELETE ON public.user_progress
+  FOR EACH ROW EXECUTE FUNCTION public.user_progress_stats_trigger();
+
+DROP TRIGGER IF EXISTS user_achievements_stats ON public.user_achievements;
+CREATE TRIGGER user_achievements_stats
+  AFTER INSERT OR DELETE ON public.user_achievements
+  FOR EACH ROW EXECUTE FUNCTION public.user_achievements_stats_trigger();
+
+-- Backfill: con las escrituras bloqueadas hasta el fin de la migración, el
+-- recuento completo queda exacto y los triggers siguen desde ahí
+LOCK TABLE public.user_progress, public.user_achievements IN SHARE MODE;
+
+INSERT INTO public.user_stats AS s (user_id, lessons_started, lessons_completed, score_sum, achievements)
+SELECT u.id,
+       COALESCE(p.started, 0),
+       COALESCE(p.completed, 0),
+       COALESCE(p.score_sum, 0),
+       COALESCE(a.earned, 0)
+FROM public.app_users u
+LEFT JOIN (
+  SELECT user_id,
+         COUNT(*)::integer AS started,
+         COUNT(*) FILTER (WHERE completed)::integer AS completed,
+         COALESCE(SUM(score), 0)::bigint AS score_sum
+  FROM public.user_progress
+  GROUP BY user_id
+) p ON p.user_id = u.id
+LEFT JOIN (
+  SELECT user_id, COUNT(*)::integer AS earned
+  FROM public.user_achievements
+  GROUP BY user_id
+) a ON a.user_id = u.id
+ON CONFLICT (user_id) DO UPDATE
+  SET lessons_started = EXCLUDED.lessons_started,
+      lessons_completed = EXCLUDED.lessons_completed,
+      score_sum = EXCLUDED.score_sum,
+      achievements = EXCLUDED.achievements,
+      updated_at = now();
+
+CREATE OR REPLACE FUNCTION public.get_dashboard_stats(p_user_id uuid)
+RETURNS json
+LANGUAGE sql
+STABLE
+AS $$
+  WITH stats AS (
+    SELECT lessons_started, lessons_completed, score_sum, achievements
+    FROM public.user_stats
+    WHERE user_id = p_user_id
+  ),
+  modules AS (
+    SELECT * FROM public.get_module_completion_bulk(p_user_id)
+  )
+  SELECT json_build_object(
+    'lessons_started', COALESCE((SELECT lessons_started FROM stats), 0),
+    'lessons_completed', COALESCE((SELECT lessons_completed FROM stats), 0),
+    'average_score', COALESCE((SELECT (score_sum / NULLIF(lessons_started, 0))::integer FROM stats), 0),
+    'achievements', COALESCE((SELECT achievements FROM stats), 0),
+    'modules_total', (SELECT COUNT(*) FROM modules),
+    'modules_completed', (SELECT COUNT(*) FROM modules WHERE total > 0 AND completed = total),
+    'lessons_total', COALESCE((SELECT SUM(total) FROM modules), 0),
+    'module_lessons_completed', COALESCE((SELECT SUM(completed) FROM modules), 0)
+  );
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_dashboard_stats(uuid) TO anon;
@@ -0,0 +1,77 @@
+/*
+  # Índices para las consultas de la aplicación
+
+  Cada índice corresponde a un filtro que hace el cliente (src/database.py y las
+  RPC). Los `INCLUDE` añaden las columnas que se leen para que Postgres pueda
+  responder con un Index Only Scan, sin visitar la tabla.
+
+  | Consulta                                                   | Índice                                   |
+  |------------------------------------------------------------|------------------------------------------|
+  | user_progress por user_id (get_user_progress, snapshot)    | user_progress_user_lesson_key            |
+  | user_progress por user_id + completed + lesson_id IN (...) | user_progress_user_lesson_key            |
+  | user_progress completado por usuario (RPC, rachas)         | idx_user_progress_user_completed         |
+  | lessons por module_id ORDER BY order_index (tarjetas)      | idx_lessons_module_order                 |
+  | quizzes por lesson_id ORDER BY order_index                 | idx_quizzes_lesson_order                 |
+  | user_progress / user_achievements: borrados en cascada     | idx_user_progress_lesson,                |
+  |                                                            | idx_user_achievements_achievement        |
+
+  user_progress_user_lesson_key sustituye al índice de la restricción
+  UNIQUE (user_id, lesson_id): misma clave, ahora con INCLUDE. Sigue sirviendo a
+  los upserts (ON CONFLICT (user_id, lesson_id)) y así cada escritura mantiene
+  un solo btree con esa clave en lugar de dos.
+
+  Ya cubiertos por restricciones existentes (no se duplican):
+  - app_users por username: UNIQUE (username)
+  - user_achievements por user_id: UNIQUE (user_id, achievement_id), con user_id
+    como primera columna (migración 20251108090000)
+
+  Comprobación: scripts/benchmark_indexes.py ejecuta EXPLAIN ANALYZE de estas
+  consultas con y sin los índices sobre datos sintéticos.
+*/
+
+CREATE UNIQUE INDEX IF NOT EXISTS user_progress_user_lesson_key
+  ON public.user_progress (user_id, lesson_id)
+  INCLUDE (completed, score, completed_at);
+
+-- La unicidad ya la garantiza el índice anterior: quitar la restricción (y su btree)
+DO $$
+DECLARE
+  con record;
+BEGIN
+  FOR con IN
+    SELECT c.conname
+    FROM pg_constraint c
+    WHERE c.conrelid = 'public.user_progress'::regclass
+      AND c.contype = 'u'
+      AND (
+        SELECT array_agg(a.attname::text ORDER BY a.attname)
+        FROM pg_attribute a
+        WHERE a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+      ) = ARRAY['lesson_id', 'user_id']
+  LOOP
+    EXECUTE format('ALTER TABLE public.user_progress DROP CONSTRAINT %I', con.conname);
+  END LOOP;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_user_progress_user_completed
+  ON public.user_progress (user_id, completed_at)
+  INCLUDE (lesson_id)
+  WHERE completed;
+
+CREATE INDEX IF NOT EXISTS idx_user_progress_lesson
+  ON public.user_progress (lesson_id);
+
+CREATE INDEX IF NOT EXISTS idx_lessons_module_order
+  ON public.lessons (module_id, order_index)
+  INCLUDE (id, title, estimated_minutes);
+
+CREATE INDEX IF NOT EXISTS idx_quizzes_lesson_order
+  ON public.quizzes (lesson_id, order_index);
+
+CREATE INDEX IF NOT EXISTS idx_user_achievements_achievement
+  ON public.user_achievements (achievement_id);
+
+ANALYZE public.user_progress;
+ANALYZE public.lessons;
+ANALYZE public.quizzes;
+ANALYZE public.user_achievements;
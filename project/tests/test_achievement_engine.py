@@ -0,0 +1,70 @@
+import unittest
+
+from src.achievement_engine import AchievementEngine
+
+ACHIEVEMENTS = [
+    {"id": "first", "requirement_type": "lesson_complete", "requirement_value": 1},
+    {"id": "three", "requirement_type": "lesson_complete", "requirement_value": 3},
+    {"id": "perfect", "requirement_type": "perfect_score", "requirement_value": 100},
+    {"id": "streak3", "requirement_type": "streak", "requirement_value": 3},
+    {"id": "module1", "requirement_type": "module_complete", "requirement_value": 1},
+]
+
+LESSON_MODULES = {"l1": 1, "l2": 1, "l3": 2, "l4": 2}
+
+
+def progress(lesson_id, day, score=80):
+    return {"lesson_id": lesson_id, "completed": True, "score": score,
+            "completed_at": f"2025-01-{day:02d}T10:00:00+00:00"}
+
+
+def ids(achievements):
+    return sorted(a["id"] for a in achievements)
+
+
+class TestAchievementEngine(unittest.TestCase):
+    def test_first_evaluation_checks_every_rule(self):
+        engine = AchievementEngine(ACHIEVEMENTS, [progress("l1", 1), progress("l3", 2)], LESSON_MODULES, [])
+        unlocked = engine.record_lesson("l2", 100, "2025-01-03T09:00:00+00:00")
+        self.assertEqual(ids(unlocked), ["first", "module1", "perfect", "streak3", "three"])
+
+    def test_earned_achievements_are_not_returned_again(self):
+        engine = AchievementEngine(ACHIEVEMENTS, [progress("l1", 1)], LESSON_MODULES, ["first"])
+        self.assertEqual(engine.record_lesson("l1", 50, "2025-01-01T12:00:00+00:00"), [])
+        self.assertEqual(ids(engine.record_lesson("l2", 100, "2025-01-05T12:00:00+00:00")),
+                         ["module1", "perfect"])
+        self.assertEqual(engine.record_lesson("l2", 100, "2025-01-05T13:00:00+00:00"), [])
+
+    def test_streak_joins_runs_incrementally(self):
+        engine = AchievementEngine(ACHIEVEMENTS, [progress("l1", 1), progress("l3", 3)], LESSON_MODULES, ["first"])
+        engine.record_lesson("l1", 50, "2025-01-01T12:00:00+00:00")
+        self.assertEqual(engine.max_streak, 1)
+        unlocked = engine.record_lesson("l4", 50, "2025-01-02T12:00:00+00:00")
+        self.assertEqual(engine.max_streak, 3)
+        self.assertEqual(engine.current_streak, 3)
+        self.assertEqual(ids(unlocked), ["streak3", "three"])
+
+    def test_redoing_a_lesson_moves_its_day(self):
+        # Como en el servidor, cada lección cuenta solo con su último completed_at
+        engine = AchievementEngine(ACHIEVEMENTS, [progress("l1", 1), progress("l2", 2)], LESSON_MODULES, [])
+        self.assertEqual(engine.max_streak, 2)
+        engine.record_lesson("l1", 80, "2025-01-03T12:00:00+00:00")
+        self.assertEqual((engine.max_streak, engine.current_streak), (2, 2))
+        engine.record_lesson("l2", 80, "2025-01-06T12:00:00+00:00")
+        self.assertEqual((engine.max_streak, engine.current_streak), (1, 1))
+        unlocked = engine.record_lesson("l3", 80, "2025-01-05T12:00:00+00:00")
+        self.assertEqual(engine.max_streak, 2)
+        self.assertNotIn("streak3", ids(unlocked))
+        self.assertEqual(ids(engine.record_lesson("l4", 80, "2025-01-04T12:00:00+00:00")), ["streak3"])
+
+    def test_progress_toward_locked_achievements(self):
+        engine = AchievementEngine(ACHIEVEMENTS, [progress("l1", 1, score=70), progress("l3", 2)], LESSON_MODULES, [])
+        by_id = {a["id"]: a for a in ACHIEVEMENTS}
+        self.assertEqual(engine.progress_for(by_id["three"]), (2, 3))
+        self.assertEqual(engine.progress_for(by_id["perfect"]), (80, 100))
+        self.assertEqual(engine.progress_for(by_id["streak3"]), (2, 3))
+        self.assertEqual(engine.progress_for(by_id["module1"]), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+
+from src.async_database import AsyncDatabase
+from src.backends import SQLiteBackend
+from src.database import Database
+from tests.test_sqlite_backend import seed_catalog
+
+
+class TestAsyncDatabase(unittest.TestCase):
+    def setUp(self):
+        self.backend = SQLiteBackend()
+        seed_catalog(self.backend)
+        self.db = Database(self.backend)
+        self.async_db = AsyncDatabase(self.db)
+        self.user_id = self.db.create_user("ana", "Ana")["id"]
+        self.db.save_lesson_progress(self.user_id, "l1", True, 80)
+
+    def tearDown(self):
+        self.async_db._loop.loop.call_soon_threadsafe(self.async_db._loop.loop.stop)
+        self.backend.close()
+
+    def test_dashboard_goes_through_the_public_database_methods(self):
+        data = self.async_db.run(self.async_db.load_dashboard(self.user_id), timeout=5)
+        self.assertEqual(data["stats"]["lessons_completed"], 1)
+        self.assertEqual([m["id"] for m in data["modules"]], [1, 2])
+        self.assertEqual(data["completions"], self.db.get_all_module_completion(self.user_id))
+        self.assertEqual(self.async_db.run(self.async_db.get_lesson_modules(), timeout=5),
+                         {"l1": 1, "l2": 1, "l3": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
 from src.auth import AuthManager
+from src.startup import DeferredDatabase
 
 
 class FakeDatabase:
@@ -42,6 +43,24 @@ class TestAuthManager(unittest.TestCase):
         self.assertEqual(auth.current_user, user)
         self.assertEqual(db.current_user_id, user["id"])
 
+    def test_deferred_database_is_resolved_on_first_use(self):
+        deferred = DeferredDatabase(lambda: FakeDatabase({"ana": {"id": "u1", "username": "ana"}}))
+        auth = AuthManager(deferred)
+        self.assertFalse(deferred.ready())
+        deferred.load()
+        self.assertTrue(deferred.ready())
+        self.assertEqual(auth.login("ana"), (True, "Inicio de sesión exitoso"))
+        self.assertEqual(auth.db.current_user_id, "u1")
+
+    def test_deferred_database_error_reaches_login(self):
+        def broken():
+            raise RuntimeError("Configuración de Supabase incompleta")
+        deferred = DeferredDatabase(broken)
+        with self.assertRaises(RuntimeError):
+            deferred.load()
+        with self.assertRaises(RuntimeError):
+            AuthManager(deferred).login("ana")
+
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+import tempfile
+import unittest
+
+from src.backends import BackendError, SQLiteBackend
+from src.catalog_cache import VERSION_CHECK_SECONDS, CatalogCache
+from src.database import Database
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCatalogCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "cache.sqlite3")
+        self.clock = FakeClock()
+        self.cache = CatalogCache(self.path, ttl_seconds=60, clock=self.clock)
+        self.fetches = 0
+
+    def tearDown(self):
+        self.cache.close()
+        self.tmp.cleanup()
+
+    def fetch_modules(self):
+        self.fetches += 1
+        return [{"id": 1, "title": "Conceptos Básicos"}]
+
+    def test_fresh_entry_is_served_without_fetch(self):
+        self.cache.get_or_fetch("modules", "modules", self.fetch_modules)
+        rows = self.cache.get_or_fetch("modules", "modules", self.fetch_modules)
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(rows[0]["title"], "Conceptos Básicos")
+
+    def test_expired_entry_with_same_version_is_revalidated(self):
+        self.cache.put("modules", "modules", self.fetch_modules(), version="4")
+        self.clock.now += 120
+        rows = self.cache.get_or_fetch("modules", "modules", self.fetch_modules, version_fn=lambda t: "4")
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(len(rows), 1)
+
+    def test_expired_entry_with_new_version_is_refetched(self):
+        self.cache.put("modules", "modules", [], version="3")
+        self.clock.now += 120
+        rows = self.cache.get_or_fetch("modules", "modules", self.fetch_modules, version_fn=lambda t: "4")
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(self.cache.get("modules").version, "4")
+
+    def test_network_failure_falls_back_to_stale_rows(self):
+        self.cache.put("modules", "modules", [{"id": 1}])
+        self.clock.now += 120
+
+        def failing_fetch():
+            raise ConnectionError("sin red")
+
+        rows = self.cache.get_or_fetch("modules", "modules", failing_fetch)
+        self.assertEqual(rows, [{"id": 1}])
+
+    def test_entries_persist_across_instances(self):
+        self.cache.put("achievements", "achievements", [{"id": "a"}])
+        self.cache.close()
+        self.cache = CatalogCache(self.path, ttl_seconds=60, clock=self.clock)
+        self.assertEqual(self.cache.get("achievements").rows, [{"id": "a"}])
+
+    def test_reads_do_not_write_to_disk(self):
+        self.cache.put("modules", "modules", [{"id": 1}])
+        changes = self.cache._conn.total_changes
+        for _ in range(3):
+            self.cache.get("modules")
+        self.assertEqual(self.cache._conn.total_changes, changes)
+
+    def test_invalidate_by_table(self):
+        self.cache.put("lessons:module=1", "lessons", [{"id": "l1"}])
+        self.cache.put("modules", "modules", [{"id": 1}])
+        self.cache.invalidate("lessons")
+        self.assertIsNone(self.cache.get("lessons:module=1"))
+        self.assertIsNotNone(self.cache.get("modules"))
+
+    def test_size_limit_evicts_least_recently_used(self):
+        self.cache.max_bytes = 200
+        self.cache.put("a", "lessons", [{"content": "x" * 80}])
+        self.clock.now += 1
+        self.cache.put("b", "lessons", [{"content": "y" * 80}])
+        self.clock.now += 1
+        self.cache.get("a")
+        self.clock.now += 1
+        self.cache.put("c", "lessons", [{"content": "z" * 80}])
+        self.assertIsNone(self.cache.get("b"))
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNotNone(self.cache.get("c"))
+
+
+class NoUpdatedAtBackend(SQLiteBackend):
+    """Servidor sin la migración de updated_at."""
+
+    def select(self, table, columns="*", *args, **kwargs):
+        if "updated_at" in columns:
+            raise BackendError(f"column {table}.updated_at does not exist", code="42703")
+        return super().select(table, columns, *args, **kwargs)
+
+
+class TestCatalogVersion(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.cache = CatalogCache(os.path.join(self.tmp.name, "cache.sqlite3"), ttl_seconds=60, clock=self.clock)
+        self.backend = SQLiteBackend()
+        self.backend.insert("modules", {"id": 1, "level": 1, "title": "M", "description": "", "icon": "",
+                                        "color": "#000", "order_index": 1,
+                                        "updated_at": "2025-11-01T00:00:00.000+00:00"})
+        self.db = Database(self.backend)
+
+    def tearDown(self):
+        self.cache.close()
+        self.backend.close()
+        self.tmp.cleanup()
+
+    def read_titles(self, db):
+        rows = self.cache.get_or_fetch("modules", "modules", lambda: self.backend.select("modules"),
+                                       version_fn=db._catalog_version)
+        return [row["title"] for row in rows]
+
+    def expire(self):
+        self.clock.now += 60 + VERSION_CHECK_SECONDS
+
+    def test_edit_with_same_row_count_invalidates(self):
+        self.assertEqual(self.read_titles(self.db), ["M"])
+        self.backend.update("modules", {"title": "Conceptos Básicos"}, {"id": 1})
+        self.expire()
+        self.assertEqual(self.read_titles(self.db), ["Conceptos Básicos"])
+
+    def test_unchanged_table_is_revalidated_without_download(self):
+        # La primera descarga ya guarda la huella: la primera revalidación no descarga
+        self.read_titles(self.db)
+        self.assertIsNotNone(self.cache.get("modules").version)
+        downloaded_at = self.cache.get("modules").downloaded_at
+        self.expire()
+        self.read_titles(self.db)
+        self.assertEqual(self.cache.get("modules").downloaded_at, downloaded_at)
+
+    def test_without_updated_at_falls_back_to_ttl(self):
+        backend = NoUpdatedAtBackend()
+        self.assertIsNone(Database(backend)._catalog_version("modules"))
+        backend.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
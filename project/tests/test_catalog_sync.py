@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+
+from src.backends import BackendError, SQLiteBackend
+from src.catalog_cache import CatalogCache
+from src.catalog_sync import CatalogSync
+from src.database import Database
+
+
+class MissingColumnBackend:
+    """Servidor sin la migración de updated_at."""
+
+    name = "old-server"
+    is_local = False
+
+    def select(self, table, *args, **kwargs):
+        raise BackendError("column lessons.updated_at does not exist", code="42703")
+
+
+class CappedBackend:
+    """Servidor con db-max-rows por debajo del tamaño de página pedido; puede fallar a mitad."""
+
+    name = "capped"
+    is_local = False
+
+    def __init__(self, backend, max_rows, fail_after=None):
+        self.backend = backend
+        self.max_rows = max_rows
+        self.fail_after = fail_after
+        self.selects = 0
+
+    def select(self, table, *args, **kwargs):
+        self.selects += 1
+        if self.fail_after is not None and self.selects > self.fail_after:
+            raise ConnectionError("sin red")
+        return self.backend.select(table, *args, **kwargs)[:self.max_rows]
+
+
+class TestCatalogSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.remote = SQLiteBackend(os.path.join(self.tmp.name, "remote.sqlite3"))
+        self.mirror = SQLiteBackend(os.path.join(self.tmp.name, "mirror.sqlite3"), track_changes=False)
+        self.remote.insert("modules", {"id": 1, "level": 1, "title": "Conceptos Básicos", "description": "",
+                                       "icon": "⚛", "color": "#000", "order_index": 1})
+        self.remote.insert("lessons", [
+            {"id": "l1", "module_id": 1, "title": "Átomo", "content": "<p>v1</p>", "order_index": 1},
+            {"id": "l2", "module_id": 1, "title": "Mol", "content": "<p>mol</p>", "order_index": 2},
+        ])
+        self.remote.insert("quizzes", {"id": "q1", "lesson_id": "l1", "question": "¿?", "question_type": "true_false",
+                                       "correct_answer": "Verdadero", "explanation": "", "order_index": 1})
+        self.sync = CatalogSync(self.remote, self.mirror)
+
+    def tearDown(self):
+        self.remote.close()
+        self.mirror.close()
+        self.tmp.cleanup()
+
+    def test_first_pass_copies_every_table(self):
+        changed = self.sync.sync()
+        self.assertEqual(changed, {"modules": 1, "lessons": 2, "quizzes": 1})
+        self.assertTrue(self.sync.is_seeded("achievements"))
+        self.assertEqual(len(self.mirror.select("lessons")), 2)
+
+    def test_later_passes_bring_only_changed_rows(self):
+        self.sync.sync()
+        self.remote.update("lessons", {"content": "<p>v2</p>", "updated_at": "2099-01-01T00:00:00+00:00"},
+                           {"id": "l1"})
+        self.assertEqual(self.sync.sync(), {"lessons": 1})
+        row = self.mirror.select("lessons", "content", {"id": "l1"}, single=True)
+        self.assertEqual(row["content"], "<p>v2</p>")
+        self.assertEqual(self.sync.sync(), {})
+
+    def test_tombstones_remove_deleted_rows(self):
+        self.sync.sync()
+        self.remote.delete("quizzes", {"id": "q1"})
+        self.assertEqual(self.sync.sync(), {"quizzes": 1})
+        self.assertEqual(self.mirror.select("quizzes"), [])
+
+    def test_state_survives_reopening_the_mirror(self):
+        self.sync.sync()
+        reopened = CatalogSync(self.remote, self.mirror)
+        self.assertTrue(reopened.is_seeded("lessons"))
+        self.assertEqual(reopened.sync(), {})
+
+    def test_first_pass_pages_through_rows_sharing_updated_at(self):
+        # Misma marca para todas las filas (p. ej. una migración masiva): pagina por id
+        self.remote.insert("lessons", [
+            {"id": f"m{i}", "module_id": 1, "title": f"L{i}", "content": "", "order_index": 10 + i,
+             "updated_at": "2025-11-07T09:00:00.000+00:00"} for i in range(5)
+        ])
+        sync = CatalogSync(CappedBackend(self.remote, max_rows=2), self.mirror, page_size=3)
+        changed = sync.sync()
+        self.assertEqual(changed["lessons"], 7)
+        self.assertEqual(len(self.mirror.select("lessons")), 7)
+        self.assertTrue(sync.is_seeded("lessons"))
+
+    def test_interrupted_first_pass_does_not_seed(self):
+        self.remote.insert("lessons", [
+            {"id": f"m{i}", "module_id": 1, "title": f"L{i}", "content": "", "order_index": 10 + i}
+            for i in range(5)
+        ])
+        # modules en 2 peticiones (página con datos y vacía); lessons falla en la segunda página
+        sync = CatalogSync(CappedBackend(self.remote, max_rows=2, fail_after=3), self.mirror, page_size=2)
+        with self.assertRaises(ConnectionError):
+            sync.sync()
+        self.assertTrue(sync.is_seeded("modules"))
+        self.assertFalse(sync.is_seeded("lessons"))
+        self.assertFalse(CatalogSync(self.remote, self.mirror).is_seeded("lessons"))
+
+    def test_seeded_tables_leave_the_catalog_cache(self):
+        db = Database(self.remote)
+        db.catalog_cache = CatalogCache(os.path.join(self.tmp.name, "cache.sqlite3"))
+        db.catalog_sync = self.sync
+        self.addCleanup(db.catalog_cache.close)
+
+        db.get_module_bundle(1)
+        db.get_all_achievements()
+        self.assertIsNotNone(db.catalog_cache.get("lesson_cards:module=1"))
+
+        # También las tablas sin cambios que contar (achievements está vacía)
+        db.sync_catalog()
+        self.assertEqual(db.catalog_cache.total_size(), 0)
+
+        # Con la réplica completa las lecturas ya no escriben en la caché
+        db.invalidate_catalog_cache()
+        db._memo.clear()
+        self.assertEqual(len(db.get_lessons_by_module(1)), 2)
+        db.get_module_bundle(1)
+        self.assertEqual(db.catalog_cache.total_size(), 0)
+
+    def test_missing_migration_disables_sync(self):
+        sync = CatalogSync(MissingColumnBackend(), self.mirror)
+        self.assertEqual(sync.sync(), {})
+        self.assertFalse(sync.enabled)
+        self.assertFalse(sync.is_seeded("lessons"))
+
+
+if __name__ == "__main__":
+    unittest.main()
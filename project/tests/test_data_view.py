@@ -0,0 +1,160 @@
+import datetime
+import os
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from tests.test_sqlite_backend import seed_catalog
+
+from src.backends import BackendError, SQLiteBackend
+from src.database import Database
+from src.ui.achievements_view import AchievementsView
+from src.ui.data_view import DataView, data_digest
+from src.ui.modules_view import ModulesView
+from src.ui.widgets.loading_overlay import LoadingOverlay
+
+
+class TestDataDigest(unittest.TestCase):
+    def test_same_data_same_digest_regardless_of_key_order(self):
+        a = {"stats": {"lessons_completed": 3, "average_score": 80}, "modules": [{"id": 1}], "completions": {1: {"percentage": 50}}}
+        b = {"completions": {1: {"percentage": 50}}, "modules": [{"id": 1}], "stats": {"average_score": 80, "lessons_completed": 3}}
+        self.assertEqual(data_digest(a), data_digest(b))
+
+    def test_any_change_changes_digest(self):
+        before = {"earned": [{"achievement_id": "a1", "earned_at": datetime.datetime(2025, 11, 8, 9, 0)}]}
+        after = {"earned": [{"achievement_id": "a1", "earned_at": datetime.datetime(2025, 11, 8, 9, 1)}]}
+        self.assertNotEqual(data_digest(before), data_digest(after))
+        self.assertNotEqual(data_digest([]), data_digest(None))
+
+    def test_unencodable_data_has_no_digest(self):
+        # Claves de tipos mezclados no se pueden ordenar: siempre se repinta
+        self.assertIsNone(data_digest({1: "a", "b": 2}))
+
+
+class CountingView(DataView):
+    """Vista mínima: `result` es lo que devolverá el próximo fetch (o la excepción que lanzará)."""
+
+    def __init__(self):
+        super().__init__(None, None)
+        self.loading_overlay = LoadingOverlay(self)
+        self.result = None
+        self.renders = []
+
+    def fetch_data(self):
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+    def render(self, data):
+        self.renders.append(data)
+
+
+class TestDataViewRevalidation(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.view = CountingView()
+
+    def refresh(self, result):
+        self.view.result = result
+        self.view.refresh()
+        self.view.runner.pool.waitForDone()
+        QApplication.processEvents()
+
+    def test_unchanged_data_is_not_rendered_again(self):
+        self.refresh({"modules": [1, 2]})
+        self.refresh({"modules": [1, 2]})
+        self.assertEqual(self.view.renders, [{"modules": [1, 2]}])
+        self.refresh({"modules": [1, 2, 3]})
+        self.assertEqual(len(self.view.renders), 2)
+
+    def test_mark_stale_forces_a_render(self):
+        self.refresh({"modules": [1]})
+        self.view.mark_stale()
+        self.refresh({"modules": [1]})
+        self.assertEqual(len(self.view.renders), 2)
+
+    def test_failed_revalidation_keeps_the_view(self):
+        self.refresh({"modules": [1]})
+        self.refresh(None)
+        self.refresh(RuntimeError("sin red"))
+        self.assertEqual(self.view.renders, [{"modules": [1]}])
+        self.assertFalse(self.view.stale_banner.isHidden())
+
+        self.refresh({"modules": [1, 2]})
+        self.assertEqual(len(self.view.renders), 2)
+        self.assertTrue(self.view.stale_banner.isHidden())
+
+    def test_failed_first_load_is_rendered(self):
+        # Sin nada pintado, la vista muestra su propio mensaje de error
+        self.refresh(None)
+        self.assertEqual(self.view.renders, [None])
+        self.assertIsNone(self.view.stale_banner)
+
+
+class FlakyBackend(SQLiteBackend):
+    """SQLite que deja de responder a las lecturas cuando `offline` es True."""
+
+    offline = False
+
+    def select(self, table, *args, **kwargs):
+        if self.offline:
+            raise BackendError("sin red")
+        return super().select(table, *args, **kwargs)
+
+
+class FakeAuth:
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def get_current_user_id(self):
+        return self.user_id
+
+
+class TestViewsKeepStaleDataOnError(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.backend = FlakyBackend()
+        seed_catalog(self.backend)
+        self.db = Database(self.backend)
+        self.auth = FakeAuth(self.db.create_user("ana", "Ana")["id"])
+        self.db.submit_quiz(self.auth.user_id, "l1", 100)
+
+    def tearDown(self):
+        self.backend.close()
+
+    def refresh(self, view):
+        view.refresh()
+        view.runner.pool.waitForDone()
+        QApplication.processEvents()
+
+    def revalidate_offline(self, view):
+        self.backend.offline = True
+        self.db._memo.clear()
+        view.mark_stale()
+        self.refresh(view)
+
+    def test_modules_view(self):
+        view = ModulesView(self.db, self.auth)
+        self.refresh(view)
+        self.revalidate_offline(view)
+        self.assertEqual(view.modules_list.count(), 2)
+        self.assertFalse(view.stale_banner.isHidden())
+
+    def test_achievements_view(self):
+        view = AchievementsView(self.db, self.auth)
+        self.refresh(view)
+        cards = view.achievements_layout.count()
+        self.revalidate_offline(view)
+        self.assertEqual(view.achievements_layout.count(), cards)
+        self.assertFalse(view.stale_banner.isHidden())
+
+if __name__ == "__main__":
+    unittest.main()
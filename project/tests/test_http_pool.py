@@ -0,0 +1,53 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.http_pool import ConnectionStats, create_http_client, get_connection_stats
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpPool(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/rest/v1/modules"
+        get_connection_stats().reset()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_burst_reuses_one_warm_connection(self):
+        with create_http_client() as client:
+            for _ in range(5):
+                self.assertEqual(client.get(self.url).status_code, 200)
+        stats = get_connection_stats().to_dict()
+        self.assertEqual(stats["requests"], 5)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertEqual(stats["reused_connections"], 4)
+        self.assertGreaterEqual(stats["handshake_total_ms"], 0)
+
+    def test_stats_report_reuse_rate(self):
+        stats = ConnectionStats()
+        stats.record(True, 0.05)
+        stats.record(False, 0.0)
+        self.assertEqual(stats.to_dict()["reuse_rate"], 0.5)
+        self.assertEqual(stats.to_dict()["handshake_p50_ms"], 50.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
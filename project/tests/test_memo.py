@@ -0,0 +1,102 @@
+import threading
+import unittest
+
+from src.memo import LRUCache, Memoizer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestMemoizer(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.memo = Memoizer(ttl=10, clock=self.clock)
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        return [{"lesson_id": "l1"}]
+
+    def test_results_are_reused_until_ttl_expires(self):
+        self.memo.get_or_call("progress", self.fetch)
+        self.memo.get_or_call("progress", self.fetch)
+        self.assertEqual(self.calls, 1)
+        self.clock.now += 11
+        self.memo.get_or_call("progress", self.fetch)
+        self.assertEqual(self.calls, 2)
+        stats = self.memo.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+    def test_concurrent_identical_calls_share_one_request(self):
+        release = threading.Event()
+
+        def slow_fetch():
+            release.wait(5)
+            return self.fetch()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.memo.get_or_call("progress", slow_fetch)))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        while self.memo.stats()["coalesced"] < 3:
+            threading.Event().wait(0.01)
+        release.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(results), 4)
+
+    def test_invalidation_is_scoped_by_tag(self):
+        self.memo.get_or_call(("progress", "u1"), self.fetch, tags=("progress:u1",))
+        self.memo.get_or_call(("progress", "u2"), self.fetch, tags=("progress:u2",))
+        self.memo.invalidate("progress:u1")
+        self.memo.get_or_call(("progress", "u1"), self.fetch, tags=("progress:u1",))
+        self.memo.get_or_call(("progress", "u2"), self.fetch, tags=("progress:u2",))
+        self.assertEqual(self.calls, 3)
+
+    def test_write_during_flight_discards_result(self):
+        def fetch_then_write():
+            self.memo.invalidate("progress:u1")
+            return self.fetch()
+
+        self.memo.get_or_call("progress", fetch_then_write, tags=("progress:u1",))
+        self.memo.get_or_call("progress", self.fetch, tags=("progress:u1",))
+        self.assertEqual(self.calls, 2)
+
+    def test_errors_are_not_cached(self):
+        def failing():
+            raise ConnectionError("sin red")
+
+        with self.assertRaises(ConnectionError):
+            self.memo.get_or_call("progress", failing)
+        self.assertEqual(self.memo.get_or_call("progress", self.fetch), [{"lesson_id": "l1"}])
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("l1", "<p>uno</p>")
+        cache.put("l2", "<p>dos</p>")
+        cache.get("l1")
+        cache.put("l3", "<p>tres</p>")
+        self.assertIsNone(cache.get("l2"))
+        self.assertEqual(cache.get("l1"), "<p>uno</p>")
+
+    def test_total_size_is_bounded(self):
+        cache = LRUCache(max_entries=10, max_size=10)
+        cache.put("l1", "x" * 6)
+        cache.put("l2", "y" * 6)
+        self.assertEqual(len(cache), 1)
+        self.assertLessEqual(cache.size, 10)
+        cache.put("big", "z" * 11)
+        self.assertIsNone(cache.get("big"))
+
+
+if __name__ == "__main__":
+    unittest.main()
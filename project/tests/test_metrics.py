@@ -0,0 +1,73 @@
+import contextvars
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src import metrics
+from src.metrics import DatabaseMetrics, instrumented, report_error
+
+
+class FakeDatabase:
+    @instrumented
+    def get_modules(self):
+        return [{"id": 1}, {"id": 2}]
+
+    @instrumented
+    def get_module_completion(self):
+        # Llamada anidada: no debe contarse dos veces en la acción
+        return {m["id"]: {"percentage": 0} for m in self.get_modules()}
+
+    @instrumented
+    def get_progress(self):
+        try:
+            raise ConnectionError("sin red")
+        except Exception as e:
+            report_error("Error getting user progress", e)
+            return []
+
+
+class TestDatabaseMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = DatabaseMetrics(slow_query_ms=0)
+        self._previous = metrics._metrics
+        metrics._metrics = self.metrics
+        self.db = FakeDatabase()
+
+    def tearDown(self):
+        metrics._metrics = self._previous
+
+    def test_latency_rows_and_errors_per_method(self):
+        self.db.get_modules()
+        self.db.get_progress()
+        data = self.metrics.to_dict()["methods"]
+        self.assertEqual(data["FakeDatabase.get_modules"]["rows"], 2)
+        self.assertEqual(data["FakeDatabase.get_progress"]["errors"], 1)
+        self.assertIn("p95_ms", data["FakeDatabase.get_modules"])
+
+    def test_calls_are_grouped_by_ui_action(self):
+        scope = self.metrics.begin_action("Progreso: refresco")
+        with self.metrics.activate(scope):
+            context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(context.run, self.db.get_module_completion).result()
+            pool.submit(context.run, self.db.get_progress).result()
+        self.db.get_modules()  # fuera de la acción
+        self.metrics.finish_action(scope)
+
+        action = self.metrics.to_dict()["actions"]["Progreso: refresco"]
+        self.assertEqual((action["runs"], action["calls"], action["errors"]), (1, 2, 1))
+
+    def test_slow_queries_are_logged_and_exported(self):
+        self.db.get_modules()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "metrics.json")
+            self.metrics.export_json(path)
+            with open(path, encoding="utf-8") as f:
+                exported = json.load(f)
+        self.assertEqual(exported["slow_queries"][0]["method"], "FakeDatabase.get_modules")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import threading
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from src.backends import SQLiteBackend
+from src.database import Database
+from src.ui.modules_view import ModulesView
+from tests.test_sqlite_backend import seed_catalog
+
+
+class FakeAuth:
+    def get_current_user_id(self):
+        return "u1"
+
+
+class TestModulesViewReset(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.backend = SQLiteBackend()
+        seed_catalog(self.backend)
+        self.view = ModulesView(Database(self.backend), FakeAuth())
+
+    def tearDown(self):
+        self.backend.close()
+
+    def deliver(self):
+        self.view.runner.pool.waitForDone()
+        QApplication.processEvents()
+
+    def test_module_load_in_flight_is_dropped_on_reset(self):
+        started = threading.Event()
+        release = threading.Event()
+        fetch = self.view.fetch_module_content
+
+        def slow_fetch(module):
+            started.set()
+            release.wait(5)
+            return fetch(module)
+
+        self.view.fetch_module_content = slow_fetch
+        self.view.load_module_content({"id": 1, "title": "Conceptos Básicos"})
+        started.wait(5)
+        self.view.reset()
+        release.set()
+        self.deliver()
+
+        # Solo queda la portada vacía: el módulo del alumno anterior no se pinta
+        self.assertEqual(self.view.content_stack.count(), 1)
+        self.assertIsNone(self.view.current_module)
+
+
+if __name__ == "__main__":
+    unittest.main()
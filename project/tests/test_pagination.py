@@ -0,0 +1,93 @@
+import unittest
+
+from src.backends import SQLiteBackend
+from src.database import Database
+from src.pagination import iter_keyset
+
+
+class CountingBackend:
+    """Envuelve un backend y anota cada página pedida."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.pages = []
+
+    def select(self, table, columns="*", filters=None, **kwargs):
+        self.pages.append(kwargs.get("after"))
+        return self.backend.select(table, columns, filters, **kwargs)
+
+
+class CappedBackend(CountingBackend):
+    """Servidor con db-max-rows por debajo del page_size pedido."""
+
+    def __init__(self, backend, max_rows):
+        super().__init__(backend)
+        self.max_rows = max_rows
+
+    def select(self, table, columns="*", filters=None, **kwargs):
+        return super().select(table, columns, filters, **kwargs)[:self.max_rows]
+
+
+class TestKeysetPagination(unittest.TestCase):
+    def setUp(self):
+        self.backend = SQLiteBackend()
+        self.backend.insert("modules", {"id": 1, "level": 1, "title": "M", "description": "",
+                                        "icon": "", "color": "#000", "order_index": 1})
+        self.backend.insert("lessons", [{"id": f"l{i:02d}", "module_id": 1, "title": f"L{i}",
+                                         "content": "", "order_index": i} for i in range(25)])
+        self.db = Database(self.backend)
+        self.users = [self.db.create_user(name, name)["id"] for name in ("ana", "luis")]
+        for user_id in self.users:
+            for i in range(25):
+                self.db.save_lesson_progress(user_id, f"l{i:02d}", True, i)
+
+    def tearDown(self):
+        self.backend.close()
+
+    def test_streams_every_row_once_in_key_order(self):
+        counting = CountingBackend(self.backend)
+        rows = list(iter_keyset(counting, "user_progress", "lesson_id,score", {"user_id": self.users[0]},
+                                key="lesson_id", page_size=10))
+        self.assertEqual([r["lesson_id"] for r in rows], [f"l{i:02d}" for i in range(25)])
+        self.assertEqual(counting.pages, [None, ("lesson_id", "l09"), ("lesson_id", "l19"), ("lesson_id", "l24")])
+
+    def test_exact_multiple_ends_with_an_empty_page(self):
+        counting = CountingBackend(self.backend)
+        rows = list(iter_keyset(counting, "lessons", "title", page_size=5, prefetch=False))
+        self.assertEqual(len(rows), 25)
+        self.assertIn("id", rows[0])
+        self.assertEqual(len(counting.pages), 6)
+
+    def test_server_row_cap_below_page_size_does_not_truncate(self):
+        for prefetch in (True, False):
+            capped = CappedBackend(self.backend, max_rows=3)
+            rows = list(iter_keyset(capped, "lessons", "id", page_size=10, prefetch=prefetch))
+            self.assertEqual([r["id"] for r in rows], [f"l{i:02d}" for i in range(25)])
+            self.assertEqual(len(capped.pages), 10)
+
+    def test_compound_key_breaks_ties_and_honours_start(self):
+        # order_index se repite en cada lección del mismo valor: el id desempata
+        self.backend.insert("lessons", [{"id": f"x{i}", "module_id": 1, "title": "X", "content": "",
+                                         "order_index": 3} for i in range(4)])
+        counting = CountingBackend(self.backend)
+        rows = list(iter_keyset(counting, "lessons", "title", key=("order_index", "id"), page_size=2,
+                                start=("order_index", 2)))
+        self.assertEqual([r["id"] for r in rows[:6]], ["l03", "x0", "x1", "x2", "x3", "l04"])
+        self.assertEqual(len(rows), 26)
+        self.assertEqual(counting.pages[:2], [("order_index", 2), (("order_index", "id"), (3, "x0"))])
+
+    def test_database_iterators(self):
+        self.assertEqual(len(list(self.db.iter_user_progress(self.users[1], page_size=7))), 25)
+        self.assertEqual(len(list(self.db.iter_table("user_progress", "user_id,score", page_size=20))), 50)
+        self.assertEqual(list(self.db.iter_user_achievements(self.users[0])), [])
+
+    def test_abandoning_the_iterator_stops_paging(self):
+        counting = CountingBackend(self.backend)
+        rows = iter_keyset(counting, "user_progress", page_size=10)
+        next(rows)
+        rows.close()
+        self.assertLessEqual(len(counting.pages), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
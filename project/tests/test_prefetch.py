@@ -0,0 +1,77 @@
+import unittest
+
+from src.prefetch import ImageCache, LessonPrefetcher, image_urls
+
+LESSON_HTML = '<p>Átomo</p><img src="https://cdn.example/a.png"><img src="data:image/png;base64,xx">'
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.calls = []
+
+    def get_lessons_by_module(self, module_id):
+        return [
+            {"id": "l2", "module_id": 1, "order_index": 2},
+            {"id": "l1", "module_id": 1, "order_index": 1},
+        ]
+
+    def get_quizzes_by_lesson(self, lesson_id):
+        self.calls.append(("quizzes", lesson_id))
+        return []
+
+    def get_lesson_content(self, lesson_id):
+        self.calls.append(("content", lesson_id))
+        return '<img src="https://cdn.example/b.png">'
+
+    def peek_lesson_content(self, lesson_id):
+        return None
+
+
+class TestLessonPrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeDatabase()
+        self.downloads = []
+        self.images = ImageCache(fetch=lambda url: self.downloads.append(url) or b"png")
+
+    def test_prefetches_quiz_next_lesson_and_images_in_order(self):
+        prefetcher = LessonPrefetcher(self.db, self.images)
+        done = prefetcher.run({"id": "l1", "module_id": 1, "content": LESSON_HTML})
+        self.assertEqual(self.db.calls, [("quizzes", "l1"), ("content", "l2"), ("quizzes", "l2")])
+        self.assertEqual(self.downloads, ["https://cdn.example/a.png", "https://cdn.example/b.png"])
+        self.assertEqual(done, 5)
+        self.assertEqual(self.images.get("https://cdn.example/b.png"), b"png")
+
+    def test_budget_limits_the_number_of_reads(self):
+        prefetcher = LessonPrefetcher(self.db, self.images, max_items=2)
+        prefetcher.run({"id": "l1", "module_id": 1, "content": LESSON_HTML})
+        self.assertEqual(self.db.calls, [("quizzes", "l1"), ("content", "l2")])
+        self.assertEqual(self.downloads, [])
+
+    def test_gives_up_while_foreground_work_is_pending(self):
+        prefetcher = LessonPrefetcher(self.db, self.images, is_busy=lambda: True, idle_wait=0)
+        self.assertEqual(prefetcher.run({"id": "l1", "module_id": 1, "content": LESSON_HTML}), 0)
+        self.assertEqual(self.db.calls, [])
+
+    def test_current_content_counts_against_the_budget(self):
+        prefetcher = LessonPrefetcher(self.db, self.images, max_items=3)
+        prefetcher.run({"id": "l1", "module_id": 1, "content": None})
+        self.assertEqual(self.db.calls, [("quizzes", "l1"), ("content", "l2"), ("quizzes", "l2")])
+
+    def test_stops_once_cancelled(self):
+        prefetcher = LessonPrefetcher(self.db, self.images)
+        cancelled = lambda: len(self.db.calls) >= 1
+        self.assertEqual(prefetcher.run({"id": "l1", "module_id": 1, "content": LESSON_HTML}, cancelled=cancelled), 1)
+        self.assertEqual(self.db.calls, [("quizzes", "l1")])
+        self.assertEqual(self.downloads, [])
+
+    def test_last_lesson_has_no_next(self):
+        prefetcher = LessonPrefetcher(self.db, self.images)
+        self.assertIsNone(prefetcher.next_lesson({"id": "l2", "module_id": 1}))
+        self.assertEqual(prefetcher.next_lesson({"id": "virtual_intro_1", "module_id": 1, "is_virtual": True})["id"], "l1")
+
+    def test_image_urls_skip_inline_data(self):
+        self.assertEqual(image_urls(LESSON_HTML + LESSON_HTML), ["https://cdn.example/a.png"])
+
+
+if __name__ == "__main__":
+    unittest.main()
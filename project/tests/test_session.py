@@ -0,0 +1,78 @@
+import time
+import unittest
+from concurrent.futures import Future
+
+from src.backends import SQLiteBackend
+from src.database import Database
+from src.session import SessionSnapshot
+from tests.test_sqlite_backend import seed_catalog
+
+
+def make_snapshot():
+    return SessionSnapshot(
+        "u1",
+        progress=[{"user_id": "u1", "lesson_id": "l1", "completed": True, "score": 80}],
+        user_achievements=[],
+        modules=[{"id": 1, "title": "Conceptos Básicos"}, {"id": 2, "title": "Enlaces"}],
+        achievements=[{"id": "a1", "title": "Primer paso"}],
+        lesson_modules={"l1": 1, "l2": 1, "l3": 2},
+    )
+
+
+class TestSessionSnapshot(unittest.TestCase):
+    def test_completions_follow_applied_writes(self):
+        snapshot = make_snapshot()
+        self.assertEqual(snapshot.module_completion(1)["percentage"], 50)
+        snapshot.apply_progress("l2", True, 100)
+        self.assertEqual(snapshot.module_completion(1)["percentage"], 100)
+        self.assertEqual(snapshot.completions()[2]["completed"], 0)
+
+    def test_applied_achievement_is_recorded_once(self):
+        snapshot = make_snapshot()
+        snapshot.apply_achievement("a1")
+        snapshot.apply_achievement("a1")
+        earned = snapshot.user_achievements()
+        self.assertEqual([ua["achievement_id"] for ua in earned], ["a1"])
+
+    def setUp(self):
+        # Base local vacía: lo que devuelvan las lecturas solo puede venir de la sesión
+        self.backend = SQLiteBackend()
+        self.db = Database(self.backend)
+
+    def tearDown(self):
+        self.backend.close()
+
+    def test_database_reads_are_served_from_snapshot(self):
+        db = self.db
+        future = Future()
+        future.set_result(make_snapshot())
+        db.attach_session("u1", future)
+
+        self.assertEqual(len(db.get_user_progress("u1")), 1)
+        self.assertEqual(len(db.get_all_modules()), 2)
+        self.assertEqual(db.get_all_module_completion("u1")[1]["completed"], 1)
+        self.assertEqual(db.get_module_completion("u1", 2)["total"], 1)
+        self.assertEqual(db.get_user_achievements("u1"), [])
+
+        db.end_session()
+        self.assertIsNone(db.session_snapshot("u1"))
+
+    def test_writes_do_not_wait_for_a_pending_prefetch(self):
+        seed_catalog(self.backend)
+        user_id = self.db.create_user("ana", "Ana")["id"]
+        future = Future()
+        self.db.attach_session(user_id, future)
+
+        started = time.monotonic()
+        self.assertTrue(self.db.save_lesson_progress(user_id, "l2", True, 90))
+        self.assertTrue(self.db.award_achievement(user_id, "a1"))
+        self.assertLess(time.monotonic() - started, 1.0)
+
+        # La precarga leyó el servidor antes de las escrituras: se aplican al llegar
+        future.set_result(SessionSnapshot(user_id, progress=[], user_achievements=[], modules=[],
+                                          achievements=[], lesson_modules={"l1": 1, "l2": 1}))
+        self.assertEqual([p["lesson_id"] for p in self.db.get_user_progress(user_id)], ["l2"])
+        self.assertEqual([ua["achievement_id"] for ua in self.db.get_user_achievements(user_id)], ["a1"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import os
+import tempfile
+import unittest
+
+from src.backends import BackendError, DatabaseBackend, SQLiteBackend
+from src.database import Database
+from src.write_queue import WriteQueue
+
+
+def seed_catalog(backend):
+    backend.insert("modules", [
+        {"id": 1, "level": 1, "title": "Conceptos Básicos", "description": "", "icon": "⚛", "color": "#000", "order_index": 1},
+        {"id": 2, "level": 1, "title": "Enlaces", "description": "", "icon": "🔗", "color": "#000", "order_index": 2},
+    ])
+    backend.insert("lessons", [
+        {"id": "l1", "module_id": 1, "title": "Átomo", "content": "<p>átomo</p>", "order_index": 1},
+        {"id": "l2", "module_id": 1, "title": "Mol", "content": "<p>mol</p>", "order_index": 2},
+        {"id": "l3", "module_id": 2, "title": "Iónico", "content": "<p>iónico</p>", "order_index": 1},
+    ])
+    backend.insert("quizzes", {
+        "lesson_id": "l1", "question": "¿Qué es un átomo?", "question_type": "multiple_choice",
+        "options": ["Materia", "Energía"], "correct_answer": "Materia", "explanation": "", "order_index": 1,
+    })
+    backend.insert("achievements", [
+        {"id": "a1", "title": "Primer paso", "description": "", "icon": "", "requirement_type": "lesson_complete", "requirement_value": 1},
+        {"id": "a2", "title": "Perfecto", "description": "", "icon": "", "requirement_type": "perfect_score", "requirement_value": 100},
+        {"id": "a3", "title": "Módulo 1", "description": "", "icon": "", "requirement_type": "module_complete", "requirement_value": 1},
+    ])
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.backend = SQLiteBackend(os.path.join(self.tmp.name, "quimicapro.sqlite3"))
+        seed_catalog(self.backend)
+        self.db = Database(self.backend)
+
+    def tearDown(self):
+        self.backend.close()
+        self.tmp.cleanup()
+
+    def test_implements_protocol_in_wal_mode(self):
+        self.assertIsInstance(self.backend, DatabaseBackend)
+        mode = self.backend._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+        self.assertIsNone(self.db.catalog_cache)
+        self.assertIsNone(self.db.write_queue)
+
+    def test_users_and_catalog(self):
+        user = self.db.create_user("ana", "Ana")
+        self.assertTrue(user["id"])
+        self.assertEqual(self.db.get_user_by_username("ana")["id"], user["id"])
+        self.assertIsNone(self.db.get_user_by_username("nadie"))
+        self.assertTrue(self.db.update_last_login(user["id"]))
+        self.assertIsNone(self.db.create_user("ana", "Otra"))
+
+        self.assertEqual([m["id"] for m in self.db.get_all_modules()], [1, 2])
+        cards = self.db.get_lessons_by_module(1)
+        self.assertEqual([c["id"] for c in cards], ["l1", "l2"])
+        self.assertNotIn("content", cards[0])
+        self.assertEqual(self.db.get_lesson_content("l2"), "<p>mol</p>")
+        self.assertEqual(self.db.get_quizzes_by_lesson("l1")[0]["options"], ["Materia", "Energía"])
+
+    def test_progress_upsert_and_completion(self):
+        user_id = self.db.create_user("ana", "Ana")["id"]
+        self.assertTrue(self.db.save_lesson_progress(user_id, "l1", True, 60))
+        self.assertTrue(self.db.save_lesson_progress(user_id, "l1", True, 90))
+        progress = self.db.get_user_progress(user_id)
+        self.assertEqual(len(progress), 1)
+        self.assertIs(progress[0]["completed"], True)
+        self.assertEqual(progress[0]["score"], 90)
+        self.assertEqual(self.db.get_all_module_completion(user_id)[1]["percentage"], 50)
+        self.assertEqual(self.db.get_module_completion(user_id, 2)["completed"], 0)
+
+    def test_bulk_completion_rpc_survives_transient_errors(self):
+        user_id = self.db.create_user("ana", "Ana")["id"]
+        self.db.save_lesson_progress(user_id, "l1", True, 90)
+        rpc = self.backend.rpc
+        errors = [ConnectionError("sin red"), BackendError("Could not find the function", code="PGRST202")]
+
+        def failing_rpc(name, params):
+            if name == "get_module_completion_bulk":
+                raise errors.pop(0)
+            return rpc(name, params)
+
+        self.backend.rpc = failing_rpc
+        self.assertEqual(self.db._query_all_module_completion(user_id)[1]["completed"], 1)
+        self.assertTrue(self.db._bulk_completion_rpc)
+        self.assertEqual(self.db._query_all_module_completion(user_id)[1]["completed"], 1)
+        self.assertFalse(self.db._bulk_completion_rpc)
+
+    def test_submit_quiz_awards_each_achievement_once(self):
+        user_id = self.db.create_user("ana", "Ana")["id"]
+        awarded = self.db.submit_quiz(user_id, "l1", 100)
+        self.assertEqual(sorted(a["id"] for a in awarded), ["a1", "a2"])
+        awarded = self.db.submit_quiz(user_id, "l2", 80)
+        self.assertEqual([a["id"] for a in awarded], ["a3"])
+        self.assertEqual(self.db.submit_quiz(user_id, "l2", 80), [])
+        self.assertEqual(len(self.db.get_user_achievements(user_id)), 3)
+
+    def test_submit_quiz_supersedes_progress_still_in_backoff(self):
+        user_id = self.db.create_user("ana", "Ana")["id"]
+        self.db.write_queue = WriteQueue(os.path.join(self.tmp.name, "pending.sqlite3"), base_delay=3600)
+        self.addCleanup(self.db.write_queue.close)
+        self.db.queue_lesson_progress(user_id, "l1", True, 30)
+
+        def offline(rows):
+            raise ConnectionError("sin red")
+
+        # El intento fallido deja la fila en backoff: el vaciado previo a la RPC no la envía
+        self.assertFalse(self.db.write_queue.flush(offline, offline))
+        self.db.flush_pending_writes()
+        self.assertEqual(self.db.write_queue.pending_count(), 1)
+        self.assertIsNotNone(self.db.submit_quiz(user_id, "l1", 90))
+
+        self.assertEqual(self.db.write_queue.pending_count(), 0)
+        scores = {p["lesson_id"]: p["score"] for p in self.db.get_user_progress(user_id)}
+        self.assertEqual(scores, {"l1": 90})
+
+    def test_module_bundle_fills_caches_for_navigation(self):
+        bundle = self.db.get_module_bundle(1)
+        self.assertEqual([l["id"] for l in bundle["lessons"]], ["l1", "l2"])
+        self.assertEqual(len(bundle["lessons"][0]["quizzes"]), 1)
+
+        self.db.backend = None  # cualquier lectura más fallaría
+        self.assertEqual(self.db.get_module_by_id(1)["title"], "Conceptos Básicos")
+        self.assertEqual([c["id"] for c in self.db.get_lessons_by_module(1)], ["l1", "l2"])
+        self.assertEqual(self.db.get_lesson_by_id("l2")["title"], "Mol")
+        self.assertEqual(self.db.get_lesson_content("l1"), "<p>átomo</p>")
+        self.assertEqual(self.db.get_quizzes_by_lesson("l1")[0]["correct_answer"], "Materia")
+        self.assertEqual(self.db.get_quizzes_by_lesson("l2"), [])
+
+    def test_end_session_keeps_catalog_warm_for_next_user(self):
+        ana = self.db.create_user("ana", "Ana")["id"]
+        self.db.get_module_bundle(1)
+        self.db.save_lesson_progress(ana, "l1", True, 90)
+        self.assertEqual(len(self.db.get_user_progress(ana)), 1)
+        self.db.end_session()
+        self.assertIsNone(self.db._memo.peek(("progress", ana)))
+
+        luis = self.db.create_user("luis", "Luis")["id"]
+        self.db.save_lesson_progress(luis, "l2", True, 70)
+        backend, self.db.backend = self.db.backend, None
+        self.assertEqual(self.db.get_module_by_id(1)["title"], "Conceptos Básicos")
+        self.assertEqual([c["id"] for c in self.db.get_lessons_by_module(1)], ["l1", "l2"])
+        self.assertEqual(self.db.get_quizzes_by_lesson("l1")[0]["correct_answer"], "Materia")
+        self.db.backend = backend
+        self.assertEqual([p["lesson_id"] for p in self.db.get_user_progress(luis)], ["l2"])
+
+    def test_ignore_duplicates_returns_only_new_rows(self):
+        user_id = self.db.create_user("ana", "Ana")["id"]
+        rows = [{"user_id": user_id, "achievement_id": "a1"}]
+        self.assertEqual(len(self.backend.upsert("user_achievements", rows, "user_id,achievement_id", ignore_duplicates=True)), 1)
+        rows.append({"user_id": user_id, "achievement_id": "a2"})
+        inserted = self.backend.upsert("user_achievements", rows, "user_id,achievement_id", ignore_duplicates=True)
+        self.assertEqual([r["achievement_id"] for r in inserted], ["a2"])
+
+    def test_award_achievements_in_one_upsert(self):
+        user_id = self.db.create_user("ana", "Ana")["id"]
+        self.assertTrue(self.db.award_achievement(user_id, "a1"))
+        self.assertFalse(self.db.award_achievement(user_id, "a1"))
+        self.assertEqual(self.db.award_achievements(user_id, ["a1", "a2", "a3", "a2"]), ["a2", "a3"])
+        self.assertEqual(self.db.award_achievements(user_id, ["a1", "a3"]), [])
+        self.assertEqual(len(self.db.get_user_achievements(user_id)), 3)
+
+    def test_dashboard_stats_rpc_matches_client_computation(self):
+        user_id = self.db.create_user("ana", "Ana")["id"]
+        self.db.submit_quiz(user_id, "l1", 100)
+        self.db.save_lesson_progress(user_id, "l2", False, 45)
+        stats = self.db.get_dashboard_stats(user_id)
+        self.assertEqual(stats, {
+            "lessons_started": 2, "lessons_completed": 1, "average_score": 72, "achievements": 2,
+            "modules_total": 2, "modules_completed": 0, "lessons_total": 3, "module_lessons_completed": 1,
+        })
+        self.db._dashboard_stats_rpc = False
+        self.assertEqual(self.db.get_dashboard_stats(user_id), stats)
+
+    def test_rejects_unknown_identifiers_and_rpcs(self):
+        with self.assertRaises(BackendError):
+            self.backend.select("lessons; DROP TABLE lessons")
+        with self.assertRaises(BackendError):
+            self.backend.select("lessons", "id,nope")
+        with self.assertRaises(BackendError) as ctx:
+            self.backend.rpc("no_such_function", {})
+        self.assertEqual(ctx.exception.code, "PGRST202")
+
+
+if __name__ == "__main__":
+    unittest.main()
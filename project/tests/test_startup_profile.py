@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from src.startup_profile import PROFILE_ENV, StartupProfiler, start_startup_profile
+import src.startup_profile as startup_profile
+
+
+class TestStartupProfile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "arranque.json")
+
+    def tearDown(self):
+        profiler = startup_profile._profiler
+        if profiler is not None:
+            profiler.remove_import_hook()
+        startup_profile._profiler = None
+        os.environ.pop(PROFILE_ENV, None)
+        self.tmp.cleanup()
+
+    def test_flag_is_removed_from_argv(self):
+        argv = ["main.py", f"--profile-startup={self.path}", "-style", "fusion"]
+        profiler = start_startup_profile(argv)
+        self.assertEqual(argv, ["main.py", "-style", "fusion"])
+        self.assertEqual(profiler.path, self.path)
+
+    def test_disabled_without_flag_or_env(self):
+        self.assertIsNone(start_startup_profile(["main.py"]))
+
+    def test_falsy_env_value_disables_profiling(self):
+        for value in ("0", "false", "No", "off"):
+            os.environ[PROFILE_ENV] = value
+            self.assertIsNone(start_startup_profile(["main.py"]))
+        os.environ[PROFILE_ENV] = "1"
+        self.assertEqual(start_startup_profile(["main.py"]).path, "startup_profile.json")
+
+    def test_nested_spans_and_imports_report_self_time(self):
+        profiler = StartupProfiler(self.path)
+        profiler.install_import_hook()
+        sys.modules.pop("json.tool", None)
+        with profiler.span("MainWindow"):
+            with profiler.span("HomeView", "view"):
+                import json.tool  # noqa: F401
+        profiler.remove_import_hook()
+        profiler.mark("LoginWindow.first_paint")
+        profiler.write()
+
+        report = profiler.report()
+        self.assertIn("MainWindow", report["summary"]["phases_ms"])
+        self.assertIn("HomeView", report["summary"]["views_ms"])
+        self.assertIn("json.tool", [i["module"] for i in report["summary"]["imports"]["slowest"]])
+        self.assertIn("LoginWindow.first_paint", report["summary"]["marks_ms"])
+        self.assertEqual(json.tool.__loader__.__class__.__name__, "SourceFileLoader")
+        with open(os.path.splitext(self.path)[0] + ".folded", encoding="utf-8") as f:
+            self.assertIn("MainThread;MainWindow;HomeView;json.tool ", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
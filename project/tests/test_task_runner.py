@@ -0,0 +1,74 @@
+import os
+import threading
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QCoreApplication, QThreadPool
+from PyQt5.QtWidgets import QApplication
+
+from src import metrics
+from src.metrics import DatabaseMetrics
+from src.ui.task_runner import TaskRunner
+
+
+class TestTaskRunner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.metrics = DatabaseMetrics()
+        self._previous = metrics._metrics
+        metrics._metrics = self.metrics
+        self.pool = QThreadPool()
+        self.runner = TaskRunner(self.pool)
+
+    def tearDown(self):
+        metrics._metrics = self._previous
+
+    def deliver(self):
+        # Espera a los hilos y entrega las señales encoladas al hilo principal
+        self.pool.waitForDone()
+        QCoreApplication.processEvents()
+
+    def test_cancelled_task_still_closes_its_action(self):
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "viejo"
+
+        self.runner.submit(slow, on_result=results.append, group="vista", action="Vista: refresco")
+        started.wait(5)
+        self.runner.cancel_group("vista")
+        release.set()
+        self.deliver()
+
+        self.assertEqual(results, [])
+        self.assertEqual(self.metrics.to_dict()["actions"]["Vista: refresco"]["runs"], 1)
+
+    def test_cancellable_task_sees_its_cancellation(self):
+        started = threading.Event()
+        release = threading.Event()
+        seen = []
+
+        def slow(cancelled):
+            started.set()
+            release.wait(5)
+            seen.append(cancelled())
+
+        self.runner.submit(slow, group="precarga", cancellable=True)
+        started.wait(5)
+        self.runner.cancel_group("precarga")
+        release.set()
+        self.deliver()
+
+        self.assertEqual(seen, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+import os
+import tempfile
+import unittest
+
+from src.backends import BackendError
+from src.write_queue import WriteQueue, is_permanent_error
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestWriteQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "pending.sqlite3")
+        self.clock = FakeClock()
+        self.queue = WriteQueue(self.path, clock=self.clock, base_delay=10)
+        self.sent_progress = []
+        self.sent_achievements = []
+
+    def tearDown(self):
+        self.queue.close()
+        self.tmp.cleanup()
+
+    def send_progress(self, rows):
+        self.sent_progress.append(rows)
+
+    def send_achievements(self, rows):
+        self.sent_achievements.append(rows)
+
+    def test_writes_survive_reopen(self):
+        self.queue.enqueue_progress("u1", "l1", True, 80)
+        self.queue.close()
+        self.queue = WriteQueue(self.path, clock=self.clock)
+        self.assertEqual(self.queue.pending_count(), 1)
+        self.assertEqual(self.queue.pending_progress("u1")[0]["score"], 80)
+
+    def test_flush_coalesces_into_one_batch_per_kind(self):
+        self.queue.enqueue_progress("u1", "l1", True, 60)
+        self.queue.enqueue_progress("u1", "l1", True, 90)
+        self.queue.enqueue_progress("u1", "l2", True, 70)
+        self.queue.enqueue_achievement("u1", "a1")
+        self.queue.enqueue_achievement("u1", "a1")
+
+        self.assertTrue(self.queue.flush(self.send_progress, self.send_achievements))
+
+        self.assertEqual(len(self.sent_progress), 1)
+        scores = {row["lesson_id"]: row["score"] for row in self.sent_progress[0]}
+        self.assertEqual(scores, {"l1": 90, "l2": 70})
+        self.assertEqual([len(batch) for batch in self.sent_achievements], [1])
+        self.assertEqual(self.queue.pending_count(), 0)
+
+    def test_failed_flush_keeps_rows_with_backoff(self):
+        self.queue.enqueue_progress("u1", "l1", True, 80)
+
+        def offline(rows):
+            raise ConnectionError("sin red")
+
+        self.assertFalse(self.queue.flush(offline, self.send_achievements))
+        self.assertEqual(self.queue.pending_count(), 1)
+        self.assertGreater(self.queue.next_due_in(), 0)
+
+        # Antes de que venza el backoff no se reintenta
+        self.queue.flush(self.send_progress, self.send_achievements)
+        self.assertEqual(self.sent_progress, [])
+
+        self.clock.now += 60
+        self.assertTrue(self.queue.flush(self.send_progress, self.send_achievements))
+        self.assertEqual(len(self.sent_progress), 1)
+        self.assertEqual(self.queue.pending_count(), 0)
+
+    def test_poisoned_row_does_not_block_the_others(self):
+        for lesson_id in ("l1", "l2", "bad", "l3", "l4"):
+            self.queue.enqueue_progress("u1", lesson_id, True, 80)
+        attempts = []
+
+        def strict(rows):
+            attempts.append(len(rows))
+            if any(row["lesson_id"] == "bad" for row in rows):
+                raise BackendError("insert or update violates foreign key constraint", code="23503")
+            self.sent_progress.extend(row["lesson_id"] for row in rows)
+
+        self.assertTrue(self.queue.flush(strict, self.send_achievements))
+        self.assertEqual(sorted(self.sent_progress), ["l1", "l2", "l3", "l4"])
+        self.assertEqual(self.queue.pending_count(), 0)
+        dead = self.queue.dead_letters()
+        self.assertEqual([(d["target_id"], d["attempts"]) for d in dead], [("bad", 1)])
+        self.assertIn("foreign key", dead[0]["error"])
+        # Bisección: el lote de 5, sus mitades y los cuartos que contienen la fila mala
+        self.assertLess(len(attempts), 8)
+
+    def test_network_errors_are_retried_whole_until_max_attempts(self):
+        self.queue.close()
+        self.queue = WriteQueue(self.path, clock=self.clock, base_delay=10, max_attempts=3)
+        self.queue.enqueue_progress("u1", "l1", True, 80)
+        self.queue.enqueue_progress("u1", "l2", True, 90)
+        calls = []
+
+        def offline(rows):
+            calls.append(len(rows))
+            raise ConnectionError("sin red")
+
+        for _ in range(2):
+            self.assertFalse(self.queue.flush(offline, self.send_achievements))
+            self.clock.now += 3600
+        self.assertEqual(calls, [2, 2])
+        self.assertEqual(self.queue.dead_letters(), [])
+
+        # Tercer intento fallido: se apartan para no reintentar para siempre
+        self.assertTrue(self.queue.flush(offline, self.send_achievements))
+        self.assertEqual(self.queue.pending_count(), 0)
+        self.assertEqual([d["attempts"] for d in self.queue.dead_letters()], [3, 3])
+
+    def test_error_classification(self):
+        self.assertTrue(is_permanent_error(BackendError("duplicado", code="23505")))
+        self.assertTrue(is_permanent_error(BackendError("sin permiso", code="42501")))
+        self.assertTrue(is_permanent_error(BackendError("columna", code="PGRST204")))
+        self.assertFalse(is_permanent_error(BackendError("deadlock", code="40P01")))
+        self.assertFalse(is_permanent_error(ConnectionError("sin red")))
+
+        class Response:
+            def __init__(self, status_code):
+                self.status_code = status_code
+
+        class HTTPError(Exception):
+            def __init__(self, status_code):
+                super().__init__(status_code)
+                self.response = Response(status_code)
+
+        self.assertTrue(is_permanent_error(HTTPError(400)))
+        self.assertFalse(is_permanent_error(HTTPError(429)))
+        self.assertFalse(is_permanent_error(HTTPError(503)))
+
+    def test_pending_views_are_scoped_per_user(self):
+        self.queue.enqueue_progress("u1", "l1", True, 80)
+        self.queue.enqueue_achievement("u2", "a1")
+        self.assertEqual(len(self.queue.pending_progress("u1")), 1)
+        self.assertEqual(self.queue.pending_progress("u2"), [])
+        self.assertEqual(self.queue.pending_achievements("u2")[0]["achievement_id"], "a1")
+
+
+if __name__ == "__main__":
+    unittest.main()